@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+from typing import Dict
+
+import uvicorn
+
+from scrapfly import webhook
+from scrapfly.webhook import ResourceType
+
+#### Instructions
+# 1. Install dependencies: `pip install uvicorn scrapfly`
+# 2. Create a webhook on your dashboard https://scrapfly.io/dashboard/webhook/create
+# 3. Retrieve your Webhook signing secret
+# 4. Run this script e.g: python webhook_asgi_server.py --signing-secret=<signing-secret>
+#
+# Deliveries are answered with 200 as soon as they are verified, the callback runs afterwards on
+# a pool of workers. When more than --queue-size deliveries are waiting, the server answers 503
+# and Scrapfly retries the delivery later.
+
+async def webhook_callback(data: Dict, resource_type: str, headers: Dict[str, str]):
+    if resource_type == ResourceType.SCRAPE.value:
+        upstream_response = data['result']
+        print(upstream_response)
+    else:
+        # See ResourceType Enum for all possible values
+        print(data)
+
+    await asyncio.sleep(1)  # Slow downstream work does not delay the acknowledgement
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Async webhook server with signing secret")
+    parser.add_argument("--signing-secret", required=True, help="Signing secret to verify webhook payload integrity")
+    parser.add_argument("--workers", type=int, default=8, help="Number of callbacks running at once")
+    parser.add_argument("--queue-size", type=int, default=1000, help="Number of deliveries waiting for a worker")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    app = webhook.create_asgi_app(
+        signing_secrets=tuple([args.signing_secret]),
+        callback=webhook_callback,
+        workers=args.workers,
+        queue_size=args.queue_size,
+    )
+    uvicorn.run(app, host="0.0.0.0", port=args.port)
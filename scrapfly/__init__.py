@@ -36,9 +36,20 @@ from .crawler import (
     WarcParser,
     WarcRecord,
     parse_warc,
+    WarcIndex,
+    WarcIndexEntry,
     HarArchive,
     HarEntry,
+    export_pages,
+    iter_page_rows,
+    NearDuplicateFilter,
+    simhash,
+    convert_html,
+    iter_converted,
     Crawl,
+    CrawlWaiter,
+    CrawlCache,
+    CrawlOrchestrator,
     ContentFormat,
     CrawlContent,
     CrawlerState,
@@ -52,6 +63,8 @@ from .crawler import (
     CrawlerScrapeResult,
     CrawlerWebhook,
     webhook_from_payload,
+    CrawlerWebhookReceiver,
+    CrawlerWebhookBatcher,
 )
 from .browser_config import BrowserConfig, ProxyPool, OperatingSystem
 from .classify import ClassifyResult
@@ -113,9 +126,20 @@ __all__: Tuple[str, ...] = (
     'WarcParser',
     'WarcRecord',
     'parse_warc',
+    'WarcIndex',
+    'WarcIndexEntry',
     'HarArchive',
     'HarEntry',
+    'export_pages',
+    'iter_page_rows',
+    'NearDuplicateFilter',
+    'simhash',
+    'convert_html',
+    'iter_converted',
     'Crawl',
+    'CrawlWaiter',
+    'CrawlCache',
+    'CrawlOrchestrator',
     'ContentFormat',
     'CrawlContent',
     'CrawlerWebhookEvent',
@@ -128,6 +152,8 @@ __all__: Tuple[str, ...] = (
     'CrawlerScrapeResult',
     'CrawlerWebhook',
     'webhook_from_payload',
+    'CrawlerWebhookReceiver',
+    'CrawlerWebhookBatcher',
     'BrowserConfig',
     'ProxyPool',
     'OperatingSystem',
@@ -124,24 +124,45 @@ class ResponseBodyHandler:
         return False
 
     def verify(self, message: bytes, signature: str) -> bool:
+        debug = logger.isEnabledFor(logging.DEBUG)
+
         for signing_secret in self._signing_secret:
             computed = hmac.new(signing_secret, message, hashlib.sha256).hexdigest().upper()
-            logger.debug(
-                'WEBHOOK_VERIFY_DEBUG key_len=%d key_sha=%s body_len=%d body_sha=%s computed=%s received=%s match=%s',
-                len(signing_secret),
-                hashlib.sha256(signing_secret).hexdigest()[:16],
-                len(message),
-                hashlib.sha256(message).hexdigest()[:16],
-                computed,
-                signature,
-                computed == signature,
-            )
+            if debug:  # the digests of the key and body are only worth computing for the log line
+                logger.debug(
+                    'WEBHOOK_VERIFY_DEBUG key_len=%d key_sha=%s body_len=%d body_sha=%s computed=%s received=%s match=%s',
+                    len(signing_secret),
+                    hashlib.sha256(signing_secret).hexdigest()[:16],
+                    len(message),
+                    hashlib.sha256(message).hexdigest()[:16],
+                    computed,
+                    signature,
+                    computed == signature,
+                )
             if computed == signature:
                 return True
 
         return False
 
-    def read(self, content: bytes, content_encoding: str, content_type: str, signature: Optional[str]) -> Dict:
+    def verify_content(self, content: bytes, content_encoding: Optional[str], signature: Optional[str]) -> bytes:
+        """
+        Decompress a webhook body and verify its signature, without decoding it
+
+        :param content: raw request body
+        :param content_encoding: Content-Encoding header
+        :param signature: X-Scrapfly-Webhook-Signature header, verification is skipped when None
+        :return: the decompressed body
+        :raise WebhookSignatureMissMatch: if the signature does not match any signing secret
+        """
+        content = self.decompress(content, content_encoding)
+
+        if self._signing_secret is not None and signature is not None:
+            if not self.verify(content, signature):
+                raise WebhookSignatureMissMatch()
+
+        return content
+
+    def decompress(self, content: bytes, content_encoding: Optional[str]) -> bytes:
         if content_encoding == 'gzip' or content_encoding == 'gz':
             import gzip
             content = gzip.decompress(content)
@@ -159,9 +180,10 @@ class ResponseBodyHandler:
                 import zstandard
                 content = zstandard.decompress(content)
 
-        if self._signing_secret is not None and signature is not None:
-            if not self.verify(content, signature):
-                raise WebhookSignatureMissMatch()
+        return content
+
+    def read(self, content: bytes, content_encoding: str, content_type: str, signature: Optional[str]) -> Dict:
+        content = self.verify_content(content, content_encoding, signature)
 
         if content_type.startswith('application/json'):
             content = loads(content, cls=self.JSONDateTimeDecoder)
@@ -1,5 +1,6 @@
 """
-Streaming multipart/mixed parser for the POST /scrape/batch endpoint.
+Streaming multipart parser for the POST /scrape/batch endpoint (multipart/mixed)
+and the crawler POST /crawl/{uuid}/contents/batch endpoint (multipart/related).
 
 The API emits one part per scrape result as each scrape completes;
 the client must consume parts as they arrive (not after the whole
@@ -47,8 +48,10 @@ class _BufferedMultipartReader:
 
     def read_until(self, delimiter: bytes) -> bytes:
         """Read until `delimiter` appears in the buffer. The delimiter is consumed and NOT returned."""
+        start = 0
+
         while True:
-            idx = self._buffer.find(delimiter)
+            idx = self._buffer.find(delimiter, start)
 
             if idx != -1:
                 out = bytes(self._buffer[:idx])
@@ -63,6 +66,9 @@ class _BufferedMultipartReader:
 
                 return out
 
+            # Only the new bytes (and a delimiter straddling the chunk edge) are searched next round.
+            start = max(len(self._buffer) - len(delimiter) + 1, 0)
+
             if not self._read_more() and self._eof:
                 out = bytes(self._buffer)
                 self._buffer.clear()
@@ -137,7 +143,21 @@ def iter_batch_parts(
 
     boundary = boundary_str.encode("ascii")
 
-    chunks = response.iter_content(chunk_size=8 * 1024)
+    return iter_multipart_parts(response.iter_content(chunk_size=8 * 1024), boundary)
+
+
+def iter_multipart_parts(
+    chunks: Iterator[bytes],
+    boundary: bytes,
+    header_encoding: str = "ascii",
+) -> Iterator[Tuple[Dict[str, str], bytes]]:
+    """
+    Iterate (part_headers, part_body) tuples from the raw chunks of a
+    multipart body (mixed, related, ...). Header keys are lowercased,
+    header values are decoded with `header_encoding` (undecodable bytes
+    replaced). Parts are yielded as soon as their body is complete.
+    """
+
     reader = _BufferedMultipartReader(chunks, boundary)
 
     # Skip anything before the first --boundary.
@@ -167,7 +187,7 @@ def iter_batch_parts(
 
             k, _, v = line.partition(b":")
             headers[k.decode("ascii", errors="replace").strip().lower()] = (
-                v.decode("ascii", errors="replace").strip()
+                v.decode(header_encoding, errors="replace").strip()
             )
 
         # Body framing: prefer Content-Length (we always emit it
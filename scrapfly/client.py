@@ -2,12 +2,14 @@ import base64
 import os
 import datetime
 import warnings
+import weakref
 from asyncio import AbstractEventLoop, Task
 from concurrent.futures.thread import ThreadPoolExecutor
 
 import asyncio
 import http
 import platform
+import quopri
 import re
 import shutil
 from functools import partial
@@ -16,6 +18,7 @@ from io import BytesIO
 import backoff
 from requests import Session, Response
 from requests import exceptions as RequestExceptions
+from requests.adapters import HTTPAdapter
 from typing import TextIO, Union, List, Dict, Optional, Set, Callable, Literal, Tuple, Any, Iterator
 import requests
 import urllib3
@@ -36,7 +39,7 @@ from .scrape_config import ScrapeConfig
 from .screenshot_config import ScreenshotConfig
 from .extraction_config import ExtractionConfig
 from .classify import ClassifyResult
-from .crawler import CrawlerConfig, CrawlerStartResponse, CrawlerStatusResponse, CrawlerArtifactResponse
+from .crawler import CrawlerConfig, CrawlerStartResponse, CrawlerStatusResponse, CrawlerArtifactResponse, CrawlerUrlsResponse, CrawlerUrlEntry, CrawlCache
 from .browser_config import BrowserConfig
 from .schedule import (
     ScheduleClientMixin,
@@ -56,6 +59,15 @@ NetworkError = (
     RequestExceptions.ReadTimeout
 )
 
+# A connection dropped mid-body surfaces as a ChunkedEncodingError while streaming, and a body
+# that ends early as an INCOMPLETE_DOWNLOAD error: both are resumed from the partial file
+ArtifactDownloadError = NetworkError + (RequestExceptions.ChunkedEncodingError, ScrapflyCrawlerError)
+
+
+def _artifact_download_giveup(error: Exception) -> bool:
+    return isinstance(error, ScrapflyCrawlerError) and error.code != 'INCOMPLETE_DOWNLOAD'
+
+
 class ScraperAPI:
 
     MONITORING_DATA_FORMAT_STRUCTURED = 'structured'
@@ -100,6 +112,7 @@ class ScrapflyClient(ScheduleClientMixin):
     DEFAULT_SCREENSHOT_API_READ_TIMEOUT = 60  # 30 real
     DEFAULT_EXTRACTION_API_READ_TIMEOUT = 35 # 30 real
     DEFAULT_CRAWLER_API_READ_TIMEOUT = 30
+    CRAWLER_API_POOL_SIZE = 16  # pooled connections for concurrent crawler calls (status polling, batch reads)
 
     host:str
     key:str
@@ -140,6 +153,7 @@ class ScrapflyClient(ScheduleClientMixin):
         default_read_timeout:int = DEFAULT_READ_TIMEOUT,
         reporter:Optional[Callable]=None,
         cloud_browser_host: Optional[str] = None,
+        crawler_cache: Optional[Union[CrawlCache, str]] = None,
         **kwargs
     ):
         if host[-1] == '/':  # remove last '/' if exists
@@ -180,6 +194,10 @@ class ScrapflyClient(ScheduleClientMixin):
         self.body_handler = ResponseBodyHandler(use_brotli=False)
         self.async_executor = ThreadPoolExecutor()
         self.http_session = None
+        # Local cache of finished crawl artifacts and contents (see CrawlCache)
+        self.crawler_cache = CrawlCache(crawler_cache) if isinstance(crawler_cache, (str, os.PathLike)) else crawler_cache
+        # UUIDs of crawls seen finished, a finished crawl never runs again
+        self._finished_crawls: Set[str] = set()
 
         if not self.verify and not self.HOST.endswith('.local'):
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -211,6 +229,25 @@ class ScrapflyClient(ScheduleClientMixin):
     def http(self):
         return self._http_handler
 
+    @cached_property
+    def _crawler_http_session(self) -> Session:
+        session = Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.CRAWLER_API_POOL_SIZE,
+            pool_maxsize=self.CRAWLER_API_POOL_SIZE
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    @cached_property
+    def _crawler_http_handler(self):
+        # Crawler calls are often issued from several threads at once (waiting on many crawls,
+        # batch content reads), keep-alive connections are pooled across them
+        if self.http_session is not None:
+            return partial(self.http_session.request)
+        return partial(self._crawler_http_session.request)
+
     def _scrape_request(self, scrape_config:ScrapeConfig):
         return {
             'method': scrape_config.method,
@@ -615,6 +652,9 @@ class ScrapflyClient(ScheduleClientMixin):
         if self.http_session is not None:
             self.http_session.close()
             self.http_session = None
+        if '_crawler_http_session' in self.__dict__:
+            self.__dict__.pop('_crawler_http_session').close()
+            self.__dict__.pop('_crawler_http_handler', None)
         # The executor is created in __init__ and owns worker threads that
         # outlive the HTTP session; shutting it down here prevents thread
         # leaks for callers that reuse the client across open()/close()
@@ -1402,7 +1442,7 @@ class ScrapflyClient(ScheduleClientMixin):
         logger.debug(f"Crawler API POST {url}?key=***")
         logger.debug(f"Crawler API body: {body_params}")
 
-        response = self._http_handler(
+        response = self._crawler_http_handler(
             method='POST',
             url=url,
             params=query_params,  # key as query param
@@ -1445,7 +1485,7 @@ class ScrapflyClient(ScheduleClientMixin):
         """
         timeout = (self.connect_timeout, self.DEFAULT_CRAWLER_API_READ_TIMEOUT)
 
-        response = self._http_handler(
+        response = self._crawler_http_handler(
             method='GET',
             url=f'{self.host}/crawl/{uuid}/status',
             params={'key': self.key},  # key as query param (already correct)
@@ -1458,7 +1498,15 @@ class ScrapflyClient(ScheduleClientMixin):
             self._handle_crawler_error_response(response)
 
         result = response.json()
-        return CrawlerStatusResponse(result)
+        status = CrawlerStatusResponse(result)
+        if status.is_finished:
+            self._finished_crawls.add(uuid)
+
+        return status
+
+    def _is_crawl_finished(self, uuid: str) -> bool:
+        """Whether a crawl is finished, its status is only requested until it is seen finished"""
+        return uuid in self._finished_crawls or self.get_crawl_status(uuid).is_finished
 
     def cancel_crawl(self, crawl_uuid: str) -> bool:
         """
@@ -1478,7 +1526,7 @@ class ScrapflyClient(ScheduleClientMixin):
         """
         timeout = (self.connect_timeout, self.DEFAULT_CRAWLER_API_READ_TIMEOUT)
 
-        response = self._http_handler(
+        response = self._crawler_http_handler(
             method='DELETE',
             url=f'{self.host}/crawl/{crawl_uuid}',
             params={'key': self.key},
@@ -1492,7 +1540,12 @@ class ScrapflyClient(ScheduleClientMixin):
 
         return True
 
-    @backoff.on_exception(backoff.expo, exception=NetworkError, max_tries=5)
+    def _cached_artifact(self, cached_path: str, artifact_type: str) -> CrawlerArtifactResponse:
+        """Artifact read from a pinned cache entry, unpinned once the artifact is garbage collected"""
+        artifact = CrawlerArtifactResponse.from_file(cached_path, artifact_type=artifact_type)
+        weakref.finalize(artifact, self.crawler_cache.unpin, cached_path)
+        return artifact
+
     def get_crawl_artifact(
         self,
         uuid: str,
@@ -1501,6 +1554,9 @@ class ScrapflyClient(ScheduleClientMixin):
         """
         Download crawler job artifact
 
+        With a ``crawler_cache``, the artifact of a finished crawl is streamed
+        to the cache on the first call and read from disk afterwards.
+
         :param uuid: Crawler job UUID
         :param artifact_type: Artifact type ('warc' or 'har')
         :return: CrawlerArtifactResponse with WARC data and parsing utilities
@@ -1530,9 +1586,33 @@ class ScrapflyClient(ScheduleClientMixin):
             artifact.save('crawl.warc.gz')
             ```
         """
+        if self.crawler_cache is not None:
+            cached_path = self.crawler_cache.get_artifact_path(uuid, artifact_type, pin=True)
+            if cached_path is not None:
+                return self._cached_artifact(cached_path, artifact_type)
+
+            if self._is_crawl_finished(uuid):
+                # Finished crawls are immutable: stream the artifact into the cache
+                tmp_path = self.crawler_cache.temp_path(uuid)
+                try:
+                    # Retried and resumed from the partial file by download_crawl_artifact() itself
+                    self.download_crawl_artifact(uuid, tmp_path, artifact_type=artifact_type)
+                except BaseException:
+                    for path in (tmp_path, tmp_path + '.part'):
+                        if os.path.exists(path):
+                            os.remove(path)
+                    raise
+                cached_path = self.crawler_cache.put_artifact_file(uuid, artifact_type, tmp_path, pin=True)
+                return self._cached_artifact(cached_path, artifact_type)
+
+        return self._fetch_crawl_artifact(uuid, artifact_type)
+
+    @backoff.on_exception(backoff.expo, exception=NetworkError, max_tries=5)
+    def _fetch_crawl_artifact(self, uuid: str, artifact_type: str) -> CrawlerArtifactResponse:
+        """Download a crawler job artifact in memory"""
         timeout = (self.connect_timeout, 300)  # 5 minutes for large downloads
 
-        response = self._http_handler(
+        response = self._crawler_http_handler(
             method='GET',
             url=f'{self.host}/crawl/{uuid}/artifact',
             params={
@@ -1549,6 +1629,252 @@ class ScrapflyClient(ScheduleClientMixin):
 
         return CrawlerArtifactResponse(response.content, artifact_type=artifact_type)
 
+    def download_crawl_artifact(
+        self,
+        uuid: str,
+        path: str,
+        artifact_type: str = 'warc',
+        resume: bool = True,
+        checksum: Optional[str] = None,
+        chunk_size: int = 1024 * 1024
+    ) -> CrawlerArtifactResponse:
+        """
+        Stream a crawler job artifact to a local file
+
+        Unlike get_crawl_artifact(), the artifact is never held in memory: it is
+        written chunk by chunk to ``<path>.part`` and renamed to ``path`` once
+        complete and verified. Network errors, including a connection dropped
+        mid-body, and incomplete bodies are retried with a Range request that
+        resumes from the partial file. If all retries fail, the partial file is
+        kept and the next call resumes from it.
+
+        :param uuid: Crawler job UUID
+        :param path: Destination file path
+        :param artifact_type: Artifact type ('warc' or 'har')
+        :param resume: Resume from an existing ``<path>.part`` file left by a previous call
+        :param checksum: Expected digest as ``<algorithm>:<hexdigest>`` (e.g. ``sha256:9f86d0...``).
+            When omitted, a ``Digest`` (sha-256/md5) header sent by the server is verified instead.
+        :param chunk_size: Size of the chunks written to disk
+        :return: CrawlerArtifactResponse backed by the downloaded file
+
+        Example:
+            ```python
+            artifact = client.download_crawl_artifact(uuid, 'crawl.warc.gz')
+
+            # Parsed from disk, memory usage does not depend on the crawl size
+            for record in artifact.iter_responses():
+                process(record.content)
+            ```
+        """
+        if checksum is not None and ':' not in checksum:
+            raise ValueError("checksum must be formatted as '<algorithm>:<hexdigest>', e.g. 'sha256:9f86d0...'")
+
+        part_path = path + '.part'
+        if not resume and os.path.exists(part_path):
+            os.remove(part_path)
+
+        return self._download_crawl_artifact_part(uuid, path, artifact_type, checksum, chunk_size)
+
+    @backoff.on_exception(backoff.expo, exception=ArtifactDownloadError, max_tries=5, giveup=_artifact_download_giveup)
+    def _download_crawl_artifact_part(
+        self,
+        uuid: str,
+        path: str,
+        artifact_type: str,
+        checksum: Optional[str],
+        chunk_size: int
+    ) -> CrawlerArtifactResponse:
+        """Stream the artifact to ``<path>.part`` from where it stopped, then verify and rename it to ``path``"""
+        import hashlib
+
+        part_path = path + '.part'
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {'User-Agent': self.ua}
+
+        if offset > 0:
+            headers['Range'] = 'bytes=%d-' % offset
+
+        response = self._crawler_http_handler(
+            method='GET',
+            url=f'{self.host}/crawl/{uuid}/artifact',
+            params={
+                'key': self.key,
+                'type': artifact_type
+            },
+            timeout=(self.connect_timeout, 300),
+            headers=headers,
+            verify=self.verify,
+            stream=True
+        )
+
+        try:
+            if response.status_code == 416 and offset > 0:
+                # Range starts past the end: the partial file is already complete
+                expected_size = offset
+            elif response.status_code in (200, 206):
+                if response.status_code == 200:
+                    offset = 0  # Range ignored by the server, restart from scratch
+
+                expected_size = None
+                content_range = response.headers.get('Content-Range', '')
+                if '/' in content_range and not content_range.endswith('/*'):
+                    expected_size = int(content_range.rsplit('/', 1)[1])
+                elif response.headers.get('Content-Length') and 'Content-Encoding' not in response.headers:
+                    expected_size = offset + int(response.headers['Content-Length'])
+
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if chunk:
+                            f.write(chunk)
+            else:
+                self._handle_crawler_error_response(response)
+
+            digest = response.headers.get('Digest')
+        finally:
+            response.close()
+
+        size = os.path.getsize(part_path)
+        if expected_size is not None and size != expected_size:
+            # Keep the partial file, the next call resumes from it
+            raise ScrapflyCrawlerError(
+                message=f"Incomplete artifact download: got {size} of {expected_size} bytes",
+                code="INCOMPLETE_DOWNLOAD",
+                http_status_code=response.status_code
+            )
+
+        expected_digest = None
+        if checksum is not None:
+            algorithm, _, expected_digest = checksum.partition(':')
+            expected_digest = expected_digest.lower()
+        elif digest:
+            # RFC 3230 instance digest, base64 encoded: "sha-256=<b64>, md5=<b64>"
+            for item in digest.split(','):
+                name, _, value = item.strip().partition('=')
+                if name.lower() in ('sha-256', 'md5'):
+                    algorithm = name.lower().replace('-', '')
+                    expected_digest = base64.b64decode(value).hex()
+                    break
+
+        if expected_digest is not None:
+            hasher = hashlib.new(algorithm)
+            with open(part_path, 'rb') as f:
+                for chunk in iter(partial(f.read, chunk_size), b''):
+                    hasher.update(chunk)
+
+            if hasher.hexdigest() != expected_digest:
+                # A corrupted partial file can't be resumed, start over next time
+                os.remove(part_path)
+                raise ScrapflyCrawlerError(
+                    message=f"Artifact checksum mismatch ({algorithm}): expected {expected_digest}, got {hasher.hexdigest()}",
+                    code="CHECKSUM_MISMATCH",
+                    http_status_code=response.status_code
+                )
+
+        os.replace(part_path, path)
+
+        return CrawlerArtifactResponse.from_file(path, artifact_type=artifact_type)
+
+    @backoff.on_exception(backoff.expo, exception=NetworkError, max_tries=5)
+    def get_crawl_urls(
+        self,
+        uuid: str,
+        status: Optional[Literal['visited', 'pending', 'failed', 'skipped']] = None,
+        page: int = 1,
+        per_page: int = 100
+    ) -> CrawlerUrlsResponse:
+        """
+        List the URLs of a crawler job (paginated, optionally filtered by status)
+
+        :param uuid: Crawler job UUID
+        :param status: Filter by URL status - 'visited', 'pending', 'failed' or 'skipped'.
+                       When None, the server defaults to 'visited'
+        :param page: 1-based page number
+        :param per_page: Page size (max 1000)
+        :return: CrawlerUrlsResponse with the URL records of the page
+
+        Example:
+            ```python
+            response = client.get_crawl_urls(uuid, status='failed')
+            for entry in response:
+                print(f"{entry.url}: {entry.reason}")
+            ```
+        """
+        timeout = (self.connect_timeout, self.DEFAULT_CRAWLER_API_READ_TIMEOUT)
+
+        params = {
+            'key': self.key,
+            'page': page,
+            'per_page': per_page
+        }
+        if status is not None:
+            params['status'] = status
+
+        response = self._crawler_http_handler(
+            method='GET',
+            url=f'{self.host}/crawl/{uuid}/urls',
+            params=params,
+            timeout=timeout,
+            headers={'User-Agent': self.ua},
+            verify=self.verify,
+            stream=True
+        )
+
+        try:
+            if response.status_code != 200:
+                self._handle_crawler_error_response(response)
+
+            # Records are parsed line by line as the body arrives, the text is never buffered whole
+            lines = (line.decode('utf-8', errors='replace') for line in response.iter_lines())
+            return CrawlerUrlsResponse.from_lines(
+                lines,
+                status_hint=status or 'visited',
+                page=page,
+                per_page=per_page
+            )
+        finally:
+            response.close()
+
+    def iter_crawl_urls(
+        self,
+        uuid: str,
+        status: Optional[Literal['visited', 'pending', 'failed', 'skipped']] = None,
+        per_page: int = 1000
+    ) -> Iterator[CrawlerUrlEntry]:
+        """
+        Iterate through all the URLs of a crawler job, walking the pages automatically
+
+        The next page is fetched in the background while the current one is
+        consumed, and at most two pages are held in memory whatever the
+        number of URLs.
+
+        :param uuid: Crawler job UUID
+        :param status: Filter by URL status - 'visited', 'pending', 'failed' or 'skipped'
+        :param per_page: Page size (max 1000)
+        :return: Iterator of CrawlerUrlEntry
+
+        Example:
+            ```python
+            for entry in client.iter_crawl_urls(uuid, status='visited'):
+                print(entry.url)
+            ```
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = 1
+            future = executor.submit(self.get_crawl_urls, uuid, status, page, per_page)
+            try:
+                while future is not None:
+                    response = future.result()
+                    # A short page is the last one, otherwise prefetch the next while this one is consumed
+                    if len(response) >= per_page:
+                        page += 1
+                        future = executor.submit(self.get_crawl_urls, uuid, status, page, per_page)
+                    else:
+                        future = None
+                    yield from response
+            finally:
+                if future is not None:
+                    future.cancel()
+
     @backoff.on_exception(backoff.expo, exception=NetworkError, max_tries=5)
     def get_crawl_contents(
         self,
@@ -1559,7 +1885,8 @@ class ScrapflyClient(ScheduleClientMixin):
         Get crawl contents in a specific format
 
         Retrieves extracted content from crawled pages in the format(s) specified
-        in your crawl configuration (via content_formats parameter).
+        in your crawl configuration (via content_formats parameter). With a
+        ``crawler_cache``, contents of finished crawls are cached on disk.
 
         :param uuid: Crawler job UUID
         :param format: Content format - 'html', 'clean_html', 'markdown', 'json', 'text',
@@ -1577,6 +1904,14 @@ class ScrapflyClient(ScheduleClientMixin):
                 print(f"{url}: {len(content)} chars")
             ```
         """
+        cacheable = False
+        if self.crawler_cache is not None:
+            cached = self.crawler_cache.get_contents(uuid, format)
+            if cached is not None:
+                return cached
+            # Contents of a running crawl still grow, only cache them once it is finished
+            cacheable = self._is_crawl_finished(uuid)
+
         timeout = (self.connect_timeout, self.DEFAULT_CRAWLER_API_READ_TIMEOUT)
 
         params = {
@@ -1584,7 +1919,7 @@ class ScrapflyClient(ScheduleClientMixin):
             'format': format
         }
 
-        response = self._http_handler(
+        response = self._crawler_http_handler(
             method='GET',
             url=f'{self.host}/crawl/{uuid}/contents',
             params=params,
@@ -1596,7 +1931,175 @@ class ScrapflyClient(ScheduleClientMixin):
         if response.status_code != 200:
             self._handle_crawler_error_response(response)
 
-        return response.json()
+        result = response.json()
+        if cacheable:
+            self.crawler_cache.put_contents(uuid, format, result)
+
+        return result
+
+    def iter_crawl_contents_batch(
+        self,
+        uuid: str,
+        urls: List[str],
+        formats: Optional[List[str]] = None
+    ) -> Iterator[Tuple[str, str, str]]:
+        """
+        Stream the content of up to 100 crawled URLs in one request
+
+        The multipart/related response is parsed incrementally: every part is
+        yielded as soon as it is received, the response is never buffered.
+        Each part is reported under the requested format it answers, formats
+        sharing a MIME type (html and clean_html, json, extracted_data and
+        page_metadata) included. With a ``crawler_cache``, contents of
+        finished crawls are cached on disk: URLs cached in every requested
+        format are served from disk and only the others are requested.
+
+        :param uuid: Crawler job UUID
+        :param urls: URLs to retrieve (max 100)
+        :param formats: Content formats to retrieve (default: ['html'])
+        :return: Iterator of (url, format, content) tuples
+
+        Example:
+            ```python
+            for url, format, content in client.iter_crawl_contents_batch(uuid, urls, formats=['markdown']):
+                print(f"{url}: {len(content)} chars of {format}")
+            ```
+        """
+        for url, content_format, content, _ in self._iter_crawl_content_parts(uuid, urls, formats):
+            yield url, content_format, content
+
+    def _iter_crawl_content_parts(
+        self,
+        uuid: str,
+        urls: List[str],
+        formats: Optional[List[str]] = None
+    ) -> Iterator[Tuple[str, str, str, Optional[int]]]:
+        """
+        Same as iter_crawl_contents_batch(), with the status code of each page
+
+        The status code is read from the X-Scrapfly-Scrape-Status header of
+        the part, None when the part has none or is served from the cache.
+        """
+        from .batch import iter_multipart_parts, _parse_content_type, _safe_int
+
+        if len(urls) > 100:
+            raise ValueError("Maximum 100 URLs per batch request")
+
+        formats = formats or ['html']
+        cache = self.crawler_cache
+        if cache is not None:
+            # The content of a visited URL never changes, cached URLs are not requested again
+            missing = []
+            for url in urls:
+                cached = []
+                for content_format in formats:
+                    content = cache.get_content(uuid, url, content_format)
+                    if content is None:
+                        missing.append(url)
+                        break
+                    cached.append((url, content_format, content, None))
+                else:
+                    yield from cached
+            urls = missing
+
+        if not urls:
+            return
+
+        # Contents of a running crawl are not final yet, only cache them once it is finished
+        cacheable = cache is not None and self._is_crawl_finished(uuid)
+
+        response = self._crawler_http_handler(
+            method='POST',
+            url=f'{self.host}/crawl/{uuid}/contents/batch',
+            params={'key': self.key, 'formats': ','.join(formats)},
+            data='\n'.join(urls).encode('utf-8'),
+            timeout=(self.connect_timeout, self.DEFAULT_CRAWLER_API_READ_TIMEOUT),
+            headers={'Content-Type': 'text/plain', 'User-Agent': self.ua},
+            verify=self.verify,
+            stream=True
+        )
+
+        try:
+            if response.status_code != 200:
+                raise ScrapflyCrawlerError(
+                    message=f"Batch content request failed: {response.status_code}",
+                    code="BATCH_REQUEST_FAILED",
+                    http_status_code=response.status_code
+                )
+
+            content_type = response.headers.get('Content-Type', '')
+            mime, params = _parse_content_type(content_type)
+            if mime != 'multipart/related':
+                raise ScrapflyCrawlerError(
+                    message=f"Unexpected content type: {content_type}",
+                    code="INVALID_RESPONSE",
+                    http_status_code=500
+                )
+
+            if not params.get('boundary'):
+                raise ScrapflyCrawlerError(
+                    message="No boundary found in multipart response",
+                    code="INVALID_RESPONSE",
+                    http_status_code=500
+                )
+
+            received = {}  # url -> formats already yielded
+            # Content-Location holds the crawled URL as sent, non-ASCII characters included
+            parts = iter_multipart_parts(
+                response.iter_content(chunk_size=64 * 1024), params['boundary'].encode('ascii'), header_encoding='utf-8'
+            )
+            for headers, body in parts:
+                url = headers.get('content-location')
+                part_mime, part_params = _parse_content_type(headers.get('content-type', ''))
+                content_format = self._requested_content_format(
+                    self._crawler_content_format(part_mime), formats, received.setdefault(url, set())
+                )
+                if not url or content_format is None:
+                    continue
+                received[url].add(content_format)
+
+                encoding = headers.get('content-transfer-encoding', '').lower()
+                if encoding == 'base64':
+                    body = base64.b64decode(body)
+                elif encoding == 'quoted-printable':
+                    body = quopri.decodestring(body)
+
+                content = body.decode(part_params.get('charset', 'utf-8'), errors='replace')
+                if cacheable:
+                    cache.put_content(uuid, url, content_format, content)
+                yield url, content_format, content, _safe_int(headers.get('x-scrapfly-scrape-status'), None)
+        finally:
+            response.close()
+
+    # MIME-derived format of the requested formats sharing a MIME type (see _crawler_content_format)
+    _CRAWLER_FORMAT_MIME = {'clean_html': 'html', 'extracted_data': 'json', 'page_metadata': 'json'}
+
+    @classmethod
+    def _requested_content_format(cls, mime_format: Optional[str], formats: List[str], received: set) -> Optional[str]:
+        """
+        Map the MIME-derived format of a part to the requested format it answers
+
+        Parts of a URL come in the order of the requested formats, so when
+        several requested formats share a MIME type (e.g. html and clean_html)
+        the first one not received yet is picked.
+        """
+        for content_format in formats:
+            if content_format not in received and cls._CRAWLER_FORMAT_MIME.get(content_format, content_format) == mime_format:
+                return content_format
+        return None
+
+    @staticmethod
+    def _crawler_content_format(mime: str) -> Optional[str]:
+        """Map the MIME type of a batch content part to its content format"""
+        if 'markdown' in mime:
+            return 'markdown'
+        elif 'plain' in mime:
+            return 'text'
+        elif 'html' in mime:
+            return 'html'
+        elif 'json' in mime:
+            return 'json'
+        return None
 
     def _handle_crawler_error_response(self, response: Response):
         """Handle error responses from Crawler API"""
@@ -3,6 +3,7 @@ Scrapfly Crawler API
 
 This package contains all components for the Crawler API:
 - Crawl management (Crawl class)
+- Local cache of finished crawls (CrawlCache)
 - Configuration (CrawlerConfig)
 - Response types (CrawlerStartResponse, CrawlerStatusResponse, CrawlerArtifactResponse)
 - Artifact parsing (WARC, HAR)
@@ -10,6 +11,9 @@ This package contains all components for the Crawler API:
 """
 
 from .crawl import Crawl, ContentFormat
+from .crawl_waiter import CrawlWaiter
+from .crawl_cache import CrawlCache
+from .crawl_orchestrator import CrawlOrchestrator
 from .crawl_content import CrawlContent
 from .crawler_config import CrawlerConfig
 from .crawler_response import (
@@ -21,7 +25,11 @@ from .crawler_response import (
     CrawlerUrlEntry,
 )
 from .warc_utils import WarcParser, WarcRecord, parse_warc
+from .warc_index import WarcIndex, WarcIndexEntry
 from .har_utils import HarArchive, HarEntry
+from .exporter import export_pages, iter_page_rows
+from .dedup import NearDuplicateFilter, simhash
+from .converter import convert_html, iter_converted
 from .crawler_webhook import (
     CrawlerWebhookEvent,
     CrawlerWebhookBase,
@@ -34,10 +42,15 @@ from .crawler_webhook import (
     CrawlerWebhook,
     webhook_from_payload,
 )
+from .webhook_receiver import CrawlerWebhookReceiver
+from .webhook_batcher import CrawlerWebhookBatcher
 
 __all__ = [
     # Core
     'Crawl',
+    'CrawlWaiter',
+    'CrawlCache',
+    'CrawlOrchestrator',
     'ContentFormat',
     'CrawlContent',
 
@@ -56,11 +69,25 @@ __all__ = [
     'WarcParser',
     'WarcRecord',
     'parse_warc',
+    'WarcIndex',
+    'WarcIndexEntry',
 
     # HAR utilities
     'HarArchive',
     'HarEntry',
 
+    # Export
+    'export_pages',
+    'iter_page_rows',
+
+    # Near-duplicate detection
+    'NearDuplicateFilter',
+    'simhash',
+
+    # Local conversion
+    'convert_html',
+    'iter_converted',
+
     # Webhooks
     'CrawlerWebhookEvent',
     'CrawlerWebhookBase',
@@ -72,4 +99,6 @@ __all__ = [
     'CrawlerScrapeResult',
     'CrawlerWebhook',
     'webhook_from_payload',
+    'CrawlerWebhookReceiver',
+    'CrawlerWebhookBatcher',
 ]
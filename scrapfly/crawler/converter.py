@@ -0,0 +1,471 @@
+"""
+Local Content Conversion - Turn crawled HTML into markdown, text or clean HTML
+
+The contents API converts pages server-side, one format per request. When the
+WARC artifact is already downloaded, the same formats can be produced locally:
+pages are streamed from the archive and converted on a pool of worker
+processes, in batches, with only a few batches in flight at once so memory
+stays bounded whatever the size of the crawl. Results are CrawlContent
+objects, like ``crawl.read_iter()``.
+
+The conversion only relies on the standard library HTML parser:
+
+    markdown    headings, paragraphs, lists, links and images (resolved
+                against the page URL), emphasis, code, blockquotes and tables
+    text        the visible text, one block per line
+    clean_html  the HTML without scripts, styles, comments, embedded objects
+                and event handler / style attributes
+"""
+
+import fnmatch
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from .crawl_content import CrawlContent
+from .exporter import ExportSource, iter_page_rows
+
+LOCAL_FORMATS = ('markdown', 'text', 'clean_html')
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Elements whose content is never rendered
+_IGNORED_TAGS = frozenset((
+    'head', 'script', 'style', 'noscript', 'template', 'svg', 'math', 'iframe', 'canvas', 'object', 'embed',
+))
+_VOID_TAGS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr',
+))
+_BLOCK_TAGS = frozenset((
+    'address', 'article', 'aside', 'body', 'dd', 'details', 'div', 'dl', 'dt', 'fieldset', 'figcaption', 'figure',
+    'footer', 'form', 'header', 'html', 'main', 'nav', 'p', 'section', 'summary',
+))
+_HEADINGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+_EMPHASIS = {'b': '**', 'strong': '**', 'i': '*', 'em': '*', 'del': '~~', 's': '~~', 'strike': '~~'}
+
+
+class _TextConverter(HTMLParser):
+    """Render an HTML document as markdown (or as plain text with markdown=False)"""
+
+    def __init__(self, markdown: bool = True, base_url: Optional[str] = None):
+        super().__init__(convert_charrefs=True)
+        self.markdown = markdown
+        self.base_url = base_url
+        self._parts: List[str] = []
+        self._at_start = True
+        self._line_start = True
+        self._newlines = 0  # line breaks owed before the next output
+        self._space = False  # whitespace owed before the next output
+        self._ignored = 0
+        self._pre = 0
+        self._pre_start = False
+        self._quote = 0
+        self._lists: List[List[Any]] = []  # [ordered, item number] of the open lists
+        self._links: List[Tuple[str, int, int, bool]] = []  # (href, output positions, line start) of the open links
+        self._cells: Optional[int] = None  # cells of the current table row
+        self._rows = 0
+
+    def _prefix(self) -> str:
+        return '> ' * self._quote
+
+    def _flush_newlines(self):
+        if self._newlines:
+            if not self._at_start:
+                blank_line = '\n' + self._prefix().rstrip()
+                self._parts.append(blank_line * (self._newlines - 1) + '\n')
+                self._line_start = True
+            self._newlines = 0
+            self._space = False
+
+    def _emit(self, text: str, space_before: bool = True):
+        self._flush_newlines()
+        if self._line_start:
+            self._parts.append(self._prefix())
+            self._line_start = False
+        elif self._space and space_before and not self._at_start:
+            self._parts.append(' ')
+        self._space = False
+        self._parts.append(text)
+        self._at_start = False
+
+    def _open_marker(self, marker: str):
+        """Emit an opening marker glued to the text that follows"""
+        self._emit(marker)
+        self._space = False
+
+    def _block(self, newlines: int = 2):
+        if self._cells is not None:
+            self._space = True  # Cells must stay on one line
+            return
+        if self._at_start or self._line_start:
+            return
+        self._newlines = max(self._newlines, newlines)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _IGNORED_TAGS:
+            if tag not in _VOID_TAGS:
+                self._ignored += 1
+            return
+        if self._ignored:
+            return
+
+        attrs = dict(attrs)
+        md = self.markdown
+
+        if tag in _BLOCK_TAGS:
+            self._block()
+        elif tag in _HEADINGS:
+            self._block()
+            if md:
+                self._open_marker('#' * _HEADINGS[tag] + ' ')
+        elif tag == 'br':
+            self._block(1)
+        elif tag == 'hr':
+            self._block()
+            if md:
+                self._emit('---')
+            self._block()
+        elif tag in ('ul', 'ol'):
+            self._block(2 if not self._lists else 1)
+            start = attrs.get('start')
+            self._lists.append([tag == 'ol', int(start) - 1 if start and start.isdigit() else 0])
+        elif tag == 'li':
+            self._block(1)
+            if self._lists:
+                current = self._lists[-1]
+                current[1] += 1
+                indent = '  ' * (len(self._lists) - 1)
+                if md:
+                    self._open_marker(indent + (f'{current[1]}. ' if current[0] else '- '))
+        elif tag == 'blockquote':
+            self._block()
+            if md:
+                self._flush_newlines()  # The blank line before the quote is not part of it
+                self._quote += 1
+        elif tag == 'pre':
+            self._block()
+            if md:
+                self._emit('```')
+            self._newlines = max(self._newlines, 1)
+            self._pre += 1
+            self._pre_start = True
+        elif tag == 'table':
+            self._block()
+            self._rows = 0
+        elif tag == 'tr':
+            self._cells = None
+            self._block(1)
+            self._cells = 0
+        elif tag in ('td', 'th'):
+            if self._cells is not None:
+                if md:
+                    self._open_marker('| ')
+                elif self._cells:
+                    self._emit('\t', space_before=False)
+                self._cells += 1
+        elif not md:
+            return
+        elif tag in _EMPHASIS:
+            self._open_marker(_EMPHASIS[tag])
+        elif tag == 'code' and not self._pre:
+            self._open_marker('`')
+        elif tag == 'a':
+            href = attrs.get('href')
+            if href and not href.startswith(('javascript:', '#')):
+                start, line_start = len(self._parts), self._line_start
+                self._open_marker('[')
+                self._links.append((self._resolve(href), start, len(self._parts), line_start))
+            else:
+                self._links.append(('', -1, -1, False))
+        elif tag == 'img':
+            src = attrs.get('src')
+            if src:
+                self._emit(f"![{(attrs.get('alt') or '').strip()}]({self._resolve(src)})")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in _IGNORED_TAGS:
+            if tag not in _VOID_TAGS:
+                self._ignored = max(self._ignored - 1, 0)
+            return
+        if self._ignored:
+            return
+
+        md = self.markdown
+
+        if tag in _BLOCK_TAGS or tag in _HEADINGS:
+            self._block()
+        elif tag in ('ul', 'ol'):
+            if self._lists:
+                self._lists.pop()
+            self._block(2 if not self._lists else 1)
+        elif tag == 'blockquote':
+            if md:
+                self._quote = max(self._quote - 1, 0)
+            self._block()
+        elif tag == 'pre':
+            self._pre = max(self._pre - 1, 0)
+            if self._parts and self._parts[-1].endswith('\n'):
+                self._parts[-1] = self._parts[-1].rstrip('\n')
+            self._newlines = 1
+            if md:
+                self._emit('```')
+            self._block()
+        elif tag == 'tr':
+            if self._cells is not None:
+                cells = self._cells
+                if md and cells:
+                    self._emit(' |', space_before=False)
+                self._cells = None
+                self._rows += 1
+                if md and cells and self._rows == 1:
+                    # Markdown tables need a header separator after the first row
+                    self._block(1)
+                    self._emit('|' + ' --- |' * cells)
+                self._block(1)
+        elif tag in ('td', 'th'):
+            self._space = True
+        elif tag == 'table':
+            self._cells = None
+            self._block()
+        elif not md:
+            return
+        elif tag in _EMPHASIS:
+            self._emit(_EMPHASIS[tag], space_before=False)
+        elif tag == 'code' and not self._pre:
+            self._emit('`', space_before=False)
+        elif tag == 'a' and self._links:
+            href, start, end, line_start = self._links.pop()
+            if start < 0:
+                return
+            if end == len(self._parts):
+                # Empty link, drop its opening bracket
+                del self._parts[start:]
+                self._at_start = not self._parts
+                self._line_start = line_start
+                self._space = True
+            else:
+                self._emit(f']({href})', space_before=False)
+
+    def handle_data(self, data):
+        if self._ignored:
+            return
+        if self._pre:
+            if self._pre_start and data.startswith('\n'):
+                data = data[1:]  # Like browsers, ignore the newline following <pre>
+            self._pre_start = False
+            if self._quote:
+                data = data.replace('\n', '\n' + self._prefix())
+            self._emit(data, space_before=False)
+            return
+
+        words = data.split()
+        if not words:
+            self._space = self._space or bool(data)
+            return
+        if data[0].isspace():
+            self._space = True
+        self._emit(' '.join(words))
+        self._space = data[-1].isspace()
+
+    def _resolve(self, url: str) -> str:
+        url = url.strip()
+        return urljoin(self.base_url, url) if self.base_url else url
+
+    def result(self) -> str:
+        self.close()
+        return '\n'.join(line.rstrip() for line in ''.join(self._parts).split('\n')).strip()
+
+
+class _CleanHtmlConverter(HTMLParser):
+    """Re-serialize an HTML document without scripts, styles, comments and event handlers"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._parts: List[str] = []
+        self._ignored = 0
+
+    @staticmethod
+    def _attributes(attrs) -> str:
+        kept = []
+        for name, value in attrs:
+            if name.startswith('on') or name == 'style':
+                continue
+            if value is not None and value.strip().lower().startswith('javascript:'):
+                continue
+            kept.append(f' {name}' if value is None else f' {name}="{escape(value)}"')
+        return ''.join(kept)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _IGNORED_TAGS and tag != 'head' or tag == 'link':
+            if tag not in _VOID_TAGS:
+                self._ignored += 1
+            return
+        if not self._ignored:
+            self._parts.append(f'<{tag}{self._attributes(attrs)}>')
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in _IGNORED_TAGS and tag != 'head' or tag == 'link':
+            if tag not in _VOID_TAGS:
+                self._ignored = max(self._ignored - 1, 0)
+            return
+        if not self._ignored and tag not in _VOID_TAGS:
+            self._parts.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        if not self._ignored:
+            self._parts.append(escape(data, quote=False))
+
+    def handle_decl(self, decl):
+        self._parts.append(f'<!{decl}>')
+
+    def result(self) -> str:
+        self.close()
+        return ''.join(self._parts).strip()
+
+
+def convert_html(html: str, format: str = 'markdown', base_url: Optional[str] = None) -> str:
+    """
+    Convert an HTML document to markdown, text or clean HTML
+
+    Args:
+        html: HTML document
+        format: 'markdown', 'text' or 'clean_html'
+        base_url: URL of the page, relative links and images are resolved
+            against it in markdown
+
+    Returns:
+        The converted content
+
+    Example:
+        ```python
+        from scrapfly import convert_html
+
+        markdown = convert_html(record.content.decode(), base_url=record.url)
+        ```
+    """
+    if format == 'markdown':
+        converter = _TextConverter(markdown=True, base_url=base_url)
+    elif format == 'text':
+        converter = _TextConverter(markdown=False)
+    elif format == 'clean_html':
+        converter = _CleanHtmlConverter()
+    else:
+        raise ValueError(f"Unsupported local format: {format!r}, expected one of {', '.join(LOCAL_FORMATS)}")
+    converter.feed(html)
+    return converter.result()
+
+
+def _convert_batch(pages: List[Tuple[str, str]], format: str) -> List[str]:
+    """Worker entry point: convert a batch of (url, html) pages"""
+    return [convert_html(html, format, base_url=url) for url, html in pages]
+
+
+def _is_html(headers: Dict[str, str]) -> bool:
+    for key, value in headers.items():
+        if key.lower() == 'content-type':
+            return value.split(';', 1)[0].strip().lower() in HTML_CONTENT_TYPES
+    return True  # No content type, most likely a page
+
+
+def iter_converted(
+    source: ExportSource,
+    format: str = 'markdown',
+    pattern: str = '*',
+    processes: Optional[int] = None,
+    batch_size: int = 16,
+    crawl_uuid: Optional[str] = None,
+) -> Iterator[CrawlContent]:
+    """
+    Convert the HTML pages of an artifact locally, streaming through the archive
+
+    Pages are converted in batches of ``batch_size`` on ``processes`` worker
+    processes, at most two batches per worker in flight, and yielded in
+    archive order. Non-HTML responses (images, JSON, PDF...) are skipped.
+
+    Args:
+        source: Artifact (CrawlerArtifactResponse), WarcParser or HarArchive
+        format: 'markdown', 'text' or 'clean_html'
+        pattern: Only convert the URLs matching this wildcard pattern
+        processes: Number of worker processes (default: number of CPUs),
+            1 converts in-process
+        batch_size: Number of pages handed to a worker at once
+        crawl_uuid: Crawl UUID set on the CrawlContent objects
+
+    Yields:
+        CrawlContent: Each converted page
+
+    Example:
+        ```python
+        from scrapfly import iter_converted
+
+        artifact = crawl.download('crawl.warc.gz')
+        for content in iter_converted(artifact, format='markdown', processes=4):
+            index(content.url, content.content)
+        ```
+    """
+    if format not in LOCAL_FORMATS:
+        raise ValueError(f"Unsupported local format: {format!r}, expected one of {', '.join(LOCAL_FORMATS)}")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    def accept(url: str, headers: Dict[str, str]) -> bool:
+        return fnmatch.fnmatch(url, pattern) and _is_html(headers)
+
+    def batches() -> Iterator[List[Dict[str, Any]]]:
+        batch = []
+        # Skipped pages (images, PDFs, other URLs) are filtered before their body is decoded
+        for row in iter_page_rows(source, accept=accept):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def contents(rows: List[Dict[str, Any]], converted: List[str]) -> Iterator[CrawlContent]:
+        for row, content in zip(rows, converted):
+            yield CrawlContent(
+                url=row['url'],
+                content=content,
+                status_code=row['status_code'],
+                headers=row['headers'],
+                duration=row['duration'],
+                log_id=row['log_id'],
+                country=row['country'],
+                crawl_uuid=crawl_uuid,
+            )
+
+    def pages(rows: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        return [(row['url'], row['content']) for row in rows]
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        for rows in batches():
+            yield from contents(rows, _convert_batch(pages(rows), format))
+        return
+
+    max_in_flight = processes * 2
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        in_flight = deque()
+        for rows in batches():
+            in_flight.append((rows, executor.submit(_convert_batch, pages(rows), format)))
+            if len(in_flight) >= max_in_flight:
+                done_rows, future = in_flight.popleft()
+                yield from contents(done_rows, future.result())
+        while in_flight:
+            done_rows, future = in_flight.popleft()
+            yield from contents(done_rows, future.result())
@@ -5,15 +5,14 @@ This module provides a Crawl object that manages the state and lifecycle
 of a crawler job, making it easy to start, monitor, and retrieve results.
 """
 
-from typing import Optional, Dict, Any, List, Literal, Iterator, Tuple
+from typing import Optional, Dict, Any, Iterable, List, Literal, Iterator, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 import time
 import fnmatch
 import logging
-from email import message_from_string
-from email.parser import BytesParser
-from email.policy import default
 from .crawler_config import CrawlerConfig
-from .crawler_response import CrawlerArtifactResponse, CrawlerStatusResponse, CrawlerUrlsResponse
+from .crawler_response import CrawlerArtifactResponse, CrawlerStatusResponse, CrawlerUrlsResponse, CrawlerUrlEntry
 from .crawl_content import CrawlContent
 from ..errors import ScrapflyCrawlerError
 
@@ -151,11 +150,17 @@ class Crawl:
         max_wait: Optional[int] = None,
         verbose: bool = False,
         allow_cancelled: bool = False,
+        webhook_receiver: Optional['CrawlerWebhookReceiver'] = None,
+        fallback_interval: float = 60,
     ) -> 'Crawl':
         """
         Wait for crawler to complete
 
-        Polls the status endpoint until the crawler finishes.
+        Polls the status endpoint until the crawler finishes. With a
+        ``webhook_receiver``, the wait blocks on the crawler lifecycle webhook
+        instead: the status is checked when the webhook arrives, and only every
+        ``fallback_interval`` seconds otherwise as a safety net against lost
+        deliveries.
 
         Args:
             poll_interval: Seconds between status checks (default: 5)
@@ -167,6 +172,10 @@ class Crawl:
                 cancellation. Defaults to False (raises ScrapflyCrawlerError
                 with code='CANCELLED' on user_cancelled), preserving prior
                 behavior for callers that observe external cancellations.
+            webhook_receiver: CrawlerWebhookReceiver receiving the crawler
+                webhooks (the crawl must be configured with ``webhook_name``)
+            fallback_interval: Seconds between two status checks while
+                waiting for the webhook
 
         Returns:
             Self for method chaining
@@ -186,6 +195,10 @@ class Crawl:
             # Cancel from the same call site, then wait without re-raising
             crawl.cancel()
             crawl.wait(allow_cancelled=True)
+
+            # Wake up on the crawler_finished webhook instead of polling
+            with CrawlerWebhookReceiver(signing_secrets=('secret',), port=8080) as receiver:
+                crawl.crawl().wait(webhook_receiver=receiver)
             ```
         """
         if self._uuid is None:
@@ -197,6 +210,7 @@ class Crawl:
 
         start_time = time.time()
         poll_count = 0
+        webhook_received = False
 
         while True:
             status = self.status(refresh=True)
@@ -207,6 +221,10 @@ class Crawl:
                            f"{status.progress_pct:.1f}% - "
                            f"{status.state.urls_visited}/{status.state.urls_extracted} URLs")
 
+            if webhook_receiver is not None and status.is_finished:
+                # Seen by polling first: the webhook is not waited for anymore
+                webhook_receiver.discard(self._uuid)
+
             if status.is_complete:
                 if verbose:
                     logger.info(f"✓ Crawler completed successfully!")
@@ -229,6 +247,7 @@ class Crawl:
                 )
 
             # Check timeout
+            remaining = None
             if max_wait is not None:
                 elapsed = time.time() - start_time
                 if elapsed > max_wait:
@@ -237,8 +256,18 @@ class Crawl:
                         code="TIMEOUT",
                         http_status_code=400
                     )
-
-            time.sleep(poll_interval)
+                remaining = max_wait - elapsed
+
+            if webhook_receiver is None or webhook_received:
+                # No webhook, or the status lags behind it: regular polling
+                time.sleep(poll_interval)
+            else:
+                timeout = fallback_interval if remaining is None else min(fallback_interval, remaining)
+                webhook = webhook_receiver.wait_for(self._uuid, timeout=timeout)
+                if webhook is not None:
+                    webhook_received = True
+                    if verbose:
+                        logger.info(f"Received {webhook.event} webhook")
 
     def cancel(self) -> bool:
         """
@@ -312,6 +341,43 @@ class Crawl:
             per_page=per_page,
         )
 
+    def iter_all_urls(
+        self,
+        status: Optional[Literal['visited', 'pending', 'failed', 'skipped']] = None,
+        per_page: int = 1000,
+    ) -> Iterator[CrawlerUrlEntry]:
+        """
+        Iterate through all the crawled URLs, fetching pages automatically
+
+        Convenience wrapper around :meth:`ScrapflyClient.iter_crawl_urls`:
+        the next page is prefetched while the current one is consumed, and
+        memory use does not grow with the number of URLs.
+
+        Args:
+            status: Filter by URL status — 'visited', 'pending', 'failed' or 'skipped'.
+                When None, the server defaults to 'visited'.
+            per_page: Page size (default 1000, max 1000)
+
+        Yields:
+            CrawlerUrlEntry records
+
+        Raises:
+            ScrapflyCrawlerError: if the crawler has not been started yet.
+
+        Example:
+            ```python
+            for entry in crawl.iter_all_urls(status='failed'):
+                print(f"{entry.url}: {entry.reason}")
+            ```
+        """
+        if self._uuid is None:
+            raise ScrapflyCrawlerError(
+                message="Crawler not started yet. Call crawl() first.",
+                code="NOT_STARTED",
+                http_status_code=400,
+            )
+        return self._client.iter_crawl_urls(uuid=self._uuid, status=status, per_page=per_page)
+
     def warc(self, artifact_type: str = 'warc') -> CrawlerArtifactResponse:
         """
         Download the crawler artifact (WARC file)
@@ -353,6 +419,63 @@ class Crawl:
 
         return self._artifact_cache
 
+    def download(
+        self,
+        path: str,
+        artifact_type: str = 'warc',
+        resume: bool = True,
+        checksum: Optional[str] = None
+    ) -> CrawlerArtifactResponse:
+        """
+        Stream the crawler artifact to a local file
+
+        Use this instead of warc() for large crawls: the artifact is written to
+        disk as it downloads and parsed from the file afterwards, so its size is
+        limited by disk space instead of RAM. A WARC downloaded this way is also
+        used by warc(), read() and read_iter().
+
+        Args:
+            path: Destination file path
+            artifact_type: Type of artifact to download ('warc' or 'har')
+            resume: Resume an interrupted download from ``<path>.part``
+            checksum: Expected digest as ``<algorithm>:<hexdigest>``
+
+        Returns:
+            CrawlerArtifactResponse backed by the downloaded file
+
+        Raises:
+            ScrapflyCrawlerError: If crawler not started yet or the download is
+                incomplete/corrupted
+
+        Example:
+            ```python
+            crawl.crawl().wait()
+            artifact = crawl.download('crawl.warc.gz')
+
+            for record in artifact.iter_responses():
+                print(record.url)
+            ```
+        """
+        if self._uuid is None:
+            raise ScrapflyCrawlerError(
+                message="Crawler not started yet. Call crawl() first.",
+                code="NOT_STARTED",
+                http_status_code=400
+            )
+
+        artifact = self._client.download_crawl_artifact(
+            self._uuid,
+            path,
+            artifact_type=artifact_type,
+            resume=resume,
+            checksum=checksum
+        )
+
+        if artifact_type == 'warc':
+            self._artifact_cache = artifact
+
+        return artifact
+
     def har(self) -> CrawlerArtifactResponse:
         """
         Download the crawler artifact in HAR (HTTP Archive) format
@@ -552,8 +675,9 @@ class Crawl:
         # For HTML format, use WARC artifact (faster)
         if format == 'html':
             artifact = self.warc()
-            for record in artifact.iter_responses():
-                if fnmatch.fnmatch(record.url, pattern):
+            for record in artifact.iter_records():
+                # Match on WARC headers first, the HTTP payload of skipped records is never parsed
+                if record.record_type == 'response' and fnmatch.fnmatch(record.url, pattern) and record.status_code:
                     # Extract metadata from WARC headers
                     warc_headers = record.warc_headers or {}
                     duration_str = warc_headers.get('WARC-Scrape-Duration')
@@ -661,6 +785,41 @@ class Crawl:
                 print(f"{url}: {len(markdown)} chars markdown, {len(text)} chars text")
             ```
 
+        Raises:
+            ValueError: If more than 100 URLs are provided
+            ScrapflyCrawlerError: If crawler not started or request fails
+        """
+        result = {}
+        for url, content_format, content in self.iter_batch(urls, formats):
+            result.setdefault(url, {})[content_format] = content
+
+        return result
+
+    def iter_batch(
+        self,
+        urls: List[str],
+        formats: List[ContentFormat] = None
+    ) -> Iterator[Tuple[str, str, str]]:
+        """
+        Stream the content of multiple URLs from a single batch request
+
+        Same request as read_batch(), but each (URL, format) part is yielded
+        as soon as it is received instead of once the whole response is
+        parsed. Maximum 100 URLs per request.
+
+        Args:
+            urls: List of URLs to retrieve (max 100)
+            formats: List of content formats to retrieve, defaults to ['html']
+
+        Yields:
+            (url, format, content) tuples
+
+        Example:
+            ```python
+            for url, format, content in crawl.iter_batch(urls, formats=['markdown']):
+                save(url, content)
+            ```
+
         Raises:
             ValueError: If more than 100 URLs are provided
             ScrapflyCrawlerError: If crawler not started or request fails
@@ -675,114 +834,195 @@ class Crawl:
         if len(urls) > 100:
             raise ValueError("Maximum 100 URLs per batch request")
 
-        if not urls:
-            return {}
+        return self._client.iter_crawl_contents_batch(self._uuid, urls, formats=formats)
 
-        # Default to html if no formats specified
-        if formats is None:
-            formats = ['html']
+    def read_many(
+        self,
+        urls: Iterable[str],
+        formats: List[ContentFormat] = None,
+        concurrency: int = 4,
+        batch_size: int = 100,
+    ) -> Iterator[Tuple[str, str, str]]:
+        """
+        Retrieve content for any number of URLs with concurrent batch requests
 
-        # Build URL with formats parameter
-        formats_str = ','.join(formats)
-        url = f"{self._client.host}/crawl/{self._uuid}/contents/batch"
-        params = {
-            'key': self._client.key,
-            'formats': formats_str
-        }
+        URLs are split into batches of up to 100 URLs (see read_batch()), and
+        up to ``concurrency`` batches are requested at once over pooled
+        connections. Results are yielded as batches complete, so memory holds
+        at most ``concurrency`` batches whatever the number of URLs.
 
-        # Prepare request body (newline-separated URLs)
-        body = '\n'.join(urls)
-
-        # Make request
-        import requests
-        response = requests.post(
-            url,
-            params=params,
-            data=body.encode('utf-8'),
-            headers={'Content-Type': 'text/plain'},
-            verify=self._client.verify
-        )
+        Args:
+            urls: URLs to retrieve, any iterable (e.g. a generator over iter_all_urls())
+            formats: List of content formats to retrieve, defaults to ['html']
+            concurrency: Maximum number of batch requests in flight
+            batch_size: URLs per batch request (max 100)
 
-        if response.status_code != 200:
-            raise ScrapflyCrawlerError(
-                message=f"Batch content request failed: {response.status_code}",
-                code="BATCH_REQUEST_FAILED",
-                http_status_code=response.status_code
-            )
+        Yields:
+            (url, format, content) tuples, grouped by batch in completion order
 
-        # Parse multipart response
-        content_type = response.headers.get('Content-Type', '')
-        if not content_type.startswith('multipart/related'):
+        Raises:
+            ValueError: If batch_size is above 100
+            ScrapflyCrawlerError: If crawler not started or a batch request fails
+
+        Example:
+            ```python
+            urls = (entry.url for entry in crawl.iter_all_urls(status='visited'))
+            for url, format, content in crawl.read_many(urls, formats=['markdown'], concurrency=8):
+                save(url, content)
+            ```
+        """
+        if self._uuid is None:
             raise ScrapflyCrawlerError(
-                message=f"Unexpected content type: {content_type}",
-                code="INVALID_RESPONSE",
-                http_status_code=500
+                message="Crawler not started yet. Call crawl() first.",
+                code="NOT_STARTED",
+                http_status_code=400
             )
 
-        # Extract boundary from Content-Type header
-        boundary = None
-        for part in content_type.split(';'):
-            part = part.strip()
-            if part.startswith('boundary='):
-                boundary = part.split('=', 1)[1]
-                break
+        if not 0 < batch_size <= 100:
+            raise ValueError("Maximum 100 URLs per batch request")
+
+        return self._read_many(iter(urls), formats, concurrency, batch_size)
+
+    def _read_many(self, urls: Iterator[str], formats, concurrency: int, batch_size: int) -> Iterator[Tuple[str, str, str]]:
+        def read(batch):
+            return list(self.iter_batch(batch, formats))
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = set()
+            try:
+                while True:
+                    # Keep the pool busy, batches are only built when a slot frees up
+                    while len(in_flight) < concurrency:
+                        batch = list(islice(urls, batch_size))
+                        if not batch:
+                            break
+                        in_flight.add(executor.submit(read, batch))
+
+                    if not in_flight:
+                        return
+
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+
+    def tail(
+        self,
+        format: ContentFormat = 'html',
+        poll_interval: float = 5,
+        per_page: int = 1000,
+        max_wait: Optional[int] = None,
+        allow_cancelled: bool = False,
+    ) -> Iterator[CrawlContent]:
+        """
+        Yield the content of pages as they are crawled, while the crawler is running
+
+        Newly visited URLs are listed through the URLs endpoint and their
+        content is fetched with batch requests of 100 URLs, so results
+        can be processed while the crawl goes on instead of after wait().
+        The iteration ends once the crawler is finished and every visited URL
+        has been yielded.
+
+        Args:
+            format: Content format to retrieve
+            poll_interval: Seconds to wait when no new URL was visited
+            per_page: Page size used to list visited URLs (max 1000)
+            max_wait: Maximum seconds to tail the crawler (None = until it finishes)
+            allow_cancelled: If True, end normally when the crawler is cancelled
+                instead of raising (see wait())
+
+        Yields:
+            CrawlContent objects for each visited URL, in crawl order
+
+        Raises:
+            ScrapflyCrawlerError: If crawler not started, failed, cancelled or timed out
+
+        Example:
+            ```python
+            crawl = Crawl(client, config).crawl()
 
-        if not boundary:
+            # Process pages while the crawler is still running
+            for content in crawl.tail(format='markdown'):
+                index(content.url, content.content)
+            ```
+        """
+        if self._uuid is None:
             raise ScrapflyCrawlerError(
-                message="No boundary found in multipart response",
-                code="INVALID_RESPONSE",
-                http_status_code=500
+                message="Crawler not started yet. Call crawl() first.",
+                code="NOT_STARTED",
+                http_status_code=400
             )
 
-        # Parse multipart message
-        # Prepend Content-Type header to make it a valid email message for the parser
-        message_bytes = f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + response.content
-        parser = BytesParser(policy=default)
-        message = parser.parsebytes(message_bytes)
+        start_time = time.time()
+        seen = set()
+        consumed = 0  # position in the visited URLs list
 
-        # Extract content from each part
-        result = {}
+        while True:
+            # Status first: once finished, the URL listing below is complete
+            status = self.status(refresh=True)
 
-        for part in message.walk():
-            # Skip the container itself
-            if part.get_content_maintype() == 'multipart':
-                continue
-
-            # Get the URL from Content-Location header
-            content_location = part.get('Content-Location')
-            if not content_location:
-                continue
-
-            # Get content type to determine format
-            part_content_type = part.get_content_type()
-            format_type = None
-
-            # Map MIME types to format names
-            if 'markdown' in part_content_type:
-                format_type = 'markdown'
-            elif 'plain' in part_content_type:
-                format_type = 'text'
-            elif 'html' in part_content_type:
-                format_type = 'html'
-            elif 'json' in part_content_type:
-                format_type = 'json'
-
-            if not format_type:
-                continue
-
-            # Get content
-            content = part.get_content()
-            if isinstance(content, bytes):
-                content = content.decode('utf-8', errors='replace')
-
-            # Initialize URL dict if needed
-            if content_location not in result:
-                result[content_location] = {}
-
-            # Store content
-            result[content_location][format_type] = content
+            new_urls = []
+            while True:
+                page = self._client.get_crawl_urls(
+                    uuid=self._uuid,
+                    status='visited',
+                    page=consumed // per_page + 1,
+                    per_page=per_page,
+                )
+                entries = page.urls[consumed % per_page:]
+                consumed += len(entries)
+                for entry in entries:
+                    if entry.url not in seen:
+                        seen.add(entry.url)
+                        new_urls.append(entry.url)
+                if len(page) < per_page:
+                    break
+
+            for i in range(0, len(new_urls), 100):
+                chunk = new_urls[i:i + 100]
+                # A single format is requested: each URL has one part, whatever the format its MIME type maps to
+                parts = {}
+                for url, _, content, status_code in self._client._iter_crawl_content_parts(self._uuid, chunk, [format]):
+                    parts.setdefault(url, (content, status_code))
+                for url in chunk:
+                    if url in parts:
+                        content, status_code = parts[url]
+                        yield CrawlContent(
+                            url=url,
+                            content=content,
+                            # The URLs listing has no status code, it is sent in the X-Scrapfly-Scrape-Status part header
+                            status_code=status_code if status_code is not None else 200,
+                            crawl_uuid=self._uuid
+                        )
 
-        return result
+            if status.is_complete:
+                return
+            elif status.is_failed:
+                raise ScrapflyCrawlerError(
+                    message=f"Crawler failed with status: {status.status}",
+                    code="FAILED",
+                    http_status_code=400
+                )
+            elif status.is_cancelled:
+                if allow_cancelled:
+                    return
+                raise ScrapflyCrawlerError(
+                    message="Crawler was cancelled",
+                    code="CANCELLED",
+                    http_status_code=400
+                )
+
+            if max_wait is not None and time.time() - start_time > max_wait:
+                raise ScrapflyCrawlerError(
+                    message=f"Timeout tailing crawler (>{max_wait}s)",
+                    code="TIMEOUT",
+                    http_status_code=400
+                )
+
+            if not new_urls:
+                time.sleep(poll_interval)
 
     def stats(self) -> Dict[str, Any]:
         """
@@ -798,6 +1038,7 @@ class Crawl:
             print(f"URLs visited: {stats['urls_visited']}")
             print(f"Crawl rate: {stats['crawl_rate']:.1f}%")
             print(f"Total size: {stats['total_size_kb']:.2f} KB")
+            print(stats['status_codes'])  # {200: 95, 404: 5}
             ```
         """
         status = self.status(refresh=False)
@@ -824,22 +1065,25 @@ class Crawl:
 
         # Add artifact stats if available
         if self._artifact_cache is not None:
-            pages = self._artifact_cache.get_pages()
-            total_size = sum(len(p['content']) for p in pages)
-            avg_size = total_size / len(pages) if pages else 0
+            artifact_stats = self._artifact_cache.stats()
+            pages = artifact_stats['pages']
+            total_size = artifact_stats['total_size_bytes']
+            avg_size = artifact_stats['avg_page_size_bytes']
 
             stats_dict.update({
-                'pages_downloaded': len(pages),
+                'pages_downloaded': pages,
                 'total_size_bytes': total_size,
                 'total_size_kb': total_size / 1024,
                 'total_size_mb': total_size / (1024 * 1024),
                 'avg_page_size_bytes': avg_size,
                 'avg_page_size_kb': avg_size / 1024,
+                'status_codes': artifact_stats['status_codes'],
+                'content_types': artifact_stats['content_types'],
             })
 
             # Calculate download rate (pages vs extracted)
             if status.state.urls_extracted > 0:
-                stats_dict['download_rate'] = (len(pages) / status.state.urls_extracted) * 100
+                stats_dict['download_rate'] = (pages / status.state.urls_extracted) * 100
 
         return stats_dict
 
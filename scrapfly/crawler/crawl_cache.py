@@ -0,0 +1,265 @@
+"""
+Crawl Cache - Local on-disk cache of finished crawl results
+
+Finished crawls are immutable, so their artifacts (WARC/HAR) and contents can
+be kept locally and reused by every later run instead of being downloaded
+again. Entries are files named after the SHA-256 of their key (crawl UUID and
+artifact type, or crawl UUID, URL and format for contents), grouped by crawl
+UUID. The cache is bounded in size: the least recently used entries are
+evicted first.
+
+Layout::
+
+    <directory>/<crawl uuid>/<sha256 of the entry key>
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid as uuid_lib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+_TMP_SUFFIX = '.tmp'
+
+
+class CrawlCache:
+    """
+    Size-bounded LRU cache of crawl artifacts and contents on disk
+
+    Pass it to the client to make ``Crawl.warc()``, ``Crawl.har()``,
+    ``get_crawl_contents()`` and batch content reads check it first. Only
+    results of finished crawls are stored.
+
+    The recency of entries is kept in the file modification times, so the
+    cache directory can be shared by successive runs and processes. Artifacts
+    returned by the client are pinned while they are referenced, a later
+    write never evicts a file still being parsed (pins are per process).
+
+    Example:
+        ```python
+        from scrapfly import ScrapflyClient, CrawlCache
+
+        client = ScrapflyClient(key='your-key', crawler_cache=CrawlCache('~/.cache/scrapfly', max_size=20 * 1024 ** 3))
+
+        # Downloaded once, read from disk afterwards
+        artifact = client.get_crawl_artifact(uuid)
+        contents = client.get_crawl_contents(uuid, format='markdown')
+        ```
+    """
+
+    DEFAULT_MAX_SIZE = 5 * 1024 ** 3  # 5 GiB
+
+    def __init__(self, directory: str, max_size: Optional[int] = DEFAULT_MAX_SIZE):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            max_size: Maximum total size of the cached files in bytes
+                (None = unbounded)
+        """
+        self.directory = os.path.abspath(os.path.expanduser(os.fspath(directory)))
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # path -> size, least recently used first
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._size = 0
+        # path -> number of holders, pinned entries are never evicted
+        self._pins: Dict[str, int] = {}
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Load the existing entries, ordered by last use"""
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if _TMP_SUFFIX in name:
+                    continue  # Leftover of an interrupted write
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, path, stat.st_size))
+
+        for _, path, size in sorted(found):
+            self._entries[path] = size
+            self._size += size
+
+    def _path(self, crawl_uuid: str, *key: str) -> str:
+        digest = hashlib.sha256('\0'.join(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, crawl_uuid, digest)
+
+    def _hit(self, path: str, pin: bool = False) -> Optional[str]:
+        """Mark an entry as used (and pin it), returns its path or None on a miss"""
+        with self._lock:
+            try:
+                os.utime(path)
+                size = os.path.getsize(path)
+            except OSError:
+                if path in self._entries:
+                    self._size -= self._entries.pop(path)
+                return None
+
+            # Entries written by another process are picked up on their first use
+            self._size += size - self._entries.pop(path, 0)
+            self._entries[path] = size
+            if pin:
+                self._pins[path] = self._pins.get(path, 0) + 1
+        return path
+
+    def _add(self, path: str, tmp_path: str, pin: bool = False):
+        """Move a complete temporary file in place and evict entries over the size limit"""
+        size = os.path.getsize(tmp_path)
+
+        with self._lock:
+            os.replace(tmp_path, path)
+            self._size += size - self._entries.pop(path, 0)
+            self._entries[path] = size
+            if pin:
+                self._pins[path] = self._pins.get(path, 0) + 1
+
+            if self.max_size is not None and self._size > self.max_size:
+                # Least recently used first, the new entry and the pinned ones are kept
+                evicted = []
+                remaining = self._size
+                for candidate, candidate_size in self._entries.items():
+                    if remaining <= self.max_size:
+                        break
+                    if candidate != path and candidate not in self._pins:
+                        evicted.append(candidate)
+                        remaining -= candidate_size
+
+                # Removed under the lock, so a concurrent _hit() never returns a deleted entry
+                for evicted_path in evicted:
+                    self._size -= self._entries.pop(evicted_path)
+                    try:
+                        os.remove(evicted_path)
+                    except OSError:
+                        pass
+
+    def unpin(self, path: str):
+        """Release an entry pinned by get_artifact_path() or put_artifact_file(), it can be evicted again"""
+        with self._lock:
+            count = self._pins.get(path, 0) - 1
+            if count > 0:
+                self._pins[path] = count
+            else:
+                self._pins.pop(path, None)
+
+    def temp_path(self, crawl_uuid: str) -> str:
+        """
+        Get a temporary file path inside the cache, to download an entry to
+        before storing it with put_artifact_file()
+        """
+        os.makedirs(os.path.join(self.directory, crawl_uuid), exist_ok=True)
+        return os.path.join(self.directory, crawl_uuid, uuid_lib.uuid4().hex + _TMP_SUFFIX)
+
+    def get_artifact_path(self, crawl_uuid: str, artifact_type: str, pin: bool = False) -> Optional[str]:
+        """
+        Get the path of a cached artifact
+
+        Args:
+            crawl_uuid: Crawler job UUID
+            artifact_type: Artifact type ('warc' or 'har')
+            pin: Keep the artifact from being evicted by this cache until
+                unpin() is called, for artifacts read from their path later on
+
+        Returns:
+            Path of the artifact file, or None if it is not cached
+        """
+        return self._hit(self._path(crawl_uuid, 'artifact', artifact_type), pin=pin)
+
+    def put_artifact_file(self, crawl_uuid: str, artifact_type: str, file_path: str, pin: bool = False) -> str:
+        """
+        Store an artifact file in the cache
+
+        The file is moved into the cache when it is on the same filesystem
+        (e.g. a temp_path()), copied otherwise.
+
+        Args:
+            crawl_uuid: Crawler job UUID
+            artifact_type: Artifact type ('warc' or 'har')
+            file_path: Artifact file to store
+            pin: Keep the artifact from being evicted until unpin() is called
+
+        Returns:
+            Path of the cached artifact
+        """
+        path = self._path(crawl_uuid, 'artifact', artifact_type)
+        tmp_path = self.temp_path(crawl_uuid)
+        try:
+            os.replace(file_path, tmp_path)
+        except OSError:
+            shutil.copyfile(file_path, tmp_path)
+        self._add(path, tmp_path, pin=pin)
+        return path
+
+    def _get_bytes(self, crawl_uuid: str, *key: str) -> Optional[bytes]:
+        path = self._hit(self._path(crawl_uuid, *key))
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None  # Evicted in the meantime
+
+    def _put_bytes(self, crawl_uuid: str, data: bytes, *key: str):
+        tmp_path = self.temp_path(crawl_uuid)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        self._add(self._path(crawl_uuid, *key), tmp_path)
+
+    def get_contents(self, crawl_uuid: str, format: str) -> Optional[Dict[str, Any]]:
+        """Get a cached get_crawl_contents() result, or None if it is not cached"""
+        data = self._get_bytes(crawl_uuid, 'contents', format)
+        return json.loads(data) if data is not None else None
+
+    def put_contents(self, crawl_uuid: str, format: str, contents: Dict[str, Any]):
+        """Store a get_crawl_contents() result"""
+        self._put_bytes(crawl_uuid, json.dumps(contents).encode('utf-8'), 'contents', format)
+
+    def get_content(self, crawl_uuid: str, url: str, format: str) -> Optional[str]:
+        """Get the cached content of a URL in a format, or None if it is not cached"""
+        data = self._get_bytes(crawl_uuid, 'content', format, url)
+        return data.decode('utf-8') if data is not None else None
+
+    def put_content(self, crawl_uuid: str, url: str, format: str, content: str):
+        """Store the content of a URL in a format"""
+        self._put_bytes(crawl_uuid, content.encode('utf-8'), 'content', format, url)
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached files in bytes"""
+        return self._size
+
+    def clear(self):
+        """Remove every cached entry, except the pinned ones still in use"""
+        with self._lock:
+            for path in list(self._entries):
+                if path not in self._pins:
+                    self._size -= self._entries.pop(path)
+
+            pinned_dirs = {os.path.dirname(path) for path in self._pins}
+            for name in os.listdir(self.directory):
+                crawl_dir = os.path.join(self.directory, name)
+                if crawl_dir not in pinned_dirs:
+                    shutil.rmtree(crawl_dir, ignore_errors=True)
+                    continue
+                for file_name in os.listdir(crawl_dir):
+                    file_path = os.path.join(crawl_dir, file_name)
+                    if file_path not in self._pins:
+                        try:
+                            os.remove(file_path)
+                        except OSError:
+                            pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"CrawlCache(directory={self.directory}, entries={len(self._entries)}, size={self._size})"
@@ -0,0 +1,243 @@
+"""
+Crawl Orchestrator - Run a queue of crawls within the account concurrency
+
+Starting every crawl at once runs into the account concurrency limit, while
+starting them one after another leaves slots idle. The CrawlOrchestrator
+takes a queue of CrawlerConfig and keeps N crawls running: the next crawl is
+started as soon as one finishes, progress is aggregated across crawls and
+each finished crawl is handed to a callback (e.g. to download its artifact)
+running in a thread pool, in parallel with the crawls still running.
+"""
+
+import heapq
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .crawl import Crawl
+from .crawl_waiter import _PollSchedule, _is_finished
+from .crawler_config import CrawlerConfig
+from .crawler_response import CrawlerStatusResponse
+from ..errors import ScrapflyCrawlerError, ScrapflyError
+
+
+class CrawlOrchestrator:
+    """
+    Keep up to N crawls running from a queue of configurations
+
+    Iterating the orchestrator starts the crawls and yields ``(crawl, result)``
+    tuples as crawls finish, ``result`` being the value returned by
+    ``on_finished`` (None without callback). Finished crawls are yielded
+    whatever their outcome: check ``crawl.status(refresh=False)``. Starts
+    rejected by the API with HTTP 429 (account limit reached) are retried once
+    a running crawl finishes.
+
+    Example:
+        ```python
+        from scrapfly import CrawlOrchestrator
+
+        def download(crawl):
+            return crawl.download(f'{crawl.uuid}.warc.gz')
+
+        orchestrator = CrawlOrchestrator(client, configs, concurrency='auto', on_finished=download)
+        for crawl, artifact in orchestrator:
+            print(crawl.uuid, artifact.total_pages, orchestrator.progress())
+        ```
+    """
+
+    def __init__(
+        self,
+        client: 'ScrapflyClient',
+        configs: Iterable[CrawlerConfig],
+        concurrency: Union[int, str] = 'auto',
+        on_finished: Optional[Callable[[Crawl], Any]] = None,
+        callback_workers: int = 4,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        max_wait: Optional[float] = None,
+    ):
+        """
+        Args:
+            client: ScrapflyClient instance
+            configs: Crawler configurations, consumed lazily as slots free up
+            concurrency: Maximum number of crawls running at once, or 'auto'
+                to use the account concurrency
+            on_finished: Called with each finished crawl from a thread pool
+            callback_workers: Maximum number of callbacks running at once
+            min_interval: Shortest delay between two status polls of a crawl, in seconds
+            max_interval: Longest delay between two status polls of a crawl, in seconds
+            max_wait: Maximum seconds to run the whole queue (None = no limit)
+        """
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Expected 0 < min_interval <= max_interval")
+
+        self._client = client
+        self._configs = iter(configs)
+        self._concurrency = concurrency
+        self.on_finished = on_finished
+        self.callback_workers = callback_workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._statuses: Dict[str, CrawlerStatusResponse] = {}
+        self._running = 0
+        self._finished = 0
+
+    @property
+    def concurrency(self) -> int:
+        """Maximum number of crawls running at once"""
+        if self._concurrency == self._client.CONCURRENCY_AUTO:
+            self._concurrency = self._client.account()['subscription']['max_concurrency']
+        return self._concurrency
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Aggregate the last known status of every started crawl
+
+        Safe to call from ``on_finished`` or another thread.
+
+        Returns:
+            Dict with crawls_running, crawls_finished and the sums of
+            urls_visited, urls_extracted, urls_failed, urls_skipped and
+            api_credit_used
+        """
+        with self._lock:
+            statuses = list(self._statuses.values())
+            progress = {'crawls_running': self._running, 'crawls_finished': self._finished}
+
+        for field in ('urls_visited', 'urls_extracted', 'urls_failed', 'urls_skipped', 'api_credit_used'):
+            progress[field] = sum(getattr(status.state, field) or 0 for status in statuses)
+        return progress
+
+    def _timeout_error(self) -> ScrapflyCrawlerError:
+        return ScrapflyCrawlerError(
+            message=f"Timeout running the crawl queue (>{self.max_wait}s)",
+            code="TIMEOUT",
+            http_status_code=400
+        )
+
+    def __iter__(self) -> Iterator[Tuple[Crawl, Any]]:
+        """
+        Run the queue, yielding crawls as they finish (and their callback completes)
+
+        Raises:
+            ScrapflyCrawlerError: On timeout (``max_wait``)
+            ScrapflyError: If a crawl can't be started, or the exception raised by ``on_finished``
+        """
+        concurrency = self.concurrency
+        start_time = time.monotonic()
+        pending: List[CrawlerConfig] = []  # starts rejected by the account limit, retried first
+        queue_empty = False
+        starting = 0
+        schedules: Dict[int, _PollSchedule] = {}
+        # (next poll time, sequence, crawl) of the running crawls
+        polls: List[Tuple[float, int, Crawl]] = []
+        sequence = 0
+        retry_at = 0.0
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor, \
+                ThreadPoolExecutor(max_workers=self.callback_workers) as callback_executor:
+            in_flight: Dict[Future, Tuple[str, Any]] = {}
+
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self.max_wait is not None and now - start_time > self.max_wait:
+                        raise self._timeout_error()
+
+                    # Fill the free slots
+                    while self._running + starting < concurrency and now >= retry_at:
+                        if pending:
+                            config = pending.pop()
+                        elif not queue_empty:
+                            config = next(self._configs, None)
+                            if config is None:
+                                queue_empty = True
+                                break
+                        else:
+                            break
+                        crawl = Crawl(self._client, config)
+                        in_flight[executor.submit(crawl.crawl)] = ('start', crawl)
+                        starting += 1
+
+                    # Poll the running crawls that are due
+                    while polls and polls[0][0] <= now:
+                        _, position, crawl = heapq.heappop(polls)
+                        in_flight[executor.submit(crawl.status, True)] = ('status', (position, crawl))
+
+                    if not in_flight and not polls and (queue_empty and not pending):
+                        return
+
+                    timeout = max(polls[0][0] - now, 0) if polls else None
+                    if pending:
+                        timeout = max(retry_at - now, 0) if timeout is None else min(timeout, max(retry_at - now, 0))
+                    if self.max_wait is not None:
+                        deadline = max(start_time + self.max_wait - now, 0)
+                        timeout = deadline if timeout is None else min(timeout, deadline)
+
+                    if not in_flight:
+                        time.sleep(timeout or 0)
+                        continue
+
+                    done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        kind, value = in_flight.pop(future)
+                        now = time.monotonic()
+
+                        if kind == 'start':
+                            starting -= 1
+                            try:
+                                future.result()
+                            except ScrapflyError as e:
+                                if e.http_status_code != 429:
+                                    raise
+                                # Account limit reached: retry once a slot frees up
+                                pending.append(value._config)
+                                retry_at = now + (self.max_interval if self._running else self.min_interval)
+                                continue
+                            with self._lock:
+                                self._running += 1
+                            sequence += 1
+                            schedules[sequence] = _PollSchedule(self.min_interval)
+                            heapq.heappush(polls, (now + self.min_interval, sequence, value))
+
+                        elif kind == 'status':
+                            position, crawl = value
+                            status = future.result()
+                            with self._lock:
+                                self._statuses[crawl.uuid] = status
+                            if not _is_finished(status):
+                                delay = schedules[position].next_interval(status, now, self.min_interval, self.max_interval)
+                                heapq.heappush(polls, (now + delay, position, crawl))
+                                continue
+
+                            del schedules[position]
+                            with self._lock:
+                                self._running -= 1
+                                self._finished += 1
+                            retry_at = 0.0
+                            if self.on_finished is None:
+                                yield crawl, None
+                            else:
+                                in_flight[callback_executor.submit(self.on_finished, crawl)] = ('callback', crawl)
+
+                        else:
+                            yield value, future.result()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+
+    def run(self) -> List[Tuple[Crawl, Any]]:
+        """
+        Block until every crawl of the queue is finished and processed
+
+        Returns:
+            ``(crawl, result)`` tuples, in the order the crawls finished
+        """
+        return list(self)
+
+    def __repr__(self):
+        return f"CrawlOrchestrator(running={self._running}, finished={self._finished})"
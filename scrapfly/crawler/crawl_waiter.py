@@ -0,0 +1,237 @@
+"""
+Crawl Waiter - Wait on many crawler jobs at once
+
+Crawl.wait() blocks one thread per crawl on a fixed polling interval. The
+CrawlWaiter tracks any number of Crawl objects, polls their status from a
+small thread pool (over the client's pooled crawler connections) and adapts
+each crawl's polling interval to its progress rate, so fast crawls are
+picked up as soon as they finish while slow ones are polled rarely.
+"""
+
+import asyncio
+import heapq
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .crawl import Crawl
+from .crawler_response import CrawlerStatusResponse
+from ..errors import ScrapflyCrawlerError
+
+
+class _PollSchedule:
+    """Progress tracking and next poll delay of one crawl"""
+
+    __slots__ = ('interval', 'last_time', 'last_done')
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.last_time: Optional[float] = None
+        self.last_done: Optional[int] = None
+
+    def next_interval(self, status: CrawlerStatusResponse, now: float, min_interval: float, max_interval: float) -> float:
+        """
+        Compute the delay before the next poll from the crawl progress
+
+        The crawl rate (visited + failed URLs per second) between two polls
+        gives an estimate of the remaining time from ``urls_to_crawl``; the
+        crawl is polled again at half that estimate. Crawls not progressing
+        (pending, or stalled on slow pages) are polled less and less often.
+        """
+        state = status.state
+        done = state.urls_visited + state.urls_failed
+        remaining = max(state.urls_to_crawl - done, 0)
+
+        if self.last_time is not None and done > self.last_done and now > self.last_time:
+            rate = (done - self.last_done) / (now - self.last_time)
+            interval = remaining / rate / 2
+        elif status.progress_pct >= 100 or (done and not remaining):
+            interval = min_interval  # about to finish
+        else:
+            interval = self.interval * 1.5
+
+        self.last_time = now
+        self.last_done = done
+        self.interval = min(max(interval, min_interval), max_interval)
+        return self.interval
+
+
+def _is_finished(status: CrawlerStatusResponse) -> bool:
+    return status.is_complete or status.is_failed or status.is_cancelled or status.is_finished
+
+
+class CrawlWaiter:
+    """
+    Wait for many crawls concurrently, yielding them as they finish
+
+    Finished crawls are yielded whatever their outcome (complete, failed or
+    cancelled): check ``crawl.status(refresh=False)`` to tell them apart.
+    The status of each yielded crawl is cached on the Crawl object.
+
+    Example:
+        ```python
+        from scrapfly import CrawlWaiter
+
+        crawls = [Crawl(client, config).crawl() for config in configs]
+
+        for crawl in CrawlWaiter(crawls, max_wait=3600):
+            if crawl.status(refresh=False).is_complete:
+                process(crawl.warc())
+
+        # asyncio
+        async for crawl in CrawlWaiter(crawls):
+            ...
+        ```
+    """
+
+    def __init__(
+        self,
+        crawls: Iterable[Crawl],
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        max_workers: int = 8,
+        max_wait: Optional[float] = None,
+    ):
+        """
+        Args:
+            crawls: Started Crawl objects to wait for
+            min_interval: Shortest delay between two polls of a crawl, in seconds
+            max_interval: Longest delay between two polls of a crawl, in seconds
+            max_workers: Maximum number of status requests in flight
+            max_wait: Maximum seconds to wait for all crawls (None = wait forever)
+
+        Raises:
+            ScrapflyCrawlerError: If a crawl has not been started
+        """
+        self._crawls: List[Crawl] = list(crawls)
+        for crawl in self._crawls:
+            if crawl.uuid is None:
+                raise ScrapflyCrawlerError(
+                    message="Crawler not started yet. Call crawl() first.",
+                    code="NOT_STARTED",
+                    http_status_code=400
+                )
+
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Expected 0 < min_interval <= max_interval")
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_workers = max_workers
+        self.max_wait = max_wait
+
+    def _timeout_error(self) -> ScrapflyCrawlerError:
+        return ScrapflyCrawlerError(
+            message=f"Timeout waiting for crawlers (>{self.max_wait}s)",
+            code="TIMEOUT",
+            http_status_code=400
+        )
+
+    def __iter__(self) -> Iterator[Crawl]:
+        """
+        Poll the crawls from a thread pool and yield them as they finish
+
+        Raises:
+            ScrapflyCrawlerError: On timeout (``max_wait``)
+        """
+        start_time = time.monotonic()
+        schedules = [_PollSchedule(self.min_interval) for _ in self._crawls]
+        # (next poll time, crawl position) of the crawls waiting for their next poll
+        queue: List[Tuple[float, int]] = [(start_time, position) for position in range(len(self._crawls))]
+        heapq.heapify(queue)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight: Dict = {}
+
+            try:
+                while queue or in_flight:
+                    now = time.monotonic()
+                    if self.max_wait is not None and now - start_time > self.max_wait:
+                        raise self._timeout_error()
+
+                    while queue and queue[0][0] <= now and len(in_flight) < self.max_workers:
+                        _, position = heapq.heappop(queue)
+                        future = executor.submit(self._crawls[position].status, True)
+                        in_flight[future] = position
+
+                    timeout = max(queue[0][0] - now, 0) if queue and len(in_flight) < self.max_workers else None
+                    if self.max_wait is not None:
+                        deadline = start_time + self.max_wait - now
+                        timeout = deadline if timeout is None else min(timeout, deadline)
+
+                    if not in_flight:
+                        time.sleep(max(timeout or 0, 0))
+                        continue
+
+                    done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        position = in_flight.pop(future)
+                        status = future.result()
+                        now = time.monotonic()
+                        if _is_finished(status):
+                            yield self._crawls[position]
+                        else:
+                            delay = schedules[position].next_interval(status, now, self.min_interval, self.max_interval)
+                            heapq.heappush(queue, (now + delay, position))
+            finally:
+                for future in in_flight:
+                    future.cancel()
+
+    async def __aiter__(self) -> AsyncIterator[Crawl]:
+        """
+        asyncio variant: status requests run in a thread pool, crawls are
+        yielded as they finish
+
+        Raises:
+            ScrapflyCrawlerError: On timeout (``max_wait``)
+        """
+        loop = asyncio.get_running_loop()
+        finished: asyncio.Queue = asyncio.Queue()
+        # Not a context manager: its exit would block the event loop on the status requests in flight
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def poll(crawl: Crawl):
+            schedule = _PollSchedule(self.min_interval)
+            while True:
+                async with semaphore:
+                    status = await loop.run_in_executor(executor, crawl.status, True)
+                if _is_finished(status):
+                    return crawl
+                delay = schedule.next_interval(status, loop.time(), self.min_interval, self.max_interval)
+                await asyncio.sleep(delay)
+
+        tasks = [loop.create_task(poll(crawl)) for crawl in self._crawls]
+        for task in tasks:
+            task.add_done_callback(finished.put_nowait)
+
+        deadline = None if self.max_wait is None else loop.time() + self.max_wait
+        try:
+            for _ in range(len(tasks)):
+                timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                try:
+                    task = await asyncio.wait_for(finished.get(), timeout)
+                except asyncio.TimeoutError:
+                    raise self._timeout_error() from None
+                yield task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Requests still running finish in the background, their result is dropped
+            executor.shutdown(wait=False)
+
+    def wait_all(self) -> List[Crawl]:
+        """
+        Block until every crawl is finished
+
+        Returns:
+            The crawls, in the order they finished
+        """
+        return list(self)
+
+    def __len__(self) -> int:
+        return len(self._crawls)
+
+    def __repr__(self):
+        return f"CrawlWaiter(crawls={len(self._crawls)})"
@@ -4,9 +4,13 @@ Crawler API Response Classes
 This module provides response wrapper classes for the Crawler API.
 """
 
-from typing import Optional, Dict, Any, Iterator, List, Union
+import os
+import shutil
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Union
 from .warc_utils import WarcParser, WarcRecord, parse_warc
 from .har_utils import HarArchive, HarEntry
+from .warc_index import page_stats
+from .crawl_content import CrawlContent
 
 
 class CrawlerStartResponse:
@@ -308,29 +312,52 @@ class CrawlerUrlsResponse:
             page: Caller-provided page (echoed on the response object).
             per_page: Caller-provided per_page (echoed on the response object).
         """
-        entries: List[CrawlerUrlEntry] = []
-        for raw_line in body.splitlines():
+        return cls.from_lines(body.splitlines(), status_hint, page, per_page)
+
+    @classmethod
+    def from_lines(
+        cls,
+        lines: Iterable[str],
+        status_hint: str,
+        page: int,
+        per_page: int,
+    ) -> 'CrawlerUrlsResponse':
+        """
+        Parse the body of ``GET /crawl/{uuid}/urls`` from an iterable of lines.
+
+        Same rules as :meth:`from_text`, for bodies read line by line from
+        the network instead of buffered as one string.
+        """
+        return cls(list(cls.iter_entries(lines, status_hint)), page, per_page)
+
+    @staticmethod
+    def iter_entries(lines: Iterable[str], status_hint: str) -> Iterator[CrawlerUrlEntry]:
+        """
+        Lazily parse lines of ``GET /crawl/{uuid}/urls`` into records.
+
+        Args:
+            lines: Body lines (with or without line terminators).
+            status_hint: The status filter the caller used.
+        """
+        for raw_line in lines:
             line = raw_line.strip()
             if not line:
                 continue
             if status_hint in ('visited', 'pending'):
-                entries.append(CrawlerUrlEntry(url=line, status=status_hint))
+                yield CrawlerUrlEntry(url=line, status=status_hint)
             else:
                 # `url,reason` — split on the first comma only. URLs never
                 # contain an unencoded comma in the path/query, so this is
                 # unambiguous.
                 comma_idx = line.find(',')
                 if comma_idx == -1:
-                    entries.append(CrawlerUrlEntry(url=line, status=status_hint))
+                    yield CrawlerUrlEntry(url=line, status=status_hint)
                 else:
-                    entries.append(
-                        CrawlerUrlEntry(
-                            url=line[:comma_idx],
-                            status=status_hint,
-                            reason=line[comma_idx + 1:] or None,
-                        )
+                    yield CrawlerUrlEntry(
+                        url=line[:comma_idx],
+                        status=status_hint,
+                        reason=line[comma_idx + 1:] or None,
                     )
-        return cls(entries, page, per_page)
 
     def __len__(self) -> int:
         return len(self.urls)
@@ -375,47 +402,109 @@ class CrawlerArtifactResponse:
 
         # Save to file
         artifact.save('crawl_results.warc.gz')
+
+        # Large crawls: stream the artifact to disk and parse it from there
+        artifact = client.download_crawl_artifact(uuid, 'crawl.warc.gz')
+        for record in artifact.iter_responses():
+            process(record.content)
         ```
     """
 
-    def __init__(self, artifact_data: bytes, artifact_type: str = 'warc'):
+    def __init__(
+        self,
+        artifact_data: Optional[bytes] = None,
+        artifact_type: str = 'warc',
+        artifact_path: Optional[str] = None
+    ):
         """
         Initialize from artifact data
 
         Args:
             artifact_data: Raw artifact file bytes
             artifact_type: Type of artifact ('warc' or 'har')
+            artifact_path: Path of an artifact file on disk, used instead of
+                ``artifact_data`` for artifacts too large to fit in memory
         """
+        if artifact_data is None and artifact_path is None:
+            raise ValueError("Either artifact_data or artifact_path must be provided")
+
         self._artifact_data = artifact_data
+        self._artifact_path = os.fspath(artifact_path) if artifact_path is not None else None
         self._artifact_type = artifact_type
         self._warc_parser: Optional[WarcParser] = None
         self._har_parser: Optional[HarArchive] = None
+        self._stats: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_file(cls, filepath: str, artifact_type: str = 'warc') -> 'CrawlerArtifactResponse':
+        """
+        Open an artifact file previously saved to disk
+
+        The file is parsed in place (memory-mapped or streamed), so its size
+        is limited by disk space rather than RAM.
+
+        Args:
+            filepath: Path to the WARC or HAR file
+            artifact_type: Type of artifact ('warc' or 'har')
+
+        Example:
+            ```python
+            artifact = CrawlerArtifactResponse.from_file('crawl.warc.gz')
+            for record in artifact.iter_responses():
+                print(record.url)
+            ```
+        """
+        return cls(artifact_type=artifact_type, artifact_path=filepath)
 
     @property
     def artifact_type(self) -> str:
         """Get artifact type ('warc' or 'har')"""
         return self._artifact_type
 
+    @property
+    def artifact_path(self) -> Optional[str]:
+        """Get the path of the artifact file on disk (None for in-memory artifacts)"""
+        return self._artifact_path
+
     @property
     def artifact_data(self) -> bytes:
-        """Get raw artifact data (for advanced users)"""
+        """
+        Get raw artifact data (for advanced users)
+
+        For file-backed artifacts this reads the whole file in memory, prefer
+        ``artifact_path`` or the iterators for large crawls.
+        """
+        if self._artifact_data is None:
+            with open(self._artifact_path, 'rb') as f:
+                return f.read()
         return self._artifact_data
 
     @property
     def warc_data(self) -> bytes:
         """Get raw WARC data (deprecated, use artifact_data)"""
-        return self._artifact_data
+        return self.artifact_data
+
+    @property
+    def size(self) -> int:
+        """Get artifact size in bytes"""
+        if self._artifact_data is None:
+            return os.path.getsize(self._artifact_path)
+        return len(self._artifact_data)
 
     @property
     def parser(self) -> Union[WarcParser, HarArchive]:
         """Get artifact parser instance (lazy-loaded)"""
         if self._artifact_type == 'har':
             if self._har_parser is None:
-                self._har_parser = HarArchive(self._artifact_data)
+                self._har_parser = HarArchive(
+                    self._artifact_path if self._artifact_data is None else self._artifact_data
+                )
             return self._har_parser
         else:
             if self._warc_parser is None:
-                self._warc_parser = parse_warc(self._artifact_data)
+                self._warc_parser = parse_warc(
+                    self._artifact_path if self._artifact_data is None else self._artifact_data
+                )
             return self._warc_parser
 
     def iter_records(self) -> Iterator[Union[WarcRecord, HarEntry]]:
@@ -482,25 +571,108 @@ class CrawlerArtifactResponse:
         else:
             return self.parser.get_pages()
 
+    def stats(self) -> Dict[str, Any]:
+        """
+        Aggregate page statistics in a single streaming pass
+
+        For WARC only the record headers are parsed (page bodies are measured,
+        not decoded), or the sidecar index is used when the artifact was saved
+        with one. The result is cached on the artifact.
+
+        Returns:
+            Dict with keys: pages, total_size_bytes, avg_page_size_bytes,
+            status_codes ({status: pages}) and content_types ({mime type: pages})
+
+        Example:
+            ```python
+            stats = artifact.stats()
+            print(f"{stats['pages']} pages, {stats['total_size_bytes']} bytes")
+            print(stats['content_types'])  # {'text/html': 90, 'application/json': 10}
+            ```
+        """
+        if self._stats is None:
+            if self._artifact_type == 'har':
+                self._stats = page_stats(
+                    (entry.status_code, entry.content_type, len(entry.content))
+                    for entry in self.parser.iter_entries()
+                )
+            else:
+                self._stats = self.parser.stats()
+        return self._stats
+
     @property
     def total_pages(self) -> int:
         """Get total number of pages in the artifact"""
-        return len(self.get_pages())
+        return self.stats()['pages']
 
-    def save(self, filepath: str):
+    def export(self, path: str, **kwargs) -> int:
+        """
+        Export the pages to Parquet or JSON Lines in one streaming pass
+
+        Args:
+            path: Output file path (``.parquet``, ``.jsonl`` or ``.jsonl.gz``)
+            **kwargs: See export_pages() (format, row_group_size, processes, compression)
+
+        Returns:
+            Number of exported pages
+
+        Example:
+            ```python
+            artifact.export('pages.parquet', processes=4)
+            ```
+        """
+        from .exporter import export_pages
+
+        return export_pages(self, path, **kwargs)
+
+    def convert(self, format: str = 'markdown', **kwargs) -> Iterator[CrawlContent]:
+        """
+        Convert the HTML pages to markdown, text or clean HTML locally
+
+        Args:
+            format: 'markdown', 'text' or 'clean_html'
+            **kwargs: See iter_converted() (pattern, processes, batch_size, crawl_uuid)
+
+        Yields:
+            CrawlContent: Each converted page
+
+        Example:
+            ```python
+            for content in artifact.convert('markdown', processes=4):
+                print(content.url, len(content.content))
+            ```
+        """
+        from .converter import iter_converted
+
+        return iter_converted(self, format, **kwargs)
+
+    def save(self, filepath: str, index: bool = False):
         """
         Save WARC data to file
 
         Args:
             filepath: Path to save the WARC file
+            index: Also write the WARC record index next to the file
+                (``<filepath>.cdxj``), see WarcIndex
 
         Example:
             ```python
-            artifact.save('crawl_results.warc.gz')
+            artifact.save('crawl_results.warc.gz', index=True)
+
+            # Any other process can then seek to records instead of scanning
+            parser = WarcParser('crawl_results.warc.gz')
+            record = parser.read_record(parser.get_index().find(url))
             ```
         """
-        with open(filepath, 'wb') as f:
-            f.write(self.warc_data)
+        if self._artifact_data is None:
+            if os.path.abspath(filepath) != os.path.abspath(self._artifact_path):
+                shutil.copyfile(self._artifact_path, filepath)
+        else:
+            with open(filepath, 'wb') as f:
+                f.write(self._artifact_data)
+
+        if index and self._artifact_type == 'warc':
+            parse_warc(filepath).get_index(save=True)
 
     def __repr__(self):
-        return f"CrawlerArtifactResponse(size={len(self.warc_data)} bytes)"
+        return f"CrawlerArtifactResponse(size={self.size} bytes)"
@@ -25,8 +25,10 @@ Design notes
   :class:`CrawlerStatusResponse`).
 """
 
+import json
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from .crawler_response import CrawlerState
@@ -51,6 +53,30 @@ class CrawlerWebhookEvent(str, Enum):
     CRAWLER_URL_FAILED = 'crawler_url_failed'
 
 
+# Events emitted at most once per crawl, and once per crawl and URL
+_ONCE_PER_CRAWL_EVENTS = frozenset((
+    CrawlerWebhookEvent.CRAWLER_STARTED.value,
+    CrawlerWebhookEvent.CRAWLER_STOPPED.value,
+    CrawlerWebhookEvent.CRAWLER_CANCELLED.value,
+    CrawlerWebhookEvent.CRAWLER_FINISHED.value,
+))
+_ONCE_PER_URL_EVENTS = frozenset((
+    CrawlerWebhookEvent.CRAWLER_URL_VISITED.value,
+    CrawlerWebhookEvent.CRAWLER_URL_FAILED.value,
+))
+
+
+def _delivery_id(event: Optional[str], crawler_uuid: Optional[str], url: Optional[str]) -> Optional[str]:
+    """Identity shared by every delivery (retries included) of one event, None if the event has none"""
+    if crawler_uuid is None:
+        return None
+    if event in _ONCE_PER_CRAWL_EVENTS:
+        return f'{crawler_uuid}:{event}'
+    if event in _ONCE_PER_URL_EVENTS and url is not None:
+        return f'{crawler_uuid}:{event}:{url}'
+    return None
+
+
 # ---------------------------------------------------------------------------
 # Base / common fields
 # ---------------------------------------------------------------------------
@@ -79,6 +105,17 @@ class CrawlerWebhookBase:
     action: str
     state: CrawlerState
 
+    @property
+    def delivery_id(self) -> Optional[str]:
+        """
+        Stable identity of the event, shared by its retried deliveries:
+        ``<crawler_uuid>:<event>`` for lifecycle events,
+        ``<crawler_uuid>:<event>:<url>`` for visited / failed URLs. None for
+        ``crawler_url_skipped`` and ``crawler_url_discovered``, which can be
+        emitted several times per URL (see :func:`scrapfly.webhook_dedup.delivery_key`).
+        """
+        return _delivery_id(self.event, self.crawler_uuid, getattr(self, 'url', None))
+
     @staticmethod
     def _parse_base(event: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -324,8 +361,16 @@ _DISPATCH = {
 }
 
 
+@lru_cache(maxsize=16)
+def _signature_handler(signing_secrets: Tuple[str, ...]):
+    """One ResponseBodyHandler per set of secrets, instead of one per webhook"""
+    from ..api_response import ResponseBodyHandler
+
+    return ResponseBodyHandler(signing_secrets=signing_secrets)
+
+
 def webhook_from_payload(
-    payload: Dict[str, Any],
+    payload: Union[Dict[str, Any], bytes, str],
     signing_secrets: Optional[Tuple[str, ...]] = None,
     signature: Optional[str] = None,
 ) -> CrawlerWebhook:
@@ -336,9 +381,15 @@ def webhook_from_payload(
     function inspects ``event`` and returns the corresponding typed
     dataclass — one of :data:`CrawlerWebhook`.
 
+    Pass the raw request body (``request.get_data()``) rather than the
+    parsed JSON: the signature is then verified over the exact bytes that
+    were signed, before paying for the JSON decoding. A dict is verified
+    against its compact JSON re-serialization, which only matches when the
+    key order and formatting round-trip exactly.
+
     Args:
-        payload: The full webhook body as a dict (i.e. what you get from
-            ``request.json``).
+        payload: The webhook body, raw (bytes or str, uncompressed JSON) or
+            already parsed as a dict (i.e. what you get from ``request.json``).
         signing_secrets: Optional tuple of signing secrets for signature
             verification. Pass each secret as it appears in the webhook
             dashboard (UTF-8 string, not hex-encoded).
@@ -350,7 +401,8 @@ def webhook_from_payload(
 
     Raises:
         KeyError: If the envelope is missing required fields.
-        ValueError: If ``event`` is not one of the known crawler events.
+        ValueError: If ``event`` is not one of the known crawler events,
+            or a raw body is not valid JSON.
         WebhookSignatureMissMatch: If signature verification fails.
 
     Example:
@@ -360,7 +412,7 @@ def webhook_from_payload(
         >>> @app.route('/webhook', methods=['POST'])
         ... def handle_webhook():
         ...     wh = webhook_from_payload(
-        ...         request.json,
+        ...         request.get_data(),
         ...         signing_secrets=('YOUR-WEBHOOK-SIGNING-SECRET',),
         ...         signature=request.headers.get('X-Scrapfly-Webhook-Signature'),
         ...     )
@@ -369,17 +421,19 @@ def webhook_from_payload(
         ...               f"{wh.state.urls_visited} URLs visited")
         ...     return '', 200
     """
-    if signing_secrets and signature:
-        from json import dumps
+    raw = payload.encode('utf-8') if isinstance(payload, str) else payload
 
-        from ..api_response import ResponseBodyHandler
+    if signing_secrets and signature:
         from ..errors import WebhookSignatureMissMatch
 
-        handler = ResponseBodyHandler(signing_secrets=signing_secrets)
-        message = dumps(payload, separators=(',', ':')).encode('utf-8')
-        if not handler.verify(message, signature):
+        if isinstance(raw, dict):
+            raw = json.dumps(raw, separators=(',', ':')).encode('utf-8')
+        if not _signature_handler(tuple(signing_secrets)).verify(raw, signature):
             raise WebhookSignatureMissMatch()
 
+    if not isinstance(payload, dict):
+        payload = json.loads(raw)
+
     event = payload['event']
     inner = payload['payload']
 
@@ -0,0 +1,197 @@
+"""
+Near-Duplicate Detection - Skip or collapse near-identical crawled pages
+
+Large crawls return many near-identical pages (faceted listings, session
+parameter variants...). The NearDuplicateFilter computes a 64-bit SimHash of
+the text of every page (word shingles, markup stripped) and indexes it in a
+banded LSH index: two signatures within ``threshold`` differing bits always
+share at least one band (pigeonhole principle), so each page is only compared
+with the few pages sharing one of its bands instead of with every page seen.
+
+Works as a streaming stage over anything yielding objects with ``url`` and
+``content`` attributes: ``artifact.iter_responses()``, ``crawl.read_iter()``,
+HAR entries...
+"""
+
+import hashlib
+import re
+from collections import Counter
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+T = TypeVar('T')
+
+SIGNATURE_BITS = 64
+
+_IGNORED_BLOCKS_RE = re.compile(r'<(script|style|noscript)\b.*?</\1\s*>', re.I | re.S)
+_TAG_RE = re.compile(r'<[^>]*>')
+_WORD_RE = re.compile(r'\w+')
+
+# The SimHash bit counters are accumulated in 32-bit lanes of a single
+# integer: adding a hash to every counter is one big-integer addition instead
+# of 64 bit tests. _SPREAD[byte] spreads the 8 bits of a byte to 8 lanes.
+_LANE_BITS = 32
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_SPREAD = tuple(
+    sum(1 << (bit * _LANE_BITS) for bit in range(8) if byte >> bit & 1)
+    for byte in range(256)
+)
+
+
+def _text(content: Union[str, bytes]) -> str:
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        content = bytes(content).decode('utf-8', errors='replace')
+    content = _IGNORED_BLOCKS_RE.sub(' ', content)
+    return _TAG_RE.sub(' ', content)
+
+
+def simhash(content: Union[str, bytes], shingle_size: int = 3) -> int:
+    """
+    Compute the 64-bit SimHash of a page
+
+    Markup (tags, scripts, styles) is stripped, the text is split in
+    lowercase words and hashed as overlapping ``shingle_size``-word shingles.
+
+    Args:
+        content: HTML or text, as str or utf-8 bytes
+        shingle_size: Number of words per shingle
+
+    Returns:
+        The signature, as an int
+    """
+    words = _WORD_RE.findall(_text(content).lower())
+    if len(words) >= shingle_size:
+        shingles = Counter(' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+    else:
+        shingles = Counter([' '.join(words)])
+
+    counters = 0
+    total = 0
+    for shingle, weight in shingles.items():
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+        spread = 0
+        for position, byte in enumerate(digest):
+            spread |= _SPREAD[byte] << (position * 8 * _LANE_BITS)
+        counters += spread * weight
+        total += weight
+
+    # A bit is set when the majority of the (weighted) shingle hashes have it set
+    signature = 0
+    for bit in range(SIGNATURE_BITS):
+        if (counters >> (bit * _LANE_BITS) & _LANE_MASK) * 2 > total:
+            signature |= 1 << bit
+    return signature
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two signatures"""
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateFilter:
+    """
+    Streaming near-duplicate detection over crawled pages
+
+    Each page is compared with the pages seen before it: a page whose SimHash
+    is within ``threshold`` bits of an earlier page is a near-duplicate of it.
+
+    Example:
+        ```python
+        from scrapfly import NearDuplicateFilter
+
+        dedup = NearDuplicateFilter(threshold=3)
+
+        # Skip near-duplicates before the expensive processing
+        for record in dedup.filter(artifact.iter_responses()):
+            extract(record)
+
+        # Or collapse them: {first page URL: [near-duplicate URLs]}
+        for url, duplicates in dedup.groups().items():
+            print(url, len(duplicates))
+        ```
+    """
+
+    def __init__(self, threshold: int = 3, shingle_size: int = 3):
+        """
+        Args:
+            threshold: Maximum number of differing signature bits (out of 64)
+                for two pages to be near-duplicates
+            shingle_size: Number of words per shingle
+        """
+        if not 0 <= threshold < SIGNATURE_BITS:
+            raise ValueError(f"threshold must be between 0 and {SIGNATURE_BITS - 1}")
+
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        # threshold + 1 bands: signatures within threshold bits share at least one band
+        bands = threshold + 1
+        width = SIGNATURE_BITS // bands
+        self._bands: List[Tuple[int, int]] = [
+            (band * width, (1 << (width if band < bands - 1 else SIGNATURE_BITS - band * width)) - 1)
+            for band in range(bands)
+        ]
+        self._buckets: List[Dict[int, List[Tuple[int, Hashable]]]] = [{} for _ in self._bands]
+        self._groups: Dict[Hashable, List[Hashable]] = {}
+
+    def add(self, key: Hashable, content: Union[str, bytes]) -> Optional[Hashable]:
+        """
+        Index a page
+
+        Args:
+            key: Page identifier (usually its URL)
+            content: Page content
+
+        Returns:
+            The key of the earlier page it is a near-duplicate of, or None if
+            it is a new page (only new pages are indexed)
+        """
+        signature = simhash(content, self.shingle_size)
+        band_keys = [signature >> shift & mask for shift, mask in self._bands]
+
+        best: Optional[Tuple[int, Hashable]] = None
+        for buckets, band_key in zip(self._buckets, band_keys):
+            for candidate, candidate_key in buckets.get(band_key, ()):
+                distance = hamming_distance(signature, candidate)
+                if distance <= self.threshold and (best is None or distance < best[0]):
+                    best = (distance, candidate_key)
+
+        if best is not None:
+            self._groups[best[1]].append(key)
+            return best[1]
+
+        for buckets, band_key in zip(self._buckets, band_keys):
+            buckets.setdefault(band_key, []).append((signature, key))
+        self._groups[key] = []
+        return None
+
+    def filter(self, pages: Iterable[T]) -> Iterator[T]:
+        """
+        Yield the pages that are not near-duplicates of an earlier page
+
+        Args:
+            pages: Objects with ``url`` and ``content`` attributes (WarcRecord,
+                HarEntry, CrawlContent...)
+
+        Yields:
+            The first page of each group of near-duplicates
+        """
+        for page in pages:
+            if self.add(page.url, page.content) is None:
+                yield page
+
+    def groups(self) -> Dict[Hashable, List[Hashable]]:
+        """
+        Get the groups of near-duplicates found so far
+
+        Returns:
+            Dict of {first page key: [keys of its near-duplicates]}
+        """
+        return {key: list(duplicates) for key, duplicates in self._groups.items()}
+
+    def __len__(self) -> int:
+        """Number of distinct (non-duplicate) pages seen"""
+        return len(self._groups)
+
+    def __repr__(self):
+        duplicates = sum(len(group) for group in self._groups.values())
+        return f"NearDuplicateFilter(pages={len(self._groups)}, duplicates={duplicates})"
@@ -0,0 +1,213 @@
+"""
+Crawl Export - Convert crawl artifacts into analytics-ready datasets
+
+Streams the pages of a WARC or HAR artifact into a Parquet file (written in
+fixed-size row groups) or a JSON Lines file (gzip-compressed when the path
+ends with ``.gz``), one row per page. Pages are decoded and written as the
+archive is read, memory stays bounded by one row group.
+
+Row schema:
+
+    url          string
+    status_code  int
+    headers      map<string, string> (JSON object in JSON Lines)
+    duration     float, scrape duration in seconds
+    log_id       string, scrape log ID
+    country      string, proxy country
+    content      string, body decoded with its charset (utf-8 by default)
+
+Parquet export requires pyarrow (``pip install "scrapfly-sdk[export]"``).
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+from .crawler_response import CrawlerArtifactResponse
+from .har_utils import HarArchive
+from .warc_utils import WarcParser
+
+ExportSource = Union[CrawlerArtifactResponse, WarcParser, HarArchive]
+
+EXPORT_COLUMNS = ('url', 'status_code', 'headers', 'duration', 'log_id', 'country', 'content')
+
+
+def _charset(headers: Dict[str, str]) -> str:
+    for key, value in headers.items():
+        if key.lower() == 'content-type':
+            for param in value.split(';')[1:]:
+                name, _, charset = param.strip().partition('=')
+                if name.lower() == 'charset' and charset:
+                    return charset.strip('"\' ')
+    return 'utf-8'
+
+
+def _decode(content: bytes, headers: Dict[str, str]) -> str:
+    try:
+        return content.decode(_charset(headers), errors='replace')
+    except LookupError:
+        return content.decode('utf-8', errors='replace')  # Unknown charset
+
+
+def iter_page_rows(
+    source: ExportSource,
+    processes: Optional[int] = None,
+    accept: Optional[Callable[[str, Dict[str, str]], bool]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate through the pages of an artifact as export rows
+
+    Args:
+        source: Artifact, WarcParser or HarArchive
+        processes: Parse WARC archives on that many worker processes
+            (see WarcParser.iter_records_parallel), None to parse in-process
+        accept: Called with the URL and response headers of each page, the
+            pages it rejects are skipped before their body is decoded
+
+    Yields:
+        Dict with the keys of EXPORT_COLUMNS
+    """
+    if isinstance(source, CrawlerArtifactResponse):
+        source = source.parser
+
+    if isinstance(source, HarArchive):
+        for entry in source.iter_entries():
+            headers = entry.response_headers
+            if accept is not None and not accept(entry.url, headers):
+                continue
+            yield {
+                'url': entry.url,
+                'status_code': entry.status_code,
+                'headers': headers,
+                'duration': entry.time / 1000 if entry.time else None,
+                'log_id': None,
+                'country': None,
+                'content': _decode(entry.content, headers),
+            }
+        return
+
+    if processes is not None:
+        records = source.iter_records_parallel(processes=processes, responses_only=True)
+    else:
+        records = source.iter_responses()
+
+    for record in records:
+        headers = record.headers
+        if accept is not None and not accept(record.url, headers):
+            continue
+
+        warc_headers = record.warc_headers or {}
+        duration = warc_headers.get('WARC-Scrape-Duration')
+        try:
+            duration = float(duration) if duration is not None else None
+        except ValueError:
+            duration = None
+
+        yield {
+            'url': record.url,
+            'status_code': record.status_code,
+            'headers': headers,
+            'duration': duration,
+            'log_id': warc_headers.get('WARC-Scrape-Log-Id'),
+            'country': warc_headers.get('WARC-Scrape-Country'),
+            'content': _decode(bytes(record.body), headers),
+        }
+
+
+def _export_jsonl(rows: Iterator[Dict[str, Any]], path: str) -> int:
+    count = 0
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def _export_parquet(rows: Iterator[Dict[str, Any]], path: str, row_group_size: int, compression: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("pyarrow is not installed, please install it with `pip install \"scrapfly-sdk[export]\"`")
+
+    schema = pa.schema([
+        ('url', pa.string()),
+        ('status_code', pa.int32()),
+        ('headers', pa.map_(pa.string(), pa.string())),
+        ('duration', pa.float64()),
+        ('log_id', pa.string()),
+        ('country', pa.string()),
+        ('content', pa.large_string()),
+    ])
+
+    count = 0
+    columns = {name: [] for name in EXPORT_COLUMNS}
+
+    def flush(writer):
+        data = dict(columns, headers=[list(headers.items()) for headers in columns['headers']])
+        writer.write_table(pa.table(data, schema=schema), row_group_size=row_group_size)
+        for values in columns.values():
+            values.clear()
+
+    with pq.ParquetWriter(path, schema, compression=compression) as writer:
+        for row in rows:
+            for name in EXPORT_COLUMNS:
+                columns[name].append(row[name])
+            count += 1
+            if len(columns['url']) >= row_group_size:
+                flush(writer)
+        if columns['url']:
+            flush(writer)
+
+    return count
+
+
+def export_pages(
+    source: ExportSource,
+    path: str,
+    format: Optional[str] = None,
+    row_group_size: int = 10_000,
+    processes: Optional[int] = None,
+    compression: str = 'zstd',
+) -> int:
+    """
+    Export the pages of a crawl artifact to Parquet or JSON Lines in one streaming pass
+
+    Args:
+        source: Artifact (CrawlerArtifactResponse), WarcParser or HarArchive
+        path: Output file path
+        format: 'parquet' or 'jsonl', guessed from the path extension when None
+            (``.parquet``, ``.jsonl``/``.jsonl.gz``)
+        row_group_size: Number of rows per Parquet row group
+        processes: Parse WARC archives on that many worker processes (None = in-process)
+        compression: Parquet compression codec (JSON Lines is gzip-compressed
+            when the path ends with ``.gz``)
+
+    Returns:
+        Number of exported pages
+
+    Example:
+        ```python
+        from scrapfly import export_pages
+
+        artifact = crawl.download('crawl.warc.gz')
+        export_pages(artifact, 'pages.parquet', processes=4)
+        export_pages(artifact, 'pages.jsonl.gz')
+        ```
+    """
+    path = os.fspath(path)
+    if format is None:
+        stem = path[:-3] if path.endswith('.gz') else path
+        format = 'parquet' if stem.endswith('.parquet') else 'jsonl' if stem.endswith(('.jsonl', '.ndjson')) else None
+        if format is None:
+            raise ValueError(f"Can't guess the export format of {path}, pass format='parquet' or format='jsonl'")
+
+    rows = iter_page_rows(source, processes=processes)
+    if format == 'parquet':
+        return _export_parquet(rows, path, row_group_size, compression)
+    elif format == 'jsonl':
+        return _export_jsonl(rows, path)
+    raise ValueError(f"Unsupported export format: {format!r}, expected 'parquet' or 'jsonl'")
@@ -35,13 +35,91 @@ Structure:
     ]
   }
 }
+
+Crawler HAR artifacts are written incrementally: the first JSON object holds
+the log metadata (with an empty ``entries`` list) and every following object
+is one entry. Archives are decoded incrementally from bytes, a file or a
+stream, so entries are yielded one at a time in linear time and memory stays
+bounded by the largest entry.
 """
 
+import codecs
 import json
-import gzip
-from typing import Dict, List, Any, Optional, Iterator
+import os
+import re
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Iterator, BinaryIO, Union
 from io import BytesIO
 
+from .warc_utils import _GzipMemberReader
+
+# Accepted HAR sources: raw bytes, JSON text, a binary file-like object or a file path
+HarSource = Union[bytes, str, BinaryIO, os.PathLike]
+
+_WHITESPACE_RE = re.compile(r'\s*')
+# Longest token a decoding error can point to before the end of a cut buffer ("\uXXX", "fals", "-1.5e")
+_TRUNCATION_MARGIN = 8
+
+
+def _is_incomplete(error: json.JSONDecodeError, size: int) -> bool:
+    """Tell a document cut by the end of the buffer from a malformed one"""
+    # A string runs up to the end of the buffer, or the error is in the last
+    # characters (a literal, number or escape sequence cut in the middle)
+    return error.msg.startswith('Unterminated string') or size - error.pos <= _TRUNCATION_MARGIN
+
+
+def _iter_json_objects(stream: BinaryIO, chunk_size: int = 1024 * 1024) -> Iterator[Any]:
+    """
+    Decode a sequence of concatenated JSON documents from a binary stream
+
+    Documents are decoded in place in a text buffer (no per-document copy of
+    the remaining data). When a document spans the end of the buffer, the
+    read size doubles until it fits, so each document is re-scanned at most
+    a logarithmic number of times and the total work stays linear.
+
+    A document truncated by the end of the stream ends the iteration. A
+    malformed document raises json.JSONDecodeError as soon as it is read,
+    the rest of the stream is never buffered.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    read_size = chunk_size
+    eof = False
+
+    while True:
+        pos = _WHITESPACE_RE.match(buffer, pos).end()
+        if pos < len(buffer):
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if not _is_incomplete(e, len(buffer)):
+                    raise
+                if eof:
+                    return  # Truncated last document
+                read_size *= 2  # Incomplete document, read a bigger chunk
+            else:
+                yield obj
+                pos = end
+                read_size = chunk_size
+                continue
+        elif eof:
+            return
+
+        # Drop the decoded documents and append the next chunk
+        buffer = buffer[pos:]
+        pos = 0
+        chunk = stream.read(read_size)
+        if chunk:
+            buffer += text_decoder.decode(chunk)
+        else:
+            try:
+                buffer += text_decoder.decode(b'', final=True)
+            except UnicodeDecodeError:
+                pass  # Stream cut in a multi-byte character, the last document is truncated
+            eof = True
+
 
 class HarEntry:
     """Represents a single HAR entry (HTTP request/response pair)"""
@@ -150,48 +228,115 @@ class HarEntry:
 
 
 class HarArchive:
-    """Parser and accessor for HAR (HTTP Archive) format data"""
+    """
+    Parser and accessor for HAR (HTTP Archive) format data
+
+    Entries are decoded lazily: iterating the archive streams through the
+    source, only the entry being processed is held in memory.
+
+    Example:
+        ```python
+        # From bytes
+        archive = HarArchive(har_bytes)
+
+        # From a file on disk (gzip or plain JSON)
+        archive = HarArchive('crawl.har.gz')
 
-    def __init__(self, har_data: bytes):
+        for entry in archive.iter_entries():
+            print(f"{entry.url}: {entry.status_code} in {entry.time}ms")
+        ```
+    """
+
+    def __init__(self, har_data: HarSource):
         """
-        Initialize HAR archive from bytes
+        Initialize HAR archive
 
         Args:
-            har_data: HAR file content as bytes (JSON format, may be gzipped)
+            har_data: HAR content as bytes or JSON text, binary file-like
+                      object or path to a file on disk (may be gzipped)
         """
-        # Decompress if gzipped
-        if isinstance(har_data, bytes):
-            if har_data[:2] == b'\x1f\x8b':  # gzip magic number
-                har_data = gzip.decompress(har_data)
-            har_data = har_data.decode('utf-8')
-
-        # Parse the special format: {"log":{...,"entries":[]}}{"entry1"}{"entry2"}...
-        # First object is HAR log structure, subsequent objects are individual entries
-        objects = []
-        decoder = json.JSONDecoder()
-        idx = 0
-        while idx < len(har_data):
-            har_data_stripped = har_data[idx:].lstrip()
-            if not har_data_stripped:
-                break
+        self._path: Optional[str] = None
+        self._data: Optional[bytes] = None
+        self._stream: Optional[BinaryIO] = None
+        self._stream_start: Optional[int] = None
+        self._header: Optional[Dict[str, Any]] = None
+        self._count: Optional[int] = None
+
+        # Query indexes, built on the first lookup (see _build_indexes)
+        self._entries: Optional[List[HarEntry]] = None
+        self._by_url: Optional[Dict[str, List[int]]] = None
+        self._by_status: Optional[Dict[int, List[int]]] = None
+        self._by_mime_type: Optional[Dict[str, List[int]]] = None
+
+        if isinstance(har_data, str) and har_data.lstrip()[:1] in ('{', '['):
+            self._data = har_data.encode('utf-8')
+        elif isinstance(har_data, (str, os.PathLike)):
+            self._path = os.fspath(har_data)
+        elif isinstance(har_data, (bytes, bytearray, memoryview)):
+            self._data = har_data
+        else:
+            self._stream = har_data
             try:
-                obj, end_idx = decoder.raw_decode(har_data_stripped)
-                objects.append(obj)
-                idx += len(har_data[idx:]) - len(har_data_stripped) + end_idx
-            except json.JSONDecodeError:
-                break
-
-        # First object should be the HAR log structure
-        if objects and 'log' in objects[0]:
-            self._data = objects[0]
-            self._log = self._data.get('log', {})
-            # Remaining objects are the entries
-            self._entries = objects[1:] if len(objects) > 1 else []
+                self._stream_start = har_data.tell() if har_data.seekable() else None
+            except (AttributeError, OSError):
+                pass  # Non-seekable stream, can only be iterated once
+
+    @contextmanager
+    def _open(self) -> Iterator[BinaryIO]:
+        """Open a readable view over the uncompressed HAR data"""
+        if self._data is not None:
+            yield _GzipMemberReader(BytesIO(self._data))
+        elif self._stream is not None:
+            if self._stream_start is not None:
+                self._stream.seek(self._stream_start)
+            yield _GzipMemberReader(self._stream)
         else:
-            # Fallback: standard HAR format
-            self._data = json.loads(har_data) if isinstance(har_data, str) else {}
-            self._log = self._data.get('log', {})
-            self._entries = self._log.get('entries', [])
+            with open(self._path, 'rb') as f:
+                yield _GzipMemberReader(f)
+
+    def _iter_objects(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate through the raw entry dicts
+
+        The first document holds the log metadata. Its ``entries`` list is
+        empty for crawler artifacts and holds every entry for standard HAR
+        files, the following documents are entries.
+        """
+        with self._open() as stream:
+            documents = _iter_json_objects(stream)
+            first = next(documents, None)
+            if not isinstance(first, dict) or 'log' not in first:
+                self._header = {}
+                self._count = 0
+                return
+
+            log = first['log']
+            entries = log.pop('entries', None) or []
+            if self._header is None:
+                self._header = first
+            count = 0
+
+            for entry in entries:
+                count += 1
+                yield entry
+            del entries
+
+            for entry in documents:
+                count += 1
+                yield entry
+
+            self._count = count
+
+    @property
+    def _log(self) -> Dict[str, Any]:
+        if self._header is None:
+            # Only the first document is decoded
+            objects = self._iter_objects()
+            try:
+                next(objects, None)
+            finally:
+                objects.close()
+        return self._header.get('log', {})
 
     @property
     def version(self) -> str:
@@ -208,6 +353,31 @@ class HarArchive:
         """Get pages list"""
         return self._log.get('pages', [])
 
+    def _build_indexes(self):
+        """
+        Load the entries and index them by URL, status code and MIME type
+
+        Done once, on the first query: the HarEntry wrappers are kept and
+        every later query is a dict lookup returning them.
+        """
+        if self._entries is not None:
+            return
+
+        entries = []
+        by_url: Dict[str, List[int]] = {}
+        by_status: Dict[int, List[int]] = {}
+        by_mime_type: Dict[str, List[int]] = {}
+        for position, entry in enumerate(self.iter_entries()):
+            entries.append(entry)
+            by_url.setdefault(entry.url, []).append(position)
+            by_status.setdefault(entry.status_code, []).append(position)
+            by_mime_type.setdefault(entry.content_type.lower(), []).append(position)
+
+        self._entries = entries
+        self._by_url = by_url
+        self._by_status = by_status
+        self._by_mime_type = by_mime_type
+
     def get_entries(self) -> List[HarEntry]:
         """
         Get all entries as list
@@ -215,16 +385,24 @@ class HarArchive:
         Returns:
             List of HarEntry objects
         """
-        return [HarEntry(entry) for entry in self._entries]
+        self._build_indexes()
+        return list(self._entries)
 
     def iter_entries(self) -> Iterator[HarEntry]:
         """
         Iterate through all HAR entries
 
+        Entries are decoded from the source as the iteration goes (or taken
+        from the query indexes once they are built).
+
         Yields:
             HarEntry objects
         """
-        for entry in self._entries:
+        if self._entries is not None:
+            yield from self._entries
+            return
+
+        for entry in self._iter_objects():
             yield HarEntry(entry)
 
     def get_urls(self) -> List[str]:
@@ -234,12 +412,8 @@ class HarArchive:
         Returns:
             List of unique URLs
         """
-        urls = []
-        for entry in self._entries:
-            url = entry.get('request', {}).get('url', '')
-            if url and url not in urls:
-                urls.append(url)
-        return urls
+        self._build_indexes()
+        return [url for url in self._by_url if url]
 
     def find_by_url(self, url: str) -> Optional[HarEntry]:
         """
@@ -251,10 +425,9 @@ class HarArchive:
         Returns:
             First matching HarEntry or None
         """
-        for entry in self.iter_entries():
-            if entry.url == url:
-                return entry
-        return None
+        self._build_indexes()
+        positions = self._by_url.get(url)
+        return self._entries[positions[0]] if positions else None
 
     def filter_by_status(self, status_code: int) -> List[HarEntry]:
         """
@@ -266,8 +439,8 @@ class HarArchive:
         Returns:
             List of matching HarEntry objects
         """
-        return [entry for entry in self.iter_entries()
-                if entry.status_code == status_code]
+        self._build_indexes()
+        return [self._entries[position] for position in self._by_status.get(status_code, ())]
 
     def filter_by_content_type(self, content_type: str) -> List[HarEntry]:
         """
@@ -279,12 +452,23 @@ class HarArchive:
         Returns:
             List of matching HarEntry objects
         """
-        return [entry for entry in self.iter_entries()
-                if content_type.lower() in entry.content_type.lower()]
+        self._build_indexes()
+        content_type = content_type.lower()
+
+        # Substring match over the distinct MIME types, merged back in archive order
+        matches = [positions for mime_type, positions in self._by_mime_type.items() if content_type in mime_type]
+        if len(matches) == 1:
+            return [self._entries[position] for position in matches[0]]
+        return [self._entries[position] for position in sorted(p for positions in matches for p in positions)]
 
     def __len__(self) -> int:
-        """Get number of entries"""
-        return len(self._entries)
+        """Get number of entries (counted on the first full pass)"""
+        if self._entries is not None:
+            return len(self._entries)
+        if self._count is None:
+            for _ in self._iter_objects():
+                pass
+        return self._count
 
     def __repr__(self) -> str:
-        return f"<HarArchive {len(self._entries)} entries>"
+        return f"<HarArchive {len(self)} entries>"
@@ -0,0 +1,400 @@
+"""
+WARC Index Utilities
+
+This module provides a CDXJ-style sidecar index for crawl WARC files.
+
+The index holds one line per WARC record with the record URL, type, HTTP
+status, content type, the byte range of the record in the (compressed) file
+and the ``WARC-Scrape-*`` metadata. It is built once, saved next to the
+archive (``crawl.warc.gz.cdxj``) and can then be loaded by any process, so
+lookups and filtered iteration seek straight to the records they need instead
+of scanning the whole archive.
+
+Index file layout (one JSON document per line, prefixed with the URL and the
+record timestamp)::
+
+    !meta 0 {"version": 2, "size": 123456}
+    https://web-scraping.dev/products 20250101120000 {"type": "response", "status": 200, ...}
+
+Spaces, line breaks and ``%`` are percent-encoded in the URL field, so the
+line always splits into its three fields.
+"""
+
+import json
+import os
+import re
+from fnmatch import fnmatch
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+INDEX_SUFFIX = '.cdxj'
+INDEX_VERSION = 2  # 2: URLs percent-encoded in the URL field
+
+_URL_UNSAFE_RE = re.compile(r'[% \r\n]')
+_URL_ESCAPE_RE = re.compile(r'%(25|20|0D|0A)')
+
+_SCRAPE_HEADER_PREFIX = 'WARC-Scrape-'
+_DATE_DIGITS_RE = re.compile(r'\d')
+
+
+def page_stats(pages: Iterable[Tuple[int, Optional[str], int]]) -> Dict[str, Any]:
+    """
+    Aggregate (status code, content type, body size) tuples of crawled pages
+
+    Returns:
+        Dict with keys: pages, total_size_bytes, avg_page_size_bytes,
+        status_codes ({status: pages}) and content_types ({mime type: pages},
+        MIME types without their parameters)
+    """
+    count = 0
+    total_size = 0
+    status_codes: Dict[int, int] = {}
+    content_types: Dict[str, int] = {}
+
+    for status_code, content_type, size in pages:
+        count += 1
+        total_size += size
+        status_codes[status_code] = status_codes.get(status_code, 0) + 1
+        mime_type = content_type.split(';', 1)[0].strip().lower() if content_type else ''
+        content_types[mime_type] = content_types.get(mime_type, 0) + 1
+
+    return {
+        'pages': count,
+        'total_size_bytes': total_size,
+        'avg_page_size_bytes': total_size / count if count else 0,
+        'status_codes': status_codes,
+        'content_types': content_types,
+    }
+
+
+class WarcIndexEntry:
+    """
+    Location and metadata of a single WARC record
+
+    ``offset`` and ``length`` delimit the record in the archive file as
+    stored on disk. For gzip archives this is the gzip member holding the
+    record (one member per record in crawler artifacts).
+    """
+
+    __slots__ = (
+        'url', 'record_type', 'status_code', 'content_type',
+        'offset', 'length', 'record_id', 'date', 'scrape', 'size',
+    )
+
+    def __init__(
+        self,
+        url: str,
+        record_type: str,
+        offset: int,
+        length: int,
+        status_code: Optional[int] = None,
+        content_type: Optional[str] = None,
+        record_id: Optional[str] = None,
+        date: Optional[str] = None,
+        scrape: Optional[Dict[str, str]] = None,
+        size: Optional[int] = None,
+    ):
+        self.url = url
+        self.record_type = record_type
+        self.offset = offset
+        self.length = length
+        self.status_code = status_code
+        self.content_type = content_type
+        self.record_id = record_id
+        self.date = date
+        self.scrape = scrape or {}
+        self.size = size  # HTTP body size of response records
+
+    @property
+    def log_id(self) -> Optional[str]:
+        """Scrape log ID (WARC-Scrape-Log-Id)"""
+        return self.scrape.get('Log-Id')
+
+    @property
+    def country(self) -> Optional[str]:
+        """Proxy country used for the scrape (WARC-Scrape-Country)"""
+        return self.scrape.get('Country')
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Scrape duration in seconds (WARC-Scrape-Duration)"""
+        value = self.scrape.get('Duration')
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    @classmethod
+    def from_warc_headers(
+        cls,
+        warc_headers: Dict[str, str],
+        offset: int,
+        length: int,
+        status_code: Optional[int] = None,
+        content_type: Optional[str] = None,
+        size: Optional[int] = None,
+    ) -> 'WarcIndexEntry':
+        """Build an entry from the WARC headers of a record"""
+        return cls(
+            url=warc_headers.get('WARC-Target-URI', ''),
+            record_type=warc_headers.get('WARC-Type', ''),
+            offset=offset,
+            length=length,
+            status_code=status_code,
+            content_type=content_type,
+            size=size,
+            record_id=warc_headers.get('WARC-Record-ID'),
+            date=warc_headers.get('WARC-Date'),
+            scrape={
+                key[len(_SCRAPE_HEADER_PREFIX):]: value
+                for key, value in warc_headers.items()
+                if key.startswith(_SCRAPE_HEADER_PREFIX)
+            },
+        )
+
+    def to_line(self) -> str:
+        """Serialize the entry as a CDXJ line"""
+        fields = {'type': self.record_type, 'offset': self.offset, 'length': self.length}
+        if self.status_code is not None:
+            fields['status'] = self.status_code
+        if self.content_type is not None:
+            fields['mime'] = self.content_type
+        if self.size is not None:
+            fields['size'] = self.size
+        if self.record_id is not None:
+            fields['id'] = self.record_id
+        if self.date is not None:
+            fields['date'] = self.date
+        if self.scrape:
+            fields['scrape'] = self.scrape
+
+        # WARC-Date is ISO 8601, CDX timestamps are the 14 digits of it
+        timestamp = ''.join(_DATE_DIGITS_RE.findall(self.date or ''))[:14] or '-'
+        url = _URL_UNSAFE_RE.sub(lambda match: '%%%02X' % ord(match.group()), self.url) or '-'
+        return f"{url} {timestamp} {json.dumps(fields, separators=(',', ':'))}"
+
+    @classmethod
+    def from_line(cls, line: str) -> 'WarcIndexEntry':
+        """Parse a CDXJ line written by to_line()"""
+        url, _, fields = line.split(' ', 2)
+        fields = json.loads(fields)
+        return cls(
+            url='' if url == '-' else _URL_ESCAPE_RE.sub(lambda match: chr(int(match.group(1), 16)), url),
+            record_type=fields['type'],
+            offset=fields['offset'],
+            length=fields['length'],
+            status_code=fields.get('status'),
+            content_type=fields.get('mime'),
+            size=fields.get('size'),
+            record_id=fields.get('id'),
+            date=fields.get('date'),
+            scrape=fields.get('scrape'),
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, WarcIndexEntry):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return (
+            f"WarcIndexEntry(type={self.record_type}, url={self.url}, status={self.status_code}, "
+            f"offset={self.offset}, length={self.length})"
+        )
+
+
+class WarcIndex:
+    """
+    Record index of a WARC file
+
+    Built by WarcParser.build_index() (or CrawlerArtifactResponse.save(...,
+    index=True)) and saved as a sidecar file next to the archive.
+
+    Example:
+        ```python
+        # Build once
+        parser = WarcParser('crawl.warc.gz')
+        index = parser.get_index()  # writes crawl.warc.gz.cdxj
+
+        # Load from any process
+        index = WarcIndex.load('crawl.warc.gz.cdxj')
+        entry = index.find('https://web-scraping.dev/product/1')
+        record = parser.read_record(entry)
+
+        # Filtered iteration only reads the matching records
+        for record in parser.read_records(index.filter(status_code=200, content_type='text/html')):
+            print(record.url)
+        ```
+    """
+
+    def __init__(
+        self,
+        entries: Optional[List[WarcIndexEntry]] = None,
+        source_size: Optional[int] = None,
+        source_mtime: Optional[int] = None,
+    ):
+        """
+        Args:
+            entries: Index entries, in archive order
+            source_size: Size in bytes of the indexed archive, used to detect stale indexes
+            source_mtime: Modification time (st_mtime_ns) of the indexed archive
+                file, detects an archive rewritten with the same size
+        """
+        self._entries: List[WarcIndexEntry] = list(entries or [])
+        self._source_size = source_size
+        self._source_mtime = source_mtime
+        self._by_url: Optional[Dict[str, List[WarcIndexEntry]]] = None
+
+    @staticmethod
+    def index_path(warc_path: str) -> str:
+        """Path of the sidecar index of a WARC file"""
+        return os.fspath(warc_path) + INDEX_SUFFIX
+
+    @property
+    def source_size(self) -> Optional[int]:
+        """Size in bytes of the indexed archive"""
+        return self._source_size
+
+    @property
+    def source_mtime(self) -> Optional[int]:
+        """Modification time (st_mtime_ns) of the indexed archive file, None for in-memory archives"""
+        return self._source_mtime
+
+    @property
+    def entries(self) -> List[WarcIndexEntry]:
+        """All entries in archive order"""
+        return self._entries
+
+    def _url_map(self) -> Dict[str, List[WarcIndexEntry]]:
+        if self._by_url is None:
+            self._by_url = {}
+            for entry in self._entries:
+                self._by_url.setdefault(entry.url, []).append(entry)
+        return self._by_url
+
+    def find(self, url: str, record_type: Optional[str] = 'response') -> Optional[WarcIndexEntry]:
+        """
+        Find the record of a URL
+
+        Args:
+            url: Exact URL of the record
+            record_type: WARC record type to match (None for any type)
+
+        Returns:
+            The first matching entry, or None if the URL is not indexed
+        """
+        for entry in self._url_map().get(url, ()):
+            if record_type is None or entry.record_type == record_type:
+                return entry
+        return None
+
+    def find_all(self, url: str) -> List[WarcIndexEntry]:
+        """Get the entries of every record of a URL (request, response, metadata...)"""
+        return list(self._url_map().get(url, ()))
+
+    def filter(
+        self,
+        record_type: Optional[str] = 'response',
+        status_code: Optional[int] = None,
+        content_type: Optional[str] = None,
+        url_pattern: Optional[str] = None,
+    ) -> Iterator[WarcIndexEntry]:
+        """
+        Iterate through the entries matching all given criteria
+
+        Args:
+            record_type: WARC record type (None for any type)
+            status_code: HTTP status code
+            content_type: MIME type, matched without its parameters and case-insensitively (e.g. 'text/html')
+            url_pattern: Wildcard pattern matched against the URL (e.g. '*/product/*')
+
+        Yields:
+            WarcIndexEntry: Matching entries in archive order
+        """
+        if content_type is not None:
+            content_type = content_type.split(';', 1)[0].strip().lower()
+
+        for entry in self._entries:
+            if record_type is not None and entry.record_type != record_type:
+                continue
+            if status_code is not None and entry.status_code != status_code:
+                continue
+            if content_type is not None:
+                if entry.content_type is None or entry.content_type.split(';', 1)[0].strip().lower() != content_type:
+                    continue
+            if url_pattern is not None and not fnmatch(entry.url, url_pattern):
+                continue
+            yield entry
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Aggregate page statistics from the index, without reading the archive
+
+        Returns:
+            Same dict as WarcParser.stats(), or None if the index predates
+            body sizes (rebuild it to get them)
+        """
+        pages = []
+        for entry in self.filter(record_type='response'):
+            if entry.size is None:
+                return None
+            if entry.status_code:
+                pages.append((entry.status_code, entry.content_type, entry.size))
+        return page_stats(pages)
+
+    def urls(self, record_type: Optional[str] = 'response') -> List[str]:
+        """Get the unique URLs of the index, in archive order"""
+        return list(dict.fromkeys(entry.url for entry in self.filter(record_type=record_type)))
+
+    def save(self, path: str):
+        """
+        Write the index to a CDXJ file
+
+        The file is written to a temporary path first and moved in place, so
+        concurrent readers never see a partial index.
+        """
+        path = os.fspath(path)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            meta = {'version': INDEX_VERSION, 'size': self._source_size, 'mtime': self._source_mtime}
+            f.write(f"!meta 0 {json.dumps(meta, separators=(',', ':'))}\n")
+            for entry in self._entries:
+                f.write(entry.to_line())
+                f.write('\n')
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'WarcIndex':
+        """
+        Load an index from a CDXJ file
+
+        Raises:
+            ValueError: If the file is not an index written by this version
+        """
+        entries = []
+        source_size = source_mtime = None
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if not line:
+                    continue
+                if line.startswith('!meta '):
+                    meta = json.loads(line.split(' ', 2)[2])
+                    if meta.get('version') != INDEX_VERSION:
+                        raise ValueError(f"Unsupported WARC index version: {meta.get('version')}")
+                    source_size = meta.get('size')
+                    source_mtime = meta.get('mtime')
+                    continue
+                entries.append(WarcIndexEntry.from_line(line))
+        return cls(entries, source_size=source_size, source_mtime=source_mtime)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[WarcIndexEntry]:
+        return iter(self._entries)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._url_map()
+
+    def __repr__(self):
+        return f"WarcIndex(entries={len(self._entries)})"
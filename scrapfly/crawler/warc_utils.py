@@ -5,30 +5,414 @@ This module provides utilities for parsing WARC (Web ARChive) format files.
 WARC is a standard format for storing web crawl data.
 
 The module provides automatic gzip decompression, record iteration, and
-high-level interfaces for extracting page data.
+high-level interfaces for extracting page data. Artifacts saved to disk can
+be parsed straight from their path: uncompressed files are memory-mapped and
+gzip files are decompressed with buffered reads, so the artifact never has to
+fit in memory.
+
+Crawler WARC files are a concatenation of gzip members (one per record).
+They are decompressed member by member while iterating, so only the record
+being parsed is held in memory whatever the archive size. Large archives can
+also be split on member/record boundaries and parsed by a process pool.
 """
 
-import gzip
+import mmap
+import os
 import re
-from typing import Iterator, List, Dict, Optional, BinaryIO, Union
-from dataclasses import dataclass
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Dict, Optional, BinaryIO, Union
 from io import BytesIO
 
+from .warc_index import WarcIndex, WarcIndexEntry, page_stats
+
+# Accepted WARC sources: raw bytes, a binary file-like object or a file path
+WarcSource = Union[bytes, BinaryIO, str, os.PathLike]
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+class _GzipMemberReader:
+    """
+    Incremental reader over a WARC byte stream
+
+    Exposes readline()/read() over the decompressed data of a stream made of
+    concatenated gzip members, decompressing chunk by chunk and discarding
+    what has been consumed. Streams that are not gzip-compressed are passed
+    through as-is. A truncated or corrupted member ends the stream, like a
+    malformed record ends the iteration.
+
+    The compressed offset of every member is tracked so records can be mapped
+    back to a byte range of the raw stream (see raw_offset()).
+    """
+
+    def __init__(self, raw: BinaryIO, chunk_size: int = 64 * 1024):
+        self._raw = raw
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._pos = 0  # read position in the buffer
+        self._dropped = 0  # decompressed bytes discarded from the buffer head
+        self._pending = b''  # compressed input not fed to the decompressor yet
+        self._raw_read = 0  # compressed bytes read from the raw stream
+        self._members = deque()  # (decompressed offset, compressed offset) of members started
+        self._decompressor = None
+        self._gzip: Optional[bool] = None  # detected on the first chunk
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append decompressed data to the buffer, returns False at end of stream"""
+        while not self._eof:
+            while len(self._pending) < 2:
+                chunk = self._raw.read(self._chunk_size)
+                if not chunk:
+                    break
+                self._raw_read += len(chunk)
+                self._pending += chunk
+
+            if not self._pending:
+                if self._decompressor is not None:
+                    # Input exhausted mid-member: return what zlib still holds
+                    data = self._decompressor.flush()
+                    self._decompressor = None
+                    if data:
+                        self._buffer += data
+                        return True
+                self._eof = True
+                break
+
+            if self._gzip is None:
+                self._gzip = self._pending[:2] == _GZIP_MAGIC
+
+            if not self._gzip:
+                self._buffer += self._pending
+                self._pending = b''
+                return True
+
+            if self._decompressor is None:
+                if self._pending[:2] != _GZIP_MAGIC:
+                    # Trailing padding/garbage after the last member
+                    self._eof = True
+                    break
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                self._members.append((self._dropped + len(self._buffer), self._raw_read - len(self._pending)))
+
+            try:
+                data = self._decompressor.decompress(self._pending, self._chunk_size)
+            except zlib.error:
+                self._eof = True
+                break
+
+            if self._decompressor.eof:
+                # Member complete, what is left belongs to the next one
+                self._pending = self._decompressor.unused_data
+                self._decompressor = None
+            else:
+                self._pending = self._decompressor.unconsumed_tail
+
+            if data:
+                self._buffer += data
+                return True
+
+        return False
+
+    def _compact(self):
+        """Drop the consumed part of the buffer"""
+        if self._pos > self._chunk_size and self._pos * 2 > len(self._buffer):
+            del self._buffer[:self._pos]
+            self._dropped += self._pos
+            self._pos = 0
+
+    def tell(self) -> int:
+        """Position in the decompressed stream"""
+        return self._dropped + self._pos
+
+    def raw_offset(self) -> int:
+        """
+        Offset in the raw stream of the gzip member holding the current position
+
+        For uncompressed streams, this is the current position itself.
+        Positions must be queried in increasing order.
+        """
+        if self._pos >= len(self._buffer):
+            self._fill()  # make sure the member starting here has been opened
+
+        if not self._gzip:
+            return self.tell()
+
+        position = self.tell()
+        while len(self._members) > 1 and self._members[1][0] <= position:
+            self._members.popleft()
+
+        return self._members[0][1] if self._members else self._raw_read
+
+    def readline(self) -> bytes:
+        start = self._pos
+        while True:
+            idx = self._buffer.find(b'\n', start)
+            if idx != -1:
+                end = idx + 1
+                break
+            start = len(self._buffer)
+            if not self._fill():
+                end = len(self._buffer)
+                break
+
+        line = bytes(self._buffer[self._pos:end])
+        self._pos = end
+        self._compact()
+        return line
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            while self._fill():
+                pass
+            size = len(self._buffer) - self._pos
+
+        while len(self._buffer) - self._pos < size and self._fill():
+            pass
+
+        data = bytes(self._buffer[self._pos:self._pos + size])
+        self._pos += len(data)
+        self._compact()
+        return data
+
+
+# Longest WARC header block accepted when validating a record boundary
+_MAX_HEADER_SIZE = 64 * 1024
+_CONTENT_LENGTH_RE = re.compile(rb'\r\nContent-Length:[ \t]*(\d+)', re.IGNORECASE)
+
+
+def _is_gzip_record_start(view, offset: int) -> bool:
+    """Check that a gzip member holding a WARC record starts at offset"""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        head = decompressor.decompress(view[offset:offset + _MAX_HEADER_SIZE], 5)
+    except zlib.error:
+        return False
+    return head == b'WARC/'
+
+
+def _is_plain_record_start(view, offset: int) -> bool:
+    """Check that an uncompressed WARC record starts at offset and is followed by another one (or EOF)"""
+    header_end = view.find(b'\r\n\r\n', offset, offset + _MAX_HEADER_SIZE)
+    if header_end == -1:
+        return False
+
+    match = _CONTENT_LENGTH_RE.search(view[offset:header_end + 2])
+    if match is None:
+        return False
+
+    record_end = header_end + 4 + int(match.group(1))
+    if view[record_end:record_end + 4] != b'\r\n\r\n':
+        return False
+
+    return record_end + 4 >= len(view) or view[record_end + 4:record_end + 9] == b'WARC/'
+
+
+def _find_record_boundaries(view, chunk_size: int) -> List[int]:
+    """
+    Split a WARC archive in ranges of roughly chunk_size bytes
+
+    Every returned offset is the start of a gzip member (compressed archives)
+    or of a record (uncompressed archives), so each range can be parsed on its
+    own. Candidate offsets found by scanning for the gzip magic / WARC version
+    line are validated by decoding them, since the same bytes can appear
+    inside compressed data or page content.
+    """
+    size = len(view)
+    if view[:2] == _GZIP_MAGIC:
+        marker, shift, is_boundary = _GZIP_MAGIC + b'\x08', 0, _is_gzip_record_start
+    else:
+        marker, shift, is_boundary = b'\r\n\r\nWARC/', 4, _is_plain_record_start
+
+    boundaries = [0]
+    target = chunk_size
+    while target < size:
+        candidate = view.find(marker, target - shift)
+        while candidate != -1 and not is_boundary(view, candidate + shift):
+            candidate = view.find(marker, candidate + 1)
+        if candidate == -1:
+            break
+
+        boundaries.append(candidate + shift)
+        target = candidate + shift + chunk_size
+
+    boundaries.append(size)
+    return boundaries
+
+
+def _parse_warc_range(source: Union[str, bytes], start: int, end: int, responses_only: bool) -> List['WarcRecord']:
+    """
+    Parse the records of one archive range (process pool worker)
+
+    ``source`` is the archive path, or the bytes of the range itself when the
+    archive is held in memory.
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            f.seek(start)
+            source = f.read(end - start)
+
+    parser = WarcParser(source)
+    records = parser.iter_responses() if responses_only else parser.iter_records()
+    return list(records)
+
+
+def _split_http_response(block: bytes) -> tuple:
+    """
+    Locate the end of the HTTP head of a response block
+
+    Returns:
+        (head_end, body_start): body_start is None when the block has no
+        header/body separator (the whole block is then the head)
+    """
+    head_end = block.find(b'\r\n\r\n')
+    if head_end != -1:
+        return head_end, head_end + 4
+    head_end = block.find(b'\n\n')
+    if head_end != -1:
+        return head_end, head_end + 2
+    return len(block), None
+
+
+def _parse_http_headers(head: bytes) -> Dict[str, str]:
+    """Parse the header lines of an HTTP head, skipping the status line"""
+    headers = {}
+    lines = head.split(b'\r\n') if b'\r\n' in head else head.split(b'\n')
+    for line in lines[1:]:
+        if b':' in line:
+            key, value = line.split(b':', 1)
+            headers[key.decode('utf-8', errors='ignore').strip()] = value.decode('utf-8', errors='ignore').strip()
+    return headers
+
+
+def _parse_status_code(block: bytes) -> Optional[int]:
+    """Extract the HTTP status code from the status line of a response block"""
+    line_end = block.find(b'\n', 0, _MAX_HEADER_SIZE)
+    match = re.match(rb'HTTP/\d\.\d (\d+)', block[:line_end if line_end != -1 else _MAX_HEADER_SIZE])
+    return int(match.group(1)) if match else None
+
+
+def _header_value(headers: Dict[str, str], name: str) -> Optional[str]:
+    """Case-insensitive header lookup"""
+    name = name.lower()
+    return next((value for key, value in headers.items() if key.lower() == name), None)
+
+
+_UNSET = object()
+
 
-@dataclass
 class WarcRecord:
     """
     Represents a single WARC record
 
     A WARC file contains multiple records, each representing a captured
     HTTP transaction or metadata.
+
+    Records produced by WarcParser keep the raw content block and only parse
+    the HTTP status, headers and body when those attributes are first
+    accessed, so passes filtering on ``url`` or ``warc_headers`` never touch
+    the HTTP payload. ``body`` gives a zero-copy memoryview of the payload.
     """
-    record_type: str  # Type of record (response, request, metadata, etc.)
-    url: str  # Associated URL
-    headers: Dict[str, str]  # HTTP headers
-    content: bytes  # Response body/content
-    status_code: Optional[int]  # HTTP status code (for response records)
-    warc_headers: Dict[str, str]  # WARC-specific headers
+
+    __slots__ = ('record_type', 'url', 'warc_headers', '_block', '_headers', '_content', '_status_code', '_body_start')
+
+    def __init__(
+        self,
+        record_type: str,  # Type of record (response, request, metadata, etc.)
+        url: str,  # Associated URL
+        headers: Dict[str, str],  # HTTP headers
+        content: bytes,  # Response body/content
+        status_code: Optional[int],  # HTTP status code (for response records)
+        warc_headers: Dict[str, str],  # WARC-specific headers
+    ):
+        self.record_type = record_type
+        self.url = url
+        self.warc_headers = warc_headers
+        self._block = None
+        self._headers = headers
+        self._content = content
+        self._status_code = status_code
+        self._body_start = None
+
+    @classmethod
+    def from_block(cls, record_type: str, url: str, warc_headers: Dict[str, str], block: bytes) -> 'WarcRecord':
+        """
+        Create a response record parsed lazily from its raw content block
+
+        Args:
+            record_type: WARC record type
+            url: Target URI of the record
+            warc_headers: WARC headers of the record
+            block: Raw HTTP response (status line, headers and body)
+        """
+        record = cls(record_type, url, _UNSET, _UNSET, _UNSET, warc_headers)
+        record._block = block
+        return record
+
+    def _locate_body(self) -> int:
+        if self._body_start is None:
+            head_end, body_start = _split_http_response(self._block)
+            self._body_start = len(self._block) if body_start is None else body_start
+            if self._headers is _UNSET:
+                self._headers = _parse_http_headers(self._block[:head_end])
+        return self._body_start
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """HTTP headers"""
+        if self._headers is _UNSET:
+            self._locate_body()
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: Dict[str, str]):
+        self._headers = value
+
+    @property
+    def status_code(self) -> Optional[int]:
+        """HTTP status code (for response records)"""
+        if self._status_code is _UNSET:
+            self._status_code = _parse_status_code(self._block)
+        return self._status_code
+
+    @status_code.setter
+    def status_code(self, value: Optional[int]):
+        self._status_code = value
+
+    @property
+    def body(self) -> memoryview:
+        """Response body/content as a zero-copy view over the record block"""
+        if self._content is not _UNSET:
+            return memoryview(self._content)
+        return memoryview(self._block)[self._locate_body():]
+
+    @property
+    def content(self) -> bytes:
+        """Response body/content"""
+        if self._content is _UNSET:
+            self._content = self._block[self._locate_body():]
+        return self._content
+
+    @content.setter
+    def content(self, value: bytes):
+        self._content = value
+
+    def __reduce__(self):
+        # _UNSET is a module sentinel, resolve lazy fields before pickling
+        # (records are returned by the process pool workers)
+        return WarcRecord, (self.record_type, self.url, self.headers, self.content, self.status_code, self.warc_headers)
+
+    def __eq__(self, other):
+        if not isinstance(other, WarcRecord):
+            return NotImplemented
+        return (
+            self.record_type, self.url, self.status_code, self.warc_headers, self.headers, self.content
+        ) == (
+            other.record_type, other.url, other.status_code, other.warc_headers, other.headers, other.content
+        )
 
     def __repr__(self):
         return f"WarcRecord(type={self.record_type}, url={self.url}, status={self.status_code})"
@@ -45,6 +429,14 @@ class WarcParser:
         # From bytes
         parser = WarcParser(warc_bytes)
 
+        # From a file on disk (never loaded in memory as a whole)
+        parser = WarcParser('crawl.warc.gz')
+
+        # From any binary stream, records are decompressed one at a time
+        with open('crawl.warc.gz', 'rb') as f:
+            for record in WarcParser(f).iter_records():
+                print(record.url)
+
         # Iterate all records
         for record in parser.iter_records():
             print(f"{record.url}: {record.status_code}")
@@ -61,24 +453,68 @@ class WarcParser:
         ```
     """
 
-    def __init__(self, warc_data: Union[bytes, BinaryIO]):
+    def __init__(self, warc_data: WarcSource):
         """
         Initialize WARC parser
 
         Args:
-            warc_data: WARC data as bytes or file-like object
-                      (supports both gzip-compressed and uncompressed)
+            warc_data: WARC data as bytes, file-like object or path to a file
+                      on disk (supports both gzip-compressed and uncompressed)
         """
-        if isinstance(warc_data, bytes):
-            # Try to decompress if gzipped
-            if warc_data[:2] == b'\x1f\x8b':  # gzip magic number
-                try:
-                    warc_data = gzip.decompress(warc_data)
-                except Exception:
-                    pass  # Not gzipped or decompression failed
-            self._data = BytesIO(warc_data)
-        else:
+        self._path: Optional[str] = None
+        self._data = None
+        self._stream: Optional[BinaryIO] = None
+        self._stream_start: Optional[int] = None
+
+        if isinstance(warc_data, (str, os.PathLike)):
+            # File mode: the file is (re)opened for every iteration
+            self._path = os.fspath(warc_data)
+        elif isinstance(warc_data, (bytes, bytearray, memoryview)):
+            # Kept compressed, records are decompressed while iterating
             self._data = warc_data
+        else:
+            self._stream = warc_data
+            try:
+                self._stream_start = warc_data.tell() if warc_data.seekable() else None
+            except (AttributeError, OSError):
+                pass  # Non-seekable stream, can only be iterated once
+
+    @property
+    def path(self) -> Optional[str]:
+        """Path of the parsed file (None when parsing bytes or a stream)"""
+        return self._path
+
+    @contextmanager
+    def _open(self) -> Iterator[BinaryIO]:
+        """
+        Open a readable view over the uncompressed WARC data
+
+        Gzip data is decompressed member by member through a bounded buffer.
+        In file mode, uncompressed files are memory-mapped, so only the pages
+        touched by the current record are resident.
+        """
+        if self._data is not None:
+            if self._data[:2] == _GZIP_MAGIC:
+                yield _GzipMemberReader(BytesIO(self._data))
+            else:
+                yield BytesIO(self._data)
+            return
+
+        if self._stream is not None:
+            if self._stream_start is not None:
+                self._stream.seek(self._stream_start)
+            yield _GzipMemberReader(self._stream)
+            return
+
+        with open(self._path, 'rb') as f:
+            if f.read(2) == _GZIP_MAGIC:
+                f.seek(0)
+                yield _GzipMemberReader(f)
+            elif os.fstat(f.fileno()).st_size == 0:
+                yield BytesIO(b'')  # mmap refuses empty files
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as stream:
+                    yield stream
 
     def iter_records(self) -> Iterator[WarcRecord]:
         """
@@ -87,33 +523,326 @@ class WarcParser:
         Yields:
             WarcRecord: Each record in the WARC file
         """
-        self._data.seek(0)
+        with self._open() as stream:
+            yield from self._iter_stream(stream)
 
+    def _iter_stream(self, stream: BinaryIO) -> Iterator[WarcRecord]:
+        """Parse records sequentially from an uncompressed WARC stream"""
+        for _, warc_headers, content_block in self._iter_raw_records(stream):
+            record = self._parse_record(warc_headers, content_block)
+            if record:
+                yield record
+
+    def _iter_raw_records(self, stream: BinaryIO) -> Iterator[tuple]:
+        """
+        Split an uncompressed WARC stream into records
+
+        Yields:
+            (offset, warc_headers, content_block) tuples, ``offset`` being the
+            position of the record (or of its gzip member) in the raw archive
+        """
         while True:
+            offset = stream.raw_offset() if isinstance(stream, _GzipMemberReader) else stream.tell()
+
             # Read WARC version line
-            version_line = self._read_line()
+            version_line = self._read_line(stream)
             if not version_line or not version_line.startswith(b'WARC/'):
                 break
 
             # Read WARC headers
-            warc_headers = self._read_headers()
-            if not warc_headers:
-                break
+            warc_headers = self._read_headers(stream)
+            if not warc_headers or 'Content-Length' not in warc_headers:
+                break  # Content-Length is mandatory, missing when the archive is truncated
 
             # Get content length
-            content_length = int(warc_headers.get('Content-Length', 0))
+            content_length = int(warc_headers['Content-Length'])
 
             # Read content block
-            content_block = self._data.read(content_length)
+            content_block = stream.read(content_length)
+            if len(content_block) < content_length:
+                break  # Truncated archive
 
             # Skip trailing newlines
-            self._read_line()
-            self._read_line()
+            self._read_line(stream)
+            self._read_line(stream)
+
+            yield offset, warc_headers, content_block
+
+    def iter_records_parallel(
+        self,
+        processes: Optional[int] = None,
+        ordered: bool = True,
+        chunk_size: int = 8 * 1024 * 1024,
+        responses_only: bool = False
+    ) -> Iterator[WarcRecord]:
+        """
+        Iterate through WARC records, parsing the archive on several cores
 
-            # Parse the record
-            record = self._parse_record(warc_headers, content_block)
-            if record:
-                yield record
+        The archive is split in ranges of about ``chunk_size`` bytes on gzip
+        member (or record) boundaries, and each range is decompressed and
+        parsed by a worker process. Only a few ranges are in flight at once,
+        so memory stays bounded by ``processes * chunk_size`` records.
+
+        Works on file paths and in-memory bytes. Streams can't be split and
+        are parsed sequentially.
+
+        Args:
+            processes: Number of worker processes (default: number of CPUs)
+            ordered: Yield records in archive order. When False, records are
+                yielded range by range as soon as a worker completes one.
+            chunk_size: Approximate size in bytes of the ranges handed to workers
+            responses_only: Only yield HTTP response records, like iter_responses()
+
+        Yields:
+            WarcRecord: Each record in the WARC file
+
+        Example:
+            ```python
+            parser = WarcParser('crawl.warc.gz')
+            for record in parser.iter_records_parallel(ordered=False, responses_only=True):
+                index(record.url, record.content)
+            ```
+        """
+        if self._stream is not None:
+            yield from (self.iter_responses() if responses_only else self.iter_records())
+            return
+
+        with self._open_view() as view:
+            boundaries = _find_record_boundaries(view, chunk_size)
+
+        if len(boundaries) <= 2:
+            # Nothing to split, avoid spawning a pool
+            yield from (self.iter_responses() if responses_only else self.iter_records())
+            return
+
+        ranges = zip(boundaries, boundaries[1:])
+        if self._path is not None:
+            # Workers read their range from the file themselves
+            pending_tasks = ((self._path, start, end, responses_only) for start, end in ranges)
+        else:
+            # In-memory archive: ship each range, sliced only when submitted
+            pending_tasks = ((bytes(self._data[start:end]), 0, end - start, responses_only) for start, end in ranges)
+
+        processes = processes or os.cpu_count() or 1
+        max_in_flight = processes * 2
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            in_flight = deque()
+            for task in pending_tasks:
+                in_flight.append(executor.submit(_parse_warc_range, *task))
+                if len(in_flight) >= max_in_flight:
+                    break
+
+            while in_flight:
+                if ordered:
+                    done = [in_flight.popleft()]
+                else:
+                    completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    done = [future for future in in_flight if future in completed]
+                    for future in done:
+                        in_flight.remove(future)
+
+                for future in done:
+                    # Refill before yielding so workers keep busy while the caller consumes
+                    task = next(pending_tasks, None)
+                    if task is not None:
+                        in_flight.append(executor.submit(_parse_warc_range, *task))
+
+                    yield from future.result()
+
+    @contextmanager
+    def _open_view(self):
+        """Random access view over the raw (possibly compressed) archive"""
+        if self._data is not None:
+            yield self._data if isinstance(self._data, (bytes, bytearray)) else bytes(self._data)
+            return
+
+        with open(self._path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                yield view
+
+    @contextmanager
+    def _open_raw(self) -> Iterator[BinaryIO]:
+        """Seekable handle over the raw (possibly compressed) archive"""
+        if self._data is not None:
+            yield BytesIO(self._data)
+        elif self._path is not None:
+            with open(self._path, 'rb') as f:
+                yield f
+        elif self._stream_start is not None:
+            yield self._stream
+        else:
+            raise ValueError("Random access to WARC records requires a file, bytes or a seekable stream")
+
+    def _raw_size(self) -> Optional[int]:
+        """Size in bytes of the raw archive (None for non-seekable streams)"""
+        if self._data is not None:
+            return len(self._data)
+        if self._path is not None:
+            return os.path.getsize(self._path)
+        if self._stream_start is not None:
+            position = self._stream.tell()
+            size = self._stream.seek(0, os.SEEK_END) - self._stream_start
+            self._stream.seek(position)
+            return size
+        return None
+
+    def build_index(self) -> WarcIndex:
+        """
+        Index every record of the archive in a single sequential pass
+
+        Only WARC headers and HTTP response heads are decoded, bodies are
+        skipped.
+
+        Returns:
+            WarcIndex: Record locations and metadata, see WarcIndex.save()
+        """
+        size = self._raw_size()
+        # Taken before reading, an archive modified while it is indexed leaves a stale index
+        mtime = os.stat(self._path).st_mtime_ns if self._path is not None else None
+        located = []
+        with self._open() as stream:
+            for offset, warc_headers, content_block in self._iter_raw_records(stream):
+                status_code = content_type = body_size = None
+                if warc_headers.get('WARC-Type') == 'response':
+                    # Lazy record: only the HTTP head is parsed
+                    record = self._parse_record(warc_headers, content_block)
+                    status_code = record.status_code
+                    content_type = _header_value(record.headers, 'Content-Type')
+                    body_size = len(record.body)
+                located.append((offset, warc_headers, status_code, content_type, body_size))
+
+            if size is None:
+                size = stream._raw_read if isinstance(stream, _GzipMemberReader) else stream.tell()
+
+        # A record spans up to the next record start, records sharing a gzip
+        # member (single member archives) share its whole range
+        entries = []
+        end = size
+        member_start = None
+        for offset, warc_headers, status_code, content_type, body_size in reversed(located):
+            if member_start is not None and offset != member_start:
+                end = member_start
+            member_start = offset
+            entries.append(WarcIndexEntry.from_warc_headers(
+                warc_headers, offset=offset, length=end - offset,
+                status_code=status_code, content_type=content_type, size=body_size,
+            ))
+        entries.reverse()
+        return WarcIndex(entries, source_size=size, source_mtime=mtime)
+
+    def _load_index(self) -> Optional[WarcIndex]:
+        """Load the sidecar index of an archive on disk, if it exists and is up to date"""
+        if self._path is None:
+            return None
+        index_path = WarcIndex.index_path(self._path)
+        if not os.path.exists(index_path):
+            return None
+        try:
+            index = WarcIndex.load(index_path)
+        except (ValueError, KeyError):
+            return None  # Unreadable index, rebuild it
+        stat = os.stat(self._path)
+        # An archive rewritten with the same size is told apart by its modification time
+        if index.source_size != stat.st_size or index.source_mtime != stat.st_mtime_ns:
+            return None
+        return index
+
+    def get_index(self, save: bool = True) -> WarcIndex:
+        """
+        Get the archive index, reusing the sidecar index file when up to date
+
+        For archives on disk, the index is loaded from ``<path>.cdxj`` when
+        it exists and matches the archive size and modification time,
+        otherwise it is built and
+        (when ``save`` is set) written there for the next process.
+
+        Args:
+            save: Write the index next to the archive when it had to be built
+
+        Returns:
+            WarcIndex: The archive index
+        """
+        index = self._load_index()
+        if index is not None:
+            return index
+
+        index = self.build_index()
+        if save and self._path is not None:
+            index.save(WarcIndex.index_path(self._path))
+        return index
+
+    def read_record(self, entry: WarcIndexEntry) -> Optional[WarcRecord]:
+        """
+        Read a single record located by an index entry
+
+        Args:
+            entry: Entry from this archive's index
+
+        Returns:
+            WarcRecord, or None if the record type is not supported
+        """
+        return next(self.read_records([entry]), None)
+
+    def read_records(self, entries) -> Iterator[WarcRecord]:
+        """
+        Read the records located by index entries, seeking to each of them
+
+        The archive is opened once and only the byte ranges of the requested
+        records are read and decompressed.
+
+        Args:
+            entries: Iterable of WarcIndexEntry (e.g. ``index.filter(...)``)
+
+        Yields:
+            WarcRecord: The records, in the order of ``entries``
+        """
+        base = self._stream_start or 0
+        with self._open_raw() as raw:
+            for entry in entries:
+                raw.seek(base + entry.offset)
+                chunk = raw.read(entry.length)
+                for record in WarcParser(chunk).iter_records():
+                    if entry.record_id is not None:
+                        matched = record.warc_headers.get('WARC-Record-ID') == entry.record_id
+                    else:
+                        matched = record.url == entry.url and record.record_type == entry.record_type
+                    if matched:
+                        yield record
+                        break
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Aggregate page statistics in a single streaming pass
+
+        Only WARC headers and HTTP response heads are parsed: bodies are
+        measured through zero-copy views, never decoded or copied. When the
+        archive has an up to date sidecar index (see get_index()), it is used
+        instead and the archive is not read at all.
+
+        Returns:
+            Dict with keys: pages, total_size_bytes, avg_page_size_bytes,
+            status_codes ({status: pages}) and content_types ({mime type: pages})
+
+        Example:
+            ```python
+            stats = parser.stats()
+            print(f"{stats['pages']} pages, {stats['total_size_bytes']} bytes")
+            print(stats['status_codes'])  # {200: 95, 404: 5}
+            ```
+        """
+        index = self._load_index()
+        stats = index.stats() if index is not None else None
+        if stats is not None:
+            return stats
+
+        return page_stats(
+            (record.status_code, _header_value(record.headers, 'Content-Type'), len(record.body))
+            for record in self.iter_responses()
+        )
 
     def iter_responses(self) -> Iterator[WarcRecord]:
         """
@@ -156,16 +885,16 @@ class WarcParser:
             })
         return pages
 
-    def _read_line(self) -> bytes:
+    def _read_line(self, stream: BinaryIO) -> bytes:
         """Read a single line from the WARC file"""
-        line = self._data.readline()
+        line = stream.readline()
         return line.rstrip(b'\r\n')
 
-    def _read_headers(self) -> Dict[str, str]:
+    def _read_headers(self, stream: BinaryIO) -> Dict[str, str]:
         """Read headers until empty line"""
         headers = {}
         while True:
-            line = self._read_line()
+            line = self._read_line(stream)
             if not line:
                 break
 
@@ -177,23 +906,12 @@ class WarcParser:
         return headers
 
     def _parse_record(self, warc_headers: Dict[str, str], content_block: bytes) -> Optional[WarcRecord]:
-        """Parse a WARC record from headers and content"""
+        """Create a record from headers and content, the HTTP response is parsed on access"""
         record_type = warc_headers.get('WARC-Type', '')
         url = warc_headers.get('WARC-Target-URI', '')
 
         if record_type == 'response':
-            # Parse HTTP response
-            http_headers, body = self._parse_http_response(content_block)
-            status_code = self._extract_status_code(content_block)
-
-            return WarcRecord(
-                record_type=record_type,
-                url=url,
-                headers=http_headers,
-                content=body,
-                status_code=status_code,
-                warc_headers=warc_headers
-            )
+            return WarcRecord.from_block(record_type, url, warc_headers, content_block)
         elif record_type in ['request', 'metadata', 'warcinfo']:
             # Other record types - store raw content
             return WarcRecord(
@@ -207,53 +925,13 @@ class WarcParser:
 
         return None
 
-    def _parse_http_response(self, content_block: bytes) -> tuple:
-        """Parse HTTP response into headers and body"""
-        try:
-            # Split on double newline (end of headers)
-            parts = content_block.split(b'\r\n\r\n', 1)
-            if len(parts) < 2:
-                parts = content_block.split(b'\n\n', 1)
-
-            if len(parts) == 2:
-                header_section, body = parts
-            else:
-                header_section, body = content_block, b''
-
-            # Parse headers
-            headers = {}
-            lines = header_section.split(b'\r\n') if b'\r\n' in header_section else header_section.split(b'\n')
-
-            # Skip status line
-            for line in lines[1:]:
-                if b':' in line:
-                    key, value = line.split(b':', 1)
-                    headers[key.decode('utf-8', errors='ignore').strip()] = value.decode('utf-8', errors='ignore').strip()
-
-            return headers, body
-
-        except Exception:
-            return {}, content_block
-
-    def _extract_status_code(self, content_block: bytes) -> Optional[int]:
-        """Extract HTTP status code from response"""
-        try:
-            # Look for HTTP status line (e.g., "HTTP/1.1 200 OK")
-            first_line = content_block.split(b'\r\n', 1)[0] if b'\r\n' in content_block else content_block.split(b'\n', 1)[0]
-            match = re.match(rb'HTTP/\d\.\d (\d+)', first_line)
-            if match:
-                return int(match.group(1))
-        except Exception:
-            pass
-        return None
-
 
-def parse_warc(warc_data: Union[bytes, BinaryIO]) -> WarcParser:
+def parse_warc(warc_data: WarcSource) -> WarcParser:
     """
     Convenience function to create a WARC parser
 
     Args:
-        warc_data: WARC data as bytes or file-like object
+        warc_data: WARC data as bytes, file-like object or file path
 
     Returns:
         WarcParser: Parser instance
@@ -0,0 +1,191 @@
+"""
+Crawler Webhook Batcher - Deliver crawler webhooks downstream in batches
+
+A crawl of N pages sends N ``crawler_url_visited`` webhooks: writing each of
+them to a database or a queue on its own costs one round trip per page. The
+CrawlerWebhookBatcher collects the typed webhooks and hands them to a flush
+function as a list, when ``max_size`` webhooks are buffered or when the
+oldest one has waited ``max_delay`` seconds. Flushes run on a background
+thread, in order, so receiving webhooks never waits for the downstream write.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from .crawler_webhook import CrawlerWebhook, CrawlerWebhookBase, webhook_from_payload
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlerWebhookBatcher:
+    """
+    Buffer crawler webhooks and flush them in batches from a background thread
+
+    The batcher is itself a webhook callback: pass it as ``callback`` to
+    ``webhook.create_server()`` / ``webhook.create_asgi_app()``, or to
+    ``WebhookSpool.drain()``, non-crawler deliveries are ignored.
+
+    Example:
+        ```python
+        from scrapfly import CrawlerWebhookBatcher, CrawlerUrlVisitedWebhook
+
+        def save(batch):
+            db.insert_many([
+                {'url': wh.url, 'status': wh.scrape.status_code}
+                for wh in batch if isinstance(wh, CrawlerUrlVisitedWebhook)
+            ])
+
+        with CrawlerWebhookBatcher(save, max_size=500, max_delay=2.0) as batcher:
+            app = webhook.create_asgi_app(signing_secrets=('YOUR-SIGNING-SECRET',), callback=batcher)
+            uvicorn.run(app)
+        ```
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[CrawlerWebhook]], Any],
+        max_size: int = 500,
+        max_delay: float = 2.0,
+        max_pending: Optional[int] = None,
+        events: Optional[Iterable[str]] = None,
+    ):
+        """
+        Args:
+            flush: Called with each batch (a list of typed webhooks, in
+                reception order) from the background thread. Exceptions are
+                logged and the batch is dropped.
+            max_size: Number of buffered webhooks triggering a flush
+            max_delay: Maximum seconds a webhook waits before being flushed
+            max_pending: Maximum number of buffered webhooks, add() blocks
+                while the buffer is full (None = unbounded)
+            events: Only buffer these events (CrawlerWebhookEvent values),
+                None for all
+        """
+        if max_size < 1 or max_delay <= 0:
+            raise ValueError("Expected max_size >= 1 and max_delay > 0")
+        if max_pending is not None and max_pending < max_size:
+            raise ValueError("max_pending must be at least max_size")
+
+        self.flush_function = flush
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.events = frozenset(events) if events is not None else None
+
+        self._condition = threading.Condition()
+        self._buffer: List[CrawlerWebhook] = []
+        self._received_at: List[float] = []  # Reception time of each buffered webhook
+        self._flushing = 0  # Webhooks taken by the flush in progress
+        self._flush_requested = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='crawler-webhook-batcher', daemon=True)
+        self._thread.start()
+
+    def add(self, webhook: Union[CrawlerWebhook, Dict[str, Any]]):
+        """
+        Buffer a webhook
+
+        Args:
+            webhook: Typed webhook, or decoded webhook body (parsed with webhook_from_payload)
+
+        Raises:
+            RuntimeError: If the batcher is closed
+        """
+        if not isinstance(webhook, CrawlerWebhookBase):
+            webhook = webhook_from_payload(webhook)
+        if self.events is not None and webhook.event not in self.events:
+            return
+
+        with self._condition:
+            if self.max_pending is not None:
+                self._condition.wait_for(lambda: self._closed or len(self._buffer) < self.max_pending)
+            if self._closed:
+                raise RuntimeError("CrawlerWebhookBatcher is closed")
+            self._received_at.append(time.monotonic())
+            self._buffer.append(webhook)
+            # Wake up the flush thread to arm the max_delay timer, or to flush a full batch
+            if len(self._buffer) == 1 or len(self._buffer) >= self.max_size:
+                self._condition.notify_all()
+
+    def __call__(self, data: Dict[str, Any], resource_type: Optional[str] = 'crawler', *args):
+        """Webhook callback signature: (data, resource_type, request or headers)"""
+        if resource_type == 'crawler':
+            self.add(data)
+
+    def _due(self) -> bool:
+        return bool(self._buffer) and (
+            self._closed
+            or self._flush_requested
+            or len(self._buffer) >= self.max_size
+            or time.monotonic() - self._received_at[0] >= self.max_delay
+        )
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._due():
+                    if self._closed:
+                        return
+                    if self._flush_requested:
+                        # Nothing to flush
+                        self._flush_requested = False
+                        self._condition.notify_all()
+                    timeout = self._received_at[0] + self.max_delay - time.monotonic() if self._buffer else None
+                    self._condition.wait(timeout)
+
+                batch = self._buffer[:self.max_size]
+                del self._buffer[:self.max_size]
+                # The webhooks left over keep their reception time, the max_delay bound holds for them too
+                del self._received_at[:self.max_size]
+                if not self._buffer:
+                    self._flush_requested = False
+                self._flushing = len(batch)
+                self._condition.notify_all()  # Room for the blocked add() calls
+
+            try:
+                self.flush_function(batch)
+            except Exception as e:
+                logger.error('Failed to flush %d crawler webhooks: %s', len(batch), e)
+            finally:
+                with self._condition:
+                    self._flushing = 0
+                    self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Flush the buffered webhooks now and wait for them to be processed
+
+        Args:
+            timeout: Maximum seconds to wait (None = wait forever)
+
+        Returns:
+            True if every webhook buffered before the call was flushed
+        """
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._buffer and not self._flushing, timeout)
+
+    def close(self):
+        """Flush the buffered webhooks and stop the background thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered webhooks not flushed yet"""
+        return len(self._buffer) + self._flushing
+
+    def __enter__(self) -> 'CrawlerWebhookBatcher':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        state = 'closed' if self._closed else 'open'
+        return f"CrawlerWebhookBatcher({state}, pending={self.pending}, max_size={self.max_size}, max_delay={self.max_delay})"
@@ -0,0 +1,235 @@
+"""
+Crawler Webhook Receiver - Local endpoint for crawler lifecycle webhooks
+
+Crawl.wait() polls the status endpoint for the whole life of a crawl. When
+the crawl is started with a webhook (``CrawlerConfig(webhook_name=...)``),
+the CrawlerWebhookReceiver receives its lifecycle events instead and wakes up
+the waiting threads as soon as ``crawler_finished``, ``crawler_stopped`` or
+``crawler_cancelled`` arrives for their crawl UUID.
+
+The receiver runs its own small HTTP server (standard library, no extra
+dependency), or can be fed from an existing web application with handle().
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Mapping, Optional, Tuple
+
+from .crawler_webhook import CrawlerLifecycleWebhook, CrawlerWebhook, CrawlerWebhookEvent, webhook_from_payload
+from ..api_response import ResponseBodyHandler
+from ..errors import WebhookSignatureMissMatch
+
+logger = logging.getLogger(__name__)
+
+# Events after which a crawl no longer changes
+TERMINAL_EVENTS = (
+    CrawlerWebhookEvent.CRAWLER_FINISHED.value,
+    CrawlerWebhookEvent.CRAWLER_STOPPED.value,
+    CrawlerWebhookEvent.CRAWLER_CANCELLED.value,
+)
+
+
+class CrawlerWebhookReceiver:
+    """
+    Receive crawler webhooks and notify the crawls waiting for them
+
+    One receiver serves any number of crawls: pass it to ``Crawl.wait()``.
+    The webhook configured in the dashboard must point to this server
+    (``http://<host>:<port><path>``, usually through a tunnel or a public
+    address).
+
+    Example:
+        ```python
+        from scrapfly import CrawlerWebhookReceiver
+
+        with CrawlerWebhookReceiver(signing_secrets=('YOUR-SIGNING-SECRET',), port=8080) as receiver:
+            config = CrawlerConfig(
+                url='https://web-scraping.dev',
+                webhook_name='my-webhook',
+                webhook_events=['crawler_finished', 'crawler_stopped', 'crawler_cancelled'],
+            )
+            crawl = Crawl(client, config).crawl()
+            crawl.wait(webhook_receiver=receiver)  # no status polling until the webhook arrives
+        ```
+
+        Behind an existing application, forward the requests instead of
+        starting the server:
+
+        ```python
+        @app.route('/webhook', methods=['POST'])
+        def webhook():
+            return '', receiver.handle(request.get_data(), request.headers)
+        ```
+    """
+
+    def __init__(
+        self,
+        signing_secrets: Optional[Tuple[str, ...]] = None,
+        host: str = '0.0.0.0',
+        port: int = 8080,
+        path: str = '/webhook',
+        max_events: int = 10_000,
+        event_ttl: float = 3600.0,
+    ):
+        """
+        Args:
+            signing_secrets: Webhook signing secrets, used to verify the
+                ``X-Scrapfly-Webhook-Signature`` header
+            host: Interface the server listens on
+            port: Port the server listens on (0 = any free port, see ``port``)
+            path: URL path of the webhook endpoint
+            max_events: Maximum number of terminal webhooks kept for crawls
+                nobody waits on yet, the oldest are dropped first
+            event_ttl: Seconds a terminal webhook is kept for a later wait_for()
+        """
+        self.host = host
+        self.path = path
+        self.max_events = max_events
+        self.event_ttl = event_ttl
+        self._port = port
+        self._body_handler = ResponseBodyHandler(signing_secrets=signing_secrets)
+        self._condition = threading.Condition()
+        # Last terminal webhook of each crawl with its reception time, until its waiter picks it up, oldest first
+        self._events: 'OrderedDict[str, Tuple[float, CrawlerLifecycleWebhook]]' = OrderedDict()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Port the server listens on"""
+        if self._server is not None:
+            return self._server.server_address[1]
+        return self._port
+
+    def start(self) -> 'CrawlerWebhookReceiver':
+        """Start the HTTP server in a background thread"""
+        if self._server is not None:
+            return self
+
+        receiver = self
+
+        class _RequestHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.split('?', 1)[0] != receiver.path:
+                    self.send_response(404)
+                else:
+                    body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                    self.send_response(receiver.handle(body, self.headers))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                logger.debug('webhook receiver: ' + format, *args)
+
+        self._server = ThreadingHTTPServer((self.host, self._port), _RequestHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='crawler-webhook-receiver', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the HTTP server"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def handle(self, body: bytes, headers: Mapping[str, str]) -> int:
+        """
+        Verify, decode and dispatch a webhook request
+
+        Args:
+            body: Raw request body
+            headers: Request headers
+
+        Returns:
+            HTTP status code to answer with
+        """
+        try:
+            data = self._body_handler.read(
+                content=body,
+                content_encoding=headers.get('Content-Encoding'),
+                content_type=headers.get('Content-Type') or 'application/json',
+                signature=headers.get('X-Scrapfly-Webhook-Signature'),
+            )
+        except WebhookSignatureMissMatch:
+            return 401
+        except Exception as e:
+            logger.error('Invalid webhook payload: %s', e)
+            return 400
+
+        if headers.get('X-Scrapfly-Webhook-Resource-Type', 'crawler') != 'crawler':
+            return 200  # ping or scrape webhook, nothing to wait for
+
+        try:
+            webhook = webhook_from_payload(data)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error('Invalid crawler webhook: %s', e)
+            return 400
+
+        self.dispatch(webhook)
+        return 200
+
+    def dispatch(self, webhook: CrawlerWebhook):
+        """Notify the waiters of a crawl of a parsed webhook"""
+        if webhook.event not in TERMINAL_EVENTS:
+            return
+        with self._condition:
+            self._events.pop(webhook.crawler_uuid, None)
+            self._events[webhook.crawler_uuid] = (time.monotonic(), webhook)
+            self._prune()
+            self._condition.notify_all()
+
+    def _prune(self):
+        """Drop the webhooks older than event_ttl and the oldest ones over max_events, the condition must be held"""
+        now = time.monotonic()
+        while self._events:
+            crawler_uuid, (received_at, _) = next(iter(self._events.items()))
+            if len(self._events) <= self.max_events and now - received_at < self.event_ttl:
+                break
+            del self._events[crawler_uuid]
+
+    def wait_for(self, crawler_uuid: str, timeout: Optional[float] = None) -> Optional[CrawlerLifecycleWebhook]:
+        """
+        Block until a terminal webhook (finished, stopped or cancelled) is received for a crawl
+
+        A webhook received before the call (at most ``event_ttl`` seconds
+        ago) is returned at once. The webhook is handed to a single waiter.
+
+        Args:
+            crawler_uuid: Crawler job UUID
+            timeout: Maximum seconds to wait (None = wait forever)
+
+        Returns:
+            The webhook, or None on timeout
+        """
+        with self._condition:
+            # Webhooks of crawls nobody waited on are only pruned on dispatch, an expired one must not be returned
+            self._prune()
+            self._condition.wait_for(lambda: crawler_uuid in self._events, timeout)
+            _, webhook = self._events.pop(crawler_uuid, (None, None))
+            return webhook
+
+    def discard(self, crawler_uuid: str):
+        """Drop the terminal webhook kept for a crawl, e.g. once its end was seen by polling"""
+        with self._condition:
+            self._events.pop(crawler_uuid, None)
+
+    def __len__(self) -> int:
+        """Number of terminal webhooks kept for crawls nobody waited on yet"""
+        return len(self._events)
+
+    def __enter__(self) -> 'CrawlerWebhookReceiver':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __repr__(self):
+        state = 'listening' if self._server is not None else 'stopped'
+        return f"CrawlerWebhookReceiver({state}, port={self.port}, path={self.path})"
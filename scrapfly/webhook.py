@@ -1,7 +1,12 @@
-from typing import Callable, Optional, Tuple
+import asyncio
+import inspect
+from typing import Callable, Dict, List, Optional, Tuple
 from enum import Enum
 
 from scrapfly import ResponseBodyHandler
+from scrapfly.errors import WebhookSignatureMissMatch
+from scrapfly.webhook_dedup import DeliveryStore, delivery_key
+from scrapfly.webhook_spool import WebhookSpool
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,7 +18,10 @@ class ResourceType(Enum):
     CRAWLER = 'crawler'
 
 
-def create_server(signing_secrets:Tuple[str], callback:Callable, app:Optional['flask.Flask']=None) -> 'flask.Flask':
+def create_server(signing_secrets:Tuple[str], callback:Optional[Callable], app:Optional['flask.Flask']=None, spool:Optional[WebhookSpool]=None, dedup:Optional[DeliveryStore]=None) -> 'flask.Flask':
+    if callback is None and spool is None:
+        raise ValueError("Expected a callback or a spool to receive the deliveries")
+
     try:
         import flask
     except ImportError:
@@ -24,27 +32,309 @@ def create_server(signing_secrets:Tuple[str], callback:Callable, app:Optional['f
     if app is None:
         app = flask.Flask("Scrapfly Webhook Server")
 
+    body_handler = ResponseBodyHandler(signing_secrets=signing_secrets)
+
     @app.route("/webhook", methods=["POST"])
     def webhook():
         headers = request.headers
         resource_type = headers.get('X-Scrapfly-Webhook-Resource-Type')
 
         if resource_type in (ResourceType.SCRAPE.value, ResourceType.PING.value, ResourceType.CRAWLER.value):
-            body_handler = ResponseBodyHandler(signing_secrets=signing_secrets)
+            try:
+                content = body_handler.verify_content(
+                    content=request.data,
+                    content_encoding=headers.get('Content-Encoding'),
+                    signature=headers.get('X-Scrapfly-Webhook-Signature', None) # Can be none when ping during the webhook creation flow via "ping"
+                )
+            except WebhookSignatureMissMatch:
+                return make_response("", 401)  # Not retried by the sender, unlike a 500
+
+            if spool is not None:
+                # Verified but not decoded: the spool consumer decodes and replaces the callback
+                key = delivery_key(body=content) if dedup is not None else None
+                if key is not None and dedup.seen(key):
+                    return make_response("", 200)  # Retried delivery, already spooled
+                try:
+                    spool.append(
+                        request.data,
+                        resource_type=resource_type,
+                        content_type=headers.get('Content-Type'),
+                        content_encoding=headers.get('Content-Encoding')
+                    )
+                except Exception:
+                    if key is not None:
+                        dedup.discard(key)
+                    raise
+                return make_response("", 200)
+
             data = body_handler.read(
-                content=request.data,
-                content_encoding=headers.get('Content-Encoding'),
+                content=content,
+                content_encoding=None,
                 content_type=headers.get('Content-Type'),
-                signature=headers.get('X-Scrapfly-Webhook-Signature', None) # Can be none when ping during the webhook creation flow via "ping"
+                signature=None
             )
 
+            key = delivery_key(data, body=content) if dedup is not None else None
+            if key is not None and dedup.seen(key):
+                return make_response("", 200)  # Retried delivery, already processed
+
             try:
                 callback(data, resource_type, request)
                 return make_response("", 200)
             except Exception as e:
                 logger.error(e)
+                if key is not None:
+                    dedup.discard(key)  # Let the retry through
                 return make_response("", 500)
 
         return make_response("Do not support resource type %s" % resource_type, 400)
 
-    return app
\ No newline at end of file
+    return app
+
+
+class WebhookASGIApp:
+    """
+    ASGI webhook server acknowledging deliveries before running the callback
+
+    Each delivery is verified and decoded, queued, and answered with 200 at once. The callback runs later
+    on a pool of async workers, so a slow callback never stalls the sender. When the queue is full the
+    delivery is answered with 503, and Scrapfly retries it later.
+
+    The callback is called with (data, resource_type, headers), headers being a dict with lowercase keys.
+    Coroutine functions are awaited, plain functions run in the default thread pool executor.
+
+    With a spool, deliveries are written to it (durably) instead of being queued, and answered with 200 once
+    written: the spool consumer replaces the callback, see WebhookSpool.
+
+    With a delivery store, retried deliveries are acknowledged and dropped, see scrapfly.webhook_dedup.
+
+    Run it with any ASGI server, e.g: uvicorn module:app
+    """
+
+    def __init__(
+        self,
+        signing_secrets: Tuple[str],
+        callback: Optional[Callable],
+        workers: int = 8,
+        queue_size: int = 1000,
+        path: str = '/webhook',
+        spool: Optional[WebhookSpool] = None,
+        dedup: Optional[DeliveryStore] = None
+    ):
+        """
+        :param signing_secrets: webhook signing secrets, used to verify the X-Scrapfly-Webhook-Signature header
+        :param callback: called with (data, resource_type, headers) for each delivery
+        :param workers: number of callbacks running at once
+        :param queue_size: number of acknowledged deliveries waiting for a worker before answering 503
+        :param path: URL path of the webhook endpoint
+        :param spool: write deliveries to this spool instead of running the callback
+        :param dedup: drop the deliveries already recorded in this store
+        :raises ValueError: when neither a callback nor a spool is given
+        """
+        if callback is None and spool is None:
+            raise ValueError("Expected a callback or a spool to receive the deliveries")
+
+        self.callback = callback
+        self.spool = spool
+        self.dedup = dedup
+        self.workers = workers
+        self.queue_size = queue_size
+        self.path = path
+        self._body_handler = ResponseBodyHandler(signing_secrets=signing_secrets)
+        self._is_coroutine = inspect.iscoroutinefunction(callback)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Start the workers, done on the ASGI lifespan startup or on the first delivery"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Wait for the queued deliveries to be processed and stop the workers"""
+        if self._queue is None:
+            return
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._queue = None
+        self._tasks = []
+
+    @property
+    def pending(self) -> int:
+        """Number of acknowledged deliveries waiting for a worker"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            data, resource_type, headers = await self._queue.get()
+            try:
+                if self._is_coroutine:
+                    await self.callback(data, resource_type, headers)
+                else:
+                    await loop.run_in_executor(None, self.callback, data, resource_type, headers)
+            except Exception as e:
+                logger.error(e)
+            finally:
+                self._queue.task_done()
+
+    def _read(self, body: bytes, headers: Dict[str, str], decode: bool = True) -> Tuple[int, bytes, Optional[str], Optional[Dict]]:
+        """
+        Verify and decode a delivery, returns (HTTP status code, response body, delivery key, data)
+
+        The delivery key is None when there is no delivery store. A duplicate is answered with 200 and no data.
+        """
+        resource_type = headers.get('x-scrapfly-webhook-resource-type')
+
+        if resource_type not in (ResourceType.SCRAPE.value, ResourceType.PING.value, ResourceType.CRAWLER.value):
+            return 400, ("Do not support resource type %s" % resource_type).encode('utf-8'), None, None
+
+        signature = headers.get('x-scrapfly-webhook-signature')  # Can be none when ping during the webhook creation flow via "ping"
+        try:
+            # The signature is checked before any decoding
+            content = self._body_handler.verify_content(body, headers.get('content-encoding'), signature)
+            data = self._body_handler.read(
+                content=content,
+                content_encoding=None,
+                content_type=headers.get('content-type') or 'application/json',
+                signature=None
+            ) if decode else None
+        except WebhookSignatureMissMatch:
+            return 401, b'', None, None
+        except Exception as e:
+            logger.error('Invalid webhook payload: %s', e)
+            return 400, b'', None, None
+
+        if self.dedup is None:
+            return 200, b'', None, data
+
+        key = delivery_key(data, body=content)
+        if self.dedup.seen(key):
+            return 200, b'', None, None  # Retried delivery, already accepted
+        return 200, b'', key, data
+
+    def handle(self, body: bytes, headers: Dict[str, str]) -> Tuple[int, bytes]:
+        """
+        Verify, decode and queue a delivery
+
+        :param body: raw request body
+        :param headers: request headers, with lowercase keys
+        :return: (HTTP status code, response body)
+        """
+        status, response, key, data = self._read(body, headers)
+        if status != 200 or data is None:
+            return status, response
+
+        try:
+            self._queue.put_nowait((data, headers.get('x-scrapfly-webhook-resource-type'), headers))
+        except asyncio.QueueFull:
+            if key is not None:
+                self.dedup.discard(key)  # Let the retry through
+            return 503, b''
+
+        return 200, b''
+
+    def spool_delivery(self, body: bytes, headers: Dict[str, str]) -> Tuple[int, bytes]:
+        """
+        Verify a delivery and write it to the spool, blocks until it is durable
+
+        :param body: raw request body
+        :param headers: request headers, with lowercase keys
+        :return: (HTTP status code, response body)
+        """
+        status, response, key, _ = self._read(body, headers, decode=False)
+        if status != 200 or (self.dedup is not None and key is None):
+            return status, response
+
+        try:
+            self.spool.append(
+                body,
+                resource_type=headers.get('x-scrapfly-webhook-resource-type'),
+                content_type=headers.get('content-type'),
+                content_encoding=headers.get('content-encoding')
+            )
+        except Exception:
+            if key is not None:
+                self.dedup.discard(key)
+            raise
+        return 200, b''
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await self.start()
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await self.stop()
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+
+        if scope['type'] != 'http':
+            return
+
+        if scope['path'] != self.path:
+            status, body = 404, b''
+        elif scope['method'] != 'POST':
+            status, body = 405, b''
+        else:
+            chunks = []
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                chunks.append(message.get('body', b''))
+                if not message.get('more_body', False):
+                    break
+
+            headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope['headers']}
+            if self.spool is not None:
+                # fsync in the executor: concurrent deliveries share it (group commit)
+                loop = asyncio.get_running_loop()
+                status, body = await loop.run_in_executor(None, self.spool_delivery, b''.join(chunks), headers)
+            else:
+                await self.start()
+                status, body = self.handle(b''.join(chunks), headers)
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-length', str(len(body)).encode('ascii'))],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def create_asgi_app(
+    signing_secrets: Tuple[str],
+    callback: Optional[Callable],
+    workers: int = 8,
+    queue_size: int = 1000,
+    path: str = '/webhook',
+    spool: Optional[WebhookSpool] = None,
+    dedup: Optional[DeliveryStore] = None
+) -> WebhookASGIApp:
+    """
+    Create an ASGI webhook server answering 200 as soon as a delivery is verified, see WebhookASGIApp
+
+    :param signing_secrets: webhook signing secrets
+    :param callback: called with (data, resource_type, headers) for each delivery, sync or async
+    :param workers: number of callbacks running at once
+    :param queue_size: number of deliveries waiting for a worker before answering 503
+    :param path: URL path of the webhook endpoint
+    :param spool: write deliveries to this spool instead of running the callback
+    :param dedup: drop the deliveries already recorded in this store
+    :return: ASGI application
+    """
+    return WebhookASGIApp(
+        signing_secrets=signing_secrets,
+        callback=callback,
+        workers=workers,
+        queue_size=queue_size,
+        path=path,
+        spool=spool,
+        dedup=dedup
+    )
@@ -0,0 +1,418 @@
+"""
+Webhook Benchmark - Measure the throughput of a webhook server
+
+Generates realistic signed webhook deliveries (scrape results and crawler
+events, JSON or msgpack, optionally gzip or zstd encoded, with a valid
+X-Scrapfly-Webhook-Signature) and replays them against a running server at a
+target rate, then reports the throughput and latency percentiles.
+
+Deliveries are generated before the run, so their cost is not measured. With
+a target rate, each request has a scheduled send time and its latency is
+measured from that time: a server falling behind shows up as growing
+latencies instead of a silently lower send rate.
+
+Usage::
+
+    python -m scrapfly.webhook_benchmark --url http://127.0.0.1:8000/webhook \\
+        --signing-secret SECRET --count 10000 --rate 1000 --concurrency 32 \\
+        --content-type json,msgpack --content-encoding identity,gzip
+"""
+
+import argparse
+import gzip
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import threading
+import time
+import uuid as uuid_lib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import requests
+
+Delivery = Tuple[bytes, Dict[str, str]]
+
+CONTENT_TYPES = ('json', 'msgpack')
+CONTENT_ENCODINGS = ('identity', 'gzip', 'zstd')
+
+_WORDS = (
+    'product', 'price', 'review', 'shipping', 'delivery', 'stock', 'color', 'size', 'rating', 'brand',
+    'discount', 'order', 'cart', 'checkout', 'category', 'warranty', 'return', 'customer', 'detail', 'offer',
+)
+
+
+def _compress(content: bytes, content_encoding: str) -> bytes:
+    if content_encoding == 'identity':
+        return content
+    if content_encoding == 'gzip':
+        return gzip.compress(content)
+    if content_encoding == 'zstd':
+        try:
+            from compression import zstd as _zstd  # Python 3.14+
+            return _zstd.compress(content)
+        except ImportError:
+            pass
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstandard is not installed, please install it with `pip install \"scrapfly-sdk[speedups]\"`")
+        return zstandard.compress(content)
+    raise ValueError(f"Unsupported content encoding: {content_encoding!r}, expected one of {', '.join(CONTENT_ENCODINGS)}")
+
+
+def _serialize(data: Dict, content_type: str) -> bytes:
+    if content_type == 'json':
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+    if content_type == 'msgpack':
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError("msgpack is not installed, please install it with `pip install \"scrapfly-sdk[speedups]\"`")
+        return msgpack.dumps(data)
+    raise ValueError(f"Unsupported content type: {content_type!r}, expected one of {', '.join(CONTENT_TYPES)}")
+
+
+class WebhookPayloadFactory:
+    """
+    Build signed webhook deliveries shaped like the ones sent by Scrapfly
+
+    Example:
+        ```python
+        factory = WebhookPayloadFactory('YOUR-SIGNING-SECRET', seed=1)
+        body, headers = factory.encode(factory.crawler_payload('crawler_url_visited'), 'crawler', content_encoding='gzip')
+        requests.post('http://127.0.0.1:8000/webhook', data=body, headers=headers)
+        ```
+    """
+
+    # Action tag sent with each event
+    ACTIONS = {
+        'crawler_started': 'started', 'crawler_stopped': 'stopped', 'crawler_cancelled': 'cancelled',
+        'crawler_finished': 'finished', 'crawler_url_visited': 'visited', 'crawler_url_skipped': 'skipped',
+        'crawler_url_discovered': 'url_discovery', 'crawler_url_failed': 'failed',
+    }
+
+    def __init__(self, signing_secret: str, seed: Optional[int] = None, page_size: int = 20 * 1024):
+        """
+        Args:
+            signing_secret: Secret used to sign the deliveries
+            seed: Random seed, for reproducible payloads
+            page_size: Approximate size in bytes of the scraped HTML pages
+        """
+        self.signing_secret = signing_secret.encode('utf-8')
+        self.page_size = page_size
+        self._random = random.Random(seed)
+        self._crawler_uuid = str(uuid_lib.UUID(int=self._random.getrandbits(128)))
+        self._page = itertools.count(1)
+
+    def _html(self) -> str:
+        words = []
+        size = 0
+        while size < self.page_size:
+            word = self._random.choice(_WORDS)
+            words.append(word)
+            size += len(word) + 1
+        paragraphs = (' '.join(words[i:i + 60]) for i in range(0, len(words), 60))
+        return '<html><body>' + ''.join(f'<p>{paragraph}</p>' for paragraph in paragraphs) + '</body></html>'
+
+    def _state(self, visited: int) -> Dict:
+        return {
+            'duration': round(visited * 0.4, 2), 'urls_visited': visited, 'urls_extracted': visited * 10,
+            'urls_failed': 0, 'urls_skipped': visited * 3, 'urls_to_crawl': visited * 7,
+            'api_credit_used': visited, 'stop_reason': None, 'start_time': 1762940028, 'stop_time': None,
+        }
+
+    def scrape_payload(self) -> Dict:
+        """Scrape API result, as delivered to a scrape webhook"""
+        page = next(self._page)
+        url = f'https://web-scraping.dev/product/{page}'
+        log_uuid = uuid_lib.UUID(int=self._random.getrandbits(128)).hex.upper()
+        return {
+            'uuid': log_uuid,
+            'config': {'url': url, 'method': 'GET', 'country': 'de', 'render_js': False, 'asp': False},
+            'context': {'asp': False, 'cost': {'total': 1}, 'proxy': {'country': 'de', 'pool': 'public_datacenter_pool'}},
+            'result': {
+                'url': url,
+                'status_code': 200,
+                'success': True,
+                'status': 'DONE',
+                'format': 'text',
+                'content_type': 'text/html; charset=utf-8',
+                'response_headers': {'content-type': 'text/html; charset=utf-8'},
+                'content': self._html(),
+                'duration': round(self._random.uniform(0.5, 3.0), 2),
+                'log_url': f'https://scrapfly.io/dashboard/monitoring/log/{log_uuid}',
+            },
+        }
+
+    def crawler_payload(self, event: str) -> Dict:
+        """Crawler webhook envelope for an event (see CrawlerWebhookEvent)"""
+        page = next(self._page)
+        url = f'https://web-scraping.dev/product/{page}'
+        payload = {
+            'crawler_uuid': self._crawler_uuid,
+            'project': 'default',
+            'env': 'LIVE',
+            'action': self.ACTIONS.get(event, event),
+            'state': self._state(page),
+        }
+        if event in ('crawler_started', 'crawler_stopped', 'crawler_cancelled', 'crawler_finished'):
+            payload.update(seed_url='https://web-scraping.dev/products', links={
+                'status': f'https://api.scrapfly.io/crawl/{self._crawler_uuid}/status',
+            })
+        elif event == 'crawler_url_visited':
+            log_uuid = uuid_lib.UUID(int=self._random.getrandbits(128)).hex.upper()
+            payload.update(url=url, scrape={
+                'status_code': 200, 'country': 'de', 'log_uuid': log_uuid,
+                'log_url': f'https://scrapfly.io/dashboard/monitoring/log/{log_uuid}',
+                'content': {'html': self._html()},
+            })
+        elif event == 'crawler_url_discovered':
+            payload.update(origin=url, discovered_urls=[f'{url}?variant={i}' for i in range(10)])
+        elif event == 'crawler_url_skipped':
+            payload.update(urls={f'{url}?variant={i}': 'page_limit' for i in range(5)})
+        elif event == 'crawler_url_failed':
+            payload.update(url=url, error='ERR::SCRAPE::UPSTREAM_TIMEOUT', scrape_config={'url': url}, links={
+                'log': None, 'scrape': f'https://api.scrapfly.io/scrape?url={url}',
+            })
+        else:
+            raise ValueError(f"Unknown crawler webhook event: {event!r}")
+        return {'event': event, 'payload': payload}
+
+    def sign(self, content: bytes) -> str:
+        """Signature of an (uncompressed) body"""
+        return hmac.new(self.signing_secret, content, hashlib.sha256).hexdigest().upper()
+
+    def encode(
+        self,
+        data: Dict,
+        resource_type: str,
+        content_type: str = 'json',
+        content_encoding: str = 'identity'
+    ) -> Delivery:
+        """
+        Serialize, sign and compress a payload
+
+        Args:
+            data: Payload
+            resource_type: 'scrape' or 'crawler'
+            content_type: 'json' or 'msgpack'
+            content_encoding: 'identity', 'gzip' or 'zstd'
+
+        Returns:
+            (body, headers)
+        """
+        content = _serialize(data, content_type)
+        headers = {
+            'Content-Type': f'application/{content_type}',
+            'X-Scrapfly-Webhook-Resource-Type': resource_type,
+            'X-Scrapfly-Webhook-Signature': self.sign(content),
+        }
+        if content_encoding != 'identity':
+            headers['Content-Encoding'] = content_encoding
+        return _compress(content, content_encoding), headers
+
+    def deliveries(
+        self,
+        count: int,
+        scrape_ratio: float = 0.1,
+        content_types: Sequence[str] = ('json',),
+        content_encodings: Sequence[str] = ('identity',)
+    ) -> List[Delivery]:
+        """
+        Generate a mix of deliveries
+
+        Crawler deliveries follow the proportions of a real crawl: mostly
+        ``crawler_url_visited``, some discovered / skipped / failed URLs.
+        Content types and encodings are cycled through.
+
+        Args:
+            count: Number of deliveries
+            scrape_ratio: Share of scrape deliveries, the rest are crawler deliveries
+            content_types: Content types to cycle through ('json', 'msgpack')
+            content_encodings: Encodings to cycle through ('identity', 'gzip', 'zstd')
+
+        Returns:
+            List of (body, headers)
+        """
+        crawler_events = ['crawler_url_visited'] * 14 + ['crawler_url_discovered'] * 3 + \
+            ['crawler_url_skipped', 'crawler_url_failed']
+        formats = itertools.cycle(itertools.product(content_types, content_encodings))
+
+        result = []
+        for index in range(count):
+            content_type, content_encoding = next(formats)
+            if self._random.random() < scrape_ratio:
+                data, resource_type = self.scrape_payload(), 'scrape'
+            else:
+                event = 'crawler_started' if index == 0 else self._random.choice(crawler_events)
+                data, resource_type = self.crawler_payload(event), 'crawler'
+            result.append(self.encode(data, resource_type, content_type, content_encoding))
+        return result
+
+
+def _percentile(ordered: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not ordered:
+        return 0.0
+    rank = max(int(round(percent / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class WebhookBenchmarkResult:
+    """Outcome of a benchmark run, latencies are in seconds"""
+
+    PERCENTILES = (50, 90, 99, 99.9)
+
+    def __init__(self, latencies: List[float], statuses: Dict[int, int], errors: int, duration: float, bytes_sent: int):
+        self.latencies = sorted(latencies)
+        self.statuses = statuses
+        self.errors = errors  # Connection errors and timeouts
+        self.duration = duration
+        self.bytes_sent = bytes_sent
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + self.errors
+
+    @property
+    def succeeded(self) -> int:
+        return sum(count for status, count in self.statuses.items() if 200 <= status < 300)
+
+    @property
+    def throughput(self) -> float:
+        """Successful deliveries per second"""
+        return self.succeeded / self.duration if self.duration else 0.0
+
+    def percentile(self, percent: float) -> float:
+        return _percentile(self.latencies, percent)
+
+    def to_dict(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'succeeded': self.succeeded,
+            'errors': self.errors,
+            'statuses': dict(self.statuses),
+            'duration': self.duration,
+            'throughput': self.throughput,
+            'bytes_sent': self.bytes_sent,
+            'latency': dict(
+                {f'p{percent:g}': self.percentile(percent) for percent in self.PERCENTILES},
+                max=self.latencies[-1] if self.latencies else 0.0,
+            ),
+        }
+
+    def __str__(self):
+        lines = [
+            f"requests:    {self.requests} in {self.duration:.2f}s ({self.bytes_sent / 1024 / 1024:.1f} MiB sent)",
+            f"throughput:  {self.throughput:.1f} deliveries/s",
+            f"statuses:    {', '.join(f'{status}={count}' for status, count in sorted(self.statuses.items())) or '-'}"
+            + (f", connection errors={self.errors}" if self.errors else ''),
+            "latency:     " + ', '.join(
+                [f"p{percent:g}={self.percentile(percent) * 1000:.1f}ms" for percent in self.PERCENTILES]
+                + [f"max={(self.latencies[-1] if self.latencies else 0) * 1000:.1f}ms"]
+            ),
+        ]
+        return '\n'.join(lines)
+
+
+def run_benchmark(
+    url: str,
+    deliveries: Iterable[Delivery],
+    rate: Optional[float] = None,
+    concurrency: int = 16,
+    timeout: float = 10.0
+) -> WebhookBenchmarkResult:
+    """
+    Replay deliveries against a webhook server
+
+    Args:
+        url: Webhook endpoint, e.g. http://127.0.0.1:8000/webhook
+        deliveries: (body, headers) to send, see WebhookPayloadFactory.deliveries()
+        rate: Target deliveries per second (None = as fast as ``concurrency`` allows)
+        concurrency: Maximum number of requests in flight
+        timeout: Request timeout in seconds
+
+    Returns:
+        WebhookBenchmarkResult
+    """
+    deliveries = list(deliveries)
+    lock = threading.Lock()
+    next_index = itertools.count()
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    errors = 0
+    bytes_sent = 0
+    local = threading.local()
+
+    def worker(start: float):
+        nonlocal errors, bytes_sent
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+
+        while True:
+            with lock:
+                index = next(next_index)
+            if index >= len(deliveries):
+                return
+            body, headers = deliveries[index]
+
+            scheduled = start + index / rate if rate else time.perf_counter()
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            try:
+                response = session.post(url, data=body, headers=headers, timeout=timeout)
+            except requests.RequestException:
+                with lock:
+                    errors += 1
+                continue
+            # Measured from the scheduled time: queueing behind a slow server counts
+            latency = time.perf_counter() - scheduled
+            with lock:
+                latencies.append(latency)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                bytes_sent += len(body)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(worker, start) for _ in range(concurrency)]
+        for future in futures:
+            future.result()
+    duration = time.perf_counter() - start
+
+    return WebhookBenchmarkResult(latencies, statuses, errors, duration, bytes_sent)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay signed webhook deliveries against a webhook server")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/webhook", help="Webhook endpoint")
+    parser.add_argument("--signing-secret", required=True, help="Signing secret configured on the server")
+    parser.add_argument("--count", type=int, default=10000, help="Number of deliveries to send")
+    parser.add_argument("--rate", type=float, default=None, help="Target deliveries per second (default: unbounded)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum number of requests in flight")
+    parser.add_argument("--scrape-ratio", type=float, default=0.1, help="Share of scrape deliveries, the rest are crawler events")
+    parser.add_argument("--content-type", default="json", help="Comma separated content types: json, msgpack")
+    parser.add_argument("--content-encoding", default="identity", help="Comma separated encodings: identity, gzip, zstd")
+    parser.add_argument("--page-size", type=int, default=20 * 1024, help="Approximate size of the HTML pages in bytes")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args(argv)
+
+    factory = WebhookPayloadFactory(args.signing_secret, seed=args.seed, page_size=args.page_size)
+    deliveries = factory.deliveries(
+        args.count,
+        scrape_ratio=args.scrape_ratio,
+        content_types=args.content_type.split(','),
+        content_encodings=args.content_encoding.split(','),
+    )
+    result = run_benchmark(args.url, deliveries, rate=args.rate, concurrency=args.concurrency)
+    print(json.dumps(result.to_dict(), indent=2) if args.json else result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Webhook Deduplication - Drop retried webhook deliveries before the callback
+
+A delivery is retried when its acknowledgement is lost or late, so the same
+event can reach the callback twice. A DeliveryStore remembers the identity of
+the deliveries seen in the last ``ttl`` seconds and answers, in one atomic
+check-and-set, whether a delivery is new:
+
+    MemoryDeliveryStore  bounded in-memory FIFO with TTL, for a single process
+    SQLiteDeliveryStore  local SQLite file, shared by the workers of a host
+
+The identity of a delivery (see delivery_key()) is the crawler UUID, event
+and URL for the crawler events that have one, and a hash of the body
+otherwise.
+"""
+
+import hashlib
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+from scrapfly.crawler.crawler_webhook import CrawlerWebhookBase, _delivery_id
+
+
+def delivery_key(payload: Union[CrawlerWebhookBase, Dict[str, Any], None] = None, body: Optional[bytes] = None) -> str:
+    """
+    Get the identity of a webhook delivery
+
+    :param payload: typed crawler webhook, or decoded webhook body
+    :param body: raw (or decompressed) request body, hashed when the payload has no stable identity
+    :return: the delivery key
+    """
+    key = None
+    if isinstance(payload, CrawlerWebhookBase):
+        key = payload.delivery_id
+    elif isinstance(payload, dict) and isinstance(payload.get('payload'), dict):
+        inner = payload['payload']
+        key = _delivery_id(payload.get('event'), inner.get('crawler_uuid'), inner.get('url'))
+
+    if key is not None:
+        return key
+    if body is None:
+        raise ValueError("The payload has no stable identity, pass the request body")
+    return 'sha256:' + hashlib.sha256(body).hexdigest()
+
+
+class DeliveryStore(ABC):
+    """Remembers the deliveries seen recently, see MemoryDeliveryStore and SQLiteDeliveryStore"""
+
+    def __init__(self, ttl: float = 3600.0):
+        """
+        :param ttl: seconds a delivery is remembered, longer than the retry window of the sender
+        """
+        self.ttl = ttl
+
+    @abstractmethod
+    def seen(self, key: str) -> bool:
+        """
+        Record a delivery
+
+        :param key: delivery key, see delivery_key()
+        :return: True if the delivery was already seen (a duplicate to drop), False if it is new
+        """
+
+    @abstractmethod
+    def discard(self, key: str):
+        """Forget a delivery, e.g. when its processing failed and the retry must go through"""
+
+
+class MemoryDeliveryStore(DeliveryStore):
+    """
+    In-memory store, bounded in number of entries: the oldest entries are
+    dropped first when it is full, expired entries as they are met
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 100_000):
+        """
+        :param ttl: seconds a delivery is remembered
+        :param max_entries: maximum number of deliveries remembered
+        """
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> expiration time, oldest first
+        self._entries: 'OrderedDict[str, float]' = OrderedDict()
+
+    def seen(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            # Same ttl for every entry: the expired ones are at the front
+            while self._entries:
+                oldest, expires = next(iter(self._entries.items()))
+                if expires > now:
+                    break
+                del self._entries[oldest]
+
+            if key in self._entries:
+                return True
+
+            self._entries[key] = now + self.ttl
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return False
+
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteDeliveryStore(DeliveryStore):
+    """
+    Store kept in a local SQLite file, shared by every process and thread
+    using the same path (e.g. the workers of a gunicorn server)
+    """
+
+    # Expired entries are purged every PURGE_INTERVAL new deliveries
+    PURGE_INTERVAL = 1000
+
+    def __init__(self, path: str, ttl: float = 3600.0):
+        """
+        :param path: database file (created if missing)
+        :param ttl: seconds a delivery is remembered
+        """
+        super().__init__(ttl)
+        self.path = os.path.abspath(os.path.expanduser(os.fspath(path)))
+        self._local = threading.local()
+        self._inserts = 0
+
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS deliveries (key TEXT PRIMARY KEY, expires REAL NOT NULL) WITHOUT ROWID'
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, sqlite3 connections can't be shared"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def seen(self, key: str) -> bool:
+        now = time.time()
+        connection = self._connection()
+        # Insert, or take over an expired entry: no row changed means a live duplicate
+        cursor = connection.execute(
+            'INSERT INTO deliveries (key, expires) VALUES (?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET expires = excluded.expires WHERE deliveries.expires <= ?',
+            (key, now + self.ttl, now)
+        )
+        if cursor.rowcount == 0:
+            return True
+
+        self._inserts += 1
+        if self._inserts % self.PURGE_INTERVAL == 0:
+            connection.execute('DELETE FROM deliveries WHERE expires <= ?', (now,))
+        return False
+
+    def discard(self, key: str):
+        self._connection().execute('DELETE FROM deliveries WHERE key = ?', (key,))
+
+    def __len__(self) -> int:
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM deliveries WHERE expires > ?', (time.time(),)
+        ).fetchone()[0]
@@ -0,0 +1,370 @@
+"""
+Webhook Spool - Durable on-disk queue of verified webhook deliveries
+
+The webhook servers write each verified delivery to the spool before
+acknowledging it, and a consumer drains the spool at its own pace: a restart
+or a slow consumer no longer loses deliveries, and bursts (e.g. crawler
+``url_visited`` events) are absorbed at disk speed.
+
+The spool is a directory of append-only segment files. Each record holds the
+raw delivery body with the headers needed to decode it, framed with its
+length and CRC32. Concurrent appends share fsync calls (group commit): every
+append returns once its record is on disk, but a single fsync covers all the
+records written while the previous one was running. The consumer position is
+kept in a cursor file, and fully consumed segments are deleted.
+
+A spool directory has a single producer process, enforced with a lock file
+(on platforms with fcntl): give each server worker process its own directory.
+Consumers don't take the lock.
+
+Layout::
+
+    <directory>/00000000000000000001.seg
+    <directory>/00000000000000000002.seg
+    <directory>/cursor
+    <directory>/producer.lock
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from scrapfly.api_response import ResponseBodyHandler
+from scrapfly.errors import WebhookError
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_SEGMENT_SUFFIX = '.seg'
+_CURSOR_FILE = 'cursor'
+_LOCK_FILE = 'producer.lock'
+# crc32 of meta + body, meta length, body length
+_FRAME = struct.Struct('<III')
+
+
+class SpooledEvent:
+    """A webhook delivery read from the spool, decoded on first access to ``data``"""
+
+    __slots__ = ('resource_type', 'content_type', 'content_encoding', 'received_at', 'body', 'position', '_data')
+
+    def __init__(self, meta: Dict[str, Any], body: bytes, position: Tuple[int, int]):
+        self.resource_type: Optional[str] = meta.get('resource_type')
+        self.content_type: str = meta.get('content_type') or 'application/json'
+        self.content_encoding: Optional[str] = meta.get('content_encoding')
+        self.received_at: Optional[float] = meta.get('received_at')
+        self.body = body
+        # (segment number, offset after the record)
+        self.position = position
+        self._data = None
+
+    @property
+    def data(self) -> Dict:
+        """Decoded payload (the signature was verified before spooling)"""
+        if self._data is None:
+            self._data = ResponseBodyHandler().read(
+                content=self.body,
+                content_encoding=self.content_encoding,
+                content_type=self.content_type,
+                signature=None
+            )
+        return self._data
+
+    def __repr__(self):
+        return f"SpooledEvent(resource_type={self.resource_type}, size={len(self.body)}, position={self.position})"
+
+
+class WebhookSpool:
+    """
+    Append-only segmented spool of webhook deliveries
+
+    Example:
+        ```python
+        from scrapfly import webhook
+        from scrapfly.webhook_spool import WebhookSpool
+
+        spool = WebhookSpool('/var/spool/scrapfly')
+
+        # Server side: deliveries are spooled, then acknowledged
+        app = webhook.create_server(signing_secrets=('YOUR-SIGNING-SECRET',), callback=None, spool=spool)
+
+        # Consumer side, e.g. in another process
+        while True:
+            spool.drain(lambda data, resource_type: save(data), batch_size=500)
+            time.sleep(1)
+        ```
+    """
+
+    DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024  # 64 MiB
+
+    def __init__(self, directory: str, segment_size: int = DEFAULT_SEGMENT_SIZE, fsync: bool = True):
+        """
+        Args:
+            directory: Spool directory (created if missing)
+            segment_size: Size in bytes after which a new segment file is started
+            fsync: Wait for each appended record to be flushed to disk (group
+                commit). When False, records are left to the OS page cache and
+                survive a process crash but not a power loss.
+        """
+        self.directory = os.path.abspath(os.path.expanduser(os.fspath(directory)))
+        self.segment_size = segment_size
+        self.fsync = fsync
+
+        self._lock = threading.Lock()  # Serializes writes to the active segment
+        self._sync_lock = threading.Lock()  # Held by the thread running fsync
+        self._file = None
+        self._lock_file = None
+        self._segment = 0
+        self._offset = 0
+        self._written = 0  # Records written
+        self._synced = 0  # Records known to be on disk
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    # -- Segments ------------------------------------------------------------
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f'{segment:020d}{_SEGMENT_SUFFIX}')
+
+    def segments(self) -> List[int]:
+        """Numbers of the segment files, oldest first"""
+        return sorted(
+            int(name[:-len(_SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(_SEGMENT_SUFFIX) and name[:-len(_SEGMENT_SUFFIX)].isdigit()
+        )
+
+    @staticmethod
+    def _iter_frames(f, offset: int) -> Iterator[Tuple[Dict[str, Any], bytes, int]]:
+        """Yield (meta, body, end offset) of the complete, valid records of a segment"""
+        f.seek(offset)
+        while True:
+            header = f.read(_FRAME.size)
+            if len(header) < _FRAME.size:
+                return
+            crc, meta_size, body_size = _FRAME.unpack(header)
+            payload = f.read(meta_size + body_size)
+            if len(payload) < meta_size + body_size or zlib.crc32(payload) != crc:
+                return  # Record being written, or torn by a crash
+            offset += _FRAME.size + meta_size + body_size
+            yield json.loads(payload[:meta_size]), payload[meta_size:], offset
+
+    def _lock_producer(self):
+        """Take the producer lock, the last segment is truncated on open and must have a single writer"""
+        if fcntl is None:
+            return
+        lock_file = open(os.path.join(self.directory, _LOCK_FILE), 'ab')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise WebhookError(f"Spool {self.directory} is used by another producer, use one directory per process")
+        self._lock_file = lock_file
+
+    def _open_segment(self):
+        self._lock_producer()
+        segments = self.segments()
+        if segments:
+            # Resume the last segment after its last valid record (drops a torn write)
+            self._segment = segments[-1]
+            path = self._segment_path(self._segment)
+            with open(path, 'rb') as f:
+                self._offset = 0
+                for _, _, end in self._iter_frames(f, 0):
+                    self._offset = end
+            self._file = open(path, 'r+b')
+            self._file.truncate(self._offset)
+            self._file.seek(self._offset)
+        else:
+            self._new_segment(1)
+
+    def _new_segment(self, segment: int):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        self._segment = segment
+        self._offset = 0
+        self._file = open(self._segment_path(segment), 'ab')
+
+    # -- Producer ------------------------------------------------------------
+
+    def append(
+        self,
+        body: bytes,
+        resource_type: Optional[str] = None,
+        content_type: Optional[str] = None,
+        content_encoding: Optional[str] = None
+    ):
+        """
+        Append a verified delivery, returns once it is durable (see ``fsync``)
+
+        Args:
+            body: Raw request body, as received
+            resource_type: X-Scrapfly-Webhook-Resource-Type header
+            content_type: Content-Type header
+            content_encoding: Content-Encoding header
+        """
+        meta = json.dumps({
+            'resource_type': resource_type,
+            'content_type': content_type,
+            'content_encoding': content_encoding,
+            'received_at': time.time(),
+        }, separators=(',', ':')).encode('utf-8')
+        payload = meta + body
+        frame = _FRAME.pack(zlib.crc32(payload), len(meta), len(body)) + payload
+
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            elif self._offset >= self.segment_size:
+                self._new_segment(self._segment + 1)
+            self._file.write(frame)
+            self._offset += len(frame)
+            self._written += 1
+            record = self._written
+
+        if not self.fsync:
+            with self._lock:
+                if self._file is not None:
+                    self._file.flush()
+            return
+
+        # Group commit: the thread getting the sync lock flushes every record written so far
+        with self._sync_lock:
+            if self._synced >= record:
+                return  # Covered by the fsync of another thread
+            with self._lock:
+                if self._file is None:
+                    return  # Synced by close()
+                self._file.flush()
+                written = self._written
+                # Rotated or closed segments are synced by _new_segment() / close(). A duplicate of
+                # the descriptor stays valid if the segment is closed while it is being synced.
+                fileno = os.dup(self._file.fileno())
+            try:
+                os.fsync(fileno)
+            finally:
+                os.close(fileno)
+            self._synced = written
+
+    def close(self):
+        """Flush and close the active segment"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+            if self._lock_file is not None:
+                self._lock_file.close()  # Releases the producer lock
+                self._lock_file = None
+
+    # -- Consumer ------------------------------------------------------------
+
+    def _read_cursor(self) -> Tuple[int, int]:
+        try:
+            with open(os.path.join(self.directory, _CURSOR_FILE), 'r') as f:
+                segment, offset = f.read().split()
+                return int(segment), int(offset)
+        except (OSError, ValueError):
+            return 0, 0
+
+    def iter_events(self, position: Optional[Tuple[int, int]] = None) -> Iterator[SpooledEvent]:
+        """
+        Iterate through the spooled deliveries, oldest first
+
+        Stops at the end of the spool: records appended later are picked up
+        by the next call.
+
+        Args:
+            position: (segment, offset) to read from, default to the committed cursor
+
+        Yields:
+            SpooledEvent: Each delivery, pass its ``position`` to commit()
+        """
+        start_segment, start_offset = position if position is not None else self._read_cursor()
+        for segment in self.segments():
+            if segment < start_segment:
+                continue
+            try:
+                f = open(self._segment_path(segment), 'rb')
+            except FileNotFoundError:
+                continue  # Deleted by a concurrent commit
+            with f:
+                offset = start_offset if segment == start_segment else 0
+                for meta, body, end in self._iter_frames(f, offset):
+                    yield SpooledEvent(meta, body, (segment, end))
+
+    def commit(self, position: Tuple[int, int]):
+        """
+        Persist the consumer position and delete the fully consumed segments
+
+        Args:
+            position: ``position`` of the last processed SpooledEvent
+        """
+        segment, offset = position
+        path = os.path.join(self.directory, _CURSOR_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(f'{segment} {offset}')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        for consumed in self.segments():
+            if consumed >= segment:
+                break
+            try:
+                os.remove(self._segment_path(consumed))
+            except FileNotFoundError:
+                pass
+
+    def drain(self, callback: Callable[[Dict, Optional[str]], Any], batch_size: int = 100) -> int:
+        """
+        Process every spooled delivery and commit the position as it goes
+
+        The position is committed every ``batch_size`` deliveries, so after a
+        crash at most ``batch_size`` deliveries are processed again. When the
+        callback raises, the deliveries processed before are committed and the
+        exception is propagated: the failing delivery is retried by the next
+        drain.
+
+        Args:
+            callback: Called with (data, resource_type) for each delivery
+            batch_size: Number of deliveries processed between two commits
+
+        Returns:
+            Number of processed deliveries
+        """
+        count = 0
+        last_position = None
+        try:
+            for event in self.iter_events():
+                callback(event.data, event.resource_type)
+                last_position = event.position
+                count += 1
+                if count % batch_size == 0:
+                    self.commit(last_position)
+        finally:
+            if last_position is not None and count % batch_size:
+                self.commit(last_position)
+        return count
+
+    def __len__(self) -> int:
+        """Number of deliveries waiting to be consumed"""
+        return sum(1 for _ in self.iter_events())
+
+    def __enter__(self) -> 'WebhookSpool':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return f"WebhookSpool(directory={self.directory}, segments={len(self.segments())})"
@@ -80,6 +80,9 @@ EXTRA_DEPENDENCIES = {
     'webhook-server': [
         'flask',
     ],
+    'export': [
+        'pyarrow',
+    ],
     'concurrency': [],
     'browser': [
         'playwright>=1.40.0',
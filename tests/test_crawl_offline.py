@@ -0,0 +1,665 @@
+"""
+Unit tests for the Crawl helpers talking to the Crawler API.
+
+The API is replaced by scripted fakes: status sequences per crawler UUID
+and canned HTTP responses, shaped like the engine responses.
+
+These tests are pure: no network, no credentials.
+"""
+
+import asyncio
+import base64
+import threading
+import time
+
+import pytest
+
+from scrapfly import (
+    Crawl,
+    CrawlCache,
+    CrawlerConfig,
+    CrawlerStatusResponse,
+    CrawlOrchestrator,
+    CrawlWaiter,
+    CrawlerUrlsResponse,
+    ScrapflyClient,
+    ScrapflyCrawlerError,
+    ScrapflyError,
+)
+from scrapfly.batch import iter_batch_parts
+from scrapfly.crawler.crawl_waiter import _PollSchedule
+
+
+# ---------------------------------------------------------------------------
+# Fixture factory helpers
+# ---------------------------------------------------------------------------
+
+
+def _status(uuid, status='RUNNING', visited=0, to_crawl=10, failed=0, is_success=None):
+    return CrawlerStatusResponse({
+        'crawler_uuid': uuid,
+        'status': status,
+        'is_success': is_success,
+        'is_finished': status in ('DONE', 'CANCELLED'),
+        'state': {
+            'urls_visited': visited,
+            'urls_extracted': to_crawl,
+            'urls_to_crawl': to_crawl,
+            'urls_failed': failed,
+            'urls_skipped': 0,
+            'api_credit_used': visited,
+            'duration': 1.0,
+        },
+    })
+
+
+class _FakeStatusClient:
+    """Serves scripted status sequences, the last status repeats"""
+
+    def __init__(self, scripts):
+        self._scripts = {uuid: list(statuses) for uuid, statuses in scripts.items()}
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def get_crawl_status(self, uuid):
+        with self._lock:
+            self.calls.append(uuid)
+            script = self._scripts[uuid]
+            return script.pop(0) if len(script) > 1 else script[0]
+
+
+def _started_crawl(client, uuid):
+    crawl = Crawl(client, CrawlerConfig(url='https://web-scraping.dev'))
+    crawl._uuid = uuid
+    return crawl
+
+
+# ---------------------------------------------------------------------------
+# CrawlWaiter
+# ---------------------------------------------------------------------------
+
+
+def _waiter_scripts():
+    return {
+        'slow': [_status('slow')] * 3 + [_status('slow', 'DONE', visited=10, is_success=True)],
+        'fast': [_status('fast', 'DONE', visited=10, is_success=True)],
+        'failed': [_status('failed'), _status('failed', 'DONE', visited=2, is_success=False)],
+    }
+
+
+def test_crawl_waiter_yields_as_finished():
+    client = _FakeStatusClient(_waiter_scripts())
+    crawls = [_started_crawl(client, uuid) for uuid in ('slow', 'fast', 'failed')]
+
+    finished = [crawl.uuid for crawl in CrawlWaiter(crawls, min_interval=0.01, max_interval=0.02)]
+
+    assert finished == ['fast', 'failed', 'slow']
+    assert client.calls.count('fast') == 1
+    assert crawls[2].status(refresh=False).is_failed
+
+
+def test_crawl_waiter_async():
+    client = _FakeStatusClient(_waiter_scripts())
+    crawls = [_started_crawl(client, uuid) for uuid in ('slow', 'fast', 'failed')]
+
+    async def collect():
+        return [crawl.uuid async for crawl in CrawlWaiter(crawls, min_interval=0.01, max_interval=0.02)]
+
+    assert asyncio.run(collect()) == ['fast', 'failed', 'slow']
+
+
+def test_crawl_waiter_async_early_exit_does_not_block():
+    release = threading.Event()
+
+    class _BlockingClient(_FakeStatusClient):
+        def get_crawl_status(self, uuid):
+            if uuid == 'stuck':
+                release.wait(5)
+            return super().get_crawl_status(uuid)
+
+    client = _BlockingClient({'fast': _waiter_scripts()['fast'], 'stuck': [_status('stuck')]})
+    crawls = [_started_crawl(client, uuid) for uuid in ('stuck', 'fast')]
+
+    async def first():
+        iterator = CrawlWaiter(crawls, min_interval=0.01).__aiter__()
+        crawl = await iterator.__anext__()
+        start = time.monotonic()
+        # The status request of 'stuck' is still running
+        await iterator.aclose()
+        return crawl.uuid, time.monotonic() - start
+
+    try:
+        uuid, elapsed = asyncio.run(first())
+    finally:
+        release.set()
+    assert uuid == 'fast'
+    assert elapsed < 1
+
+
+def test_crawl_waiter_timeout():
+    client = _FakeStatusClient({'stuck': [_status('stuck')]})
+    waiter = CrawlWaiter([_started_crawl(client, 'stuck')], min_interval=0.01, max_interval=0.01, max_wait=0.05)
+
+    with pytest.raises(ScrapflyCrawlerError) as exc_info:
+        waiter.wait_all()
+    assert exc_info.value.code == 'TIMEOUT'
+
+
+def test_crawl_waiter_requires_started_crawls():
+    crawl = Crawl(_FakeStatusClient({}), CrawlerConfig(url='https://web-scraping.dev'))
+
+    with pytest.raises(ScrapflyCrawlerError):
+        CrawlWaiter([crawl])
+
+
+def test_poll_interval_follows_progress_rate():
+    schedule = _PollSchedule(1.0)
+
+    # No rate yet: back off
+    assert schedule.next_interval(_status('a', 'PENDING', to_crawl=0), 0.0, 1.0, 60.0) == 1.5
+    # 10 URLs in 10s, 90 left: ~90s remaining, polled at half of it
+    assert schedule.next_interval(_status('a', visited=10, to_crawl=100), 10.0, 1.0, 60.0) == 45.0
+    assert schedule.next_interval(_status('a', visited=20, to_crawl=100), 20.0, 1.0, 60.0) == 40.0
+    # Stalled: back off from the last interval
+    assert schedule.next_interval(_status('a', visited=20, to_crawl=100), 60.0, 1.0, 50.0) == 50.0
+    # Nothing left to crawl: poll fast
+    assert schedule.next_interval(_status('a', visited=100, to_crawl=100), 70.0, 1.0, 60.0) == 1.0
+
+
+# ---------------------------------------------------------------------------
+# CrawlOrchestrator
+# ---------------------------------------------------------------------------
+
+
+class _FakeOrchestratedClient(_FakeStatusClient):
+    """Starts crawls named after their config URL, rejects starts over the account limit"""
+
+    CONCURRENCY_AUTO = 'auto'
+
+    def __init__(self, scripts, account_limit):
+        super().__init__(scripts)
+        self.account_limit = account_limit
+        self.running = set()
+        self.max_running = 0
+        self.rejected = 0
+
+    def account(self):
+        return {'subscription': {'max_concurrency': self.account_limit}}
+
+    def start_crawl(self, config):
+        uuid = config._params['url'].rsplit('/', 1)[1]
+        with self._lock:
+            if len(self.running) >= self.account_limit:
+                self.rejected += 1
+                raise ScrapflyError(message='Too many crawls', code='ERR::CRAWLER::LIMIT', http_status_code=429)
+            self.running.add(uuid)
+            self.max_running = max(self.max_running, len(self.running))
+        return type('CrawlerStartResponse', (), {'uuid': uuid})()
+
+    def get_crawl_status(self, uuid):
+        status = super().get_crawl_status(uuid)
+        if status.is_finished:
+            with self._lock:
+                self.running.discard(uuid)
+        return status
+
+
+def _orchestrated_scripts(n):
+    return {
+        f'crawl{i}': [_status(f'crawl{i}')] * (i % 3) + [_status(f'crawl{i}', 'DONE', visited=10, is_success=True)]
+        for i in range(n)
+    }
+
+
+def _configs(n):
+    return (CrawlerConfig(url=f'https://web-scraping.dev/crawl{i}') for i in range(n))
+
+
+def test_crawl_orchestrator_keeps_slots_busy():
+    client = _FakeOrchestratedClient(_orchestrated_scripts(7), account_limit=3)
+    downloaded = []
+
+    def on_finished(crawl):
+        downloaded.append(crawl.uuid)
+        return crawl.status(refresh=False).state.urls_visited
+
+    orchestrator = CrawlOrchestrator(client, _configs(7), on_finished=on_finished, min_interval=0.01, max_interval=0.02)
+    results = orchestrator.run()
+
+    assert orchestrator.concurrency == 3
+    assert sorted(crawl.uuid for crawl, _ in results) == sorted(f'crawl{i}' for i in range(7))
+    assert [visited for _, visited in results] == [10] * 7
+    assert sorted(downloaded) == sorted(f'crawl{i}' for i in range(7))
+    assert client.max_running == 3
+    assert client.rejected == 0
+    assert orchestrator.progress() == {
+        'crawls_running': 0,
+        'crawls_finished': 7,
+        'urls_visited': 70,
+        'urls_extracted': 70,
+        'urls_failed': 0,
+        'urls_skipped': 0,
+        'api_credit_used': 70,
+    }
+
+
+def test_crawl_orchestrator_retries_rejected_starts():
+    # Account allows 2 crawls while 4 are requested at once
+    client = _FakeOrchestratedClient(_orchestrated_scripts(5), account_limit=2)
+
+    orchestrator = CrawlOrchestrator(client, _configs(5), concurrency=4, min_interval=0.01, max_interval=0.02)
+    finished = [crawl.uuid for crawl, result in orchestrator if result is None]
+
+    assert sorted(finished) == sorted(f'crawl{i}' for i in range(5))
+    assert client.rejected > 0
+    assert client.max_running == 2
+
+
+def test_crawl_orchestrator_callback_errors_propagate():
+    client = _FakeOrchestratedClient(_orchestrated_scripts(2), account_limit=2)
+
+    def on_finished(crawl):
+        raise RuntimeError(crawl.uuid)
+
+    with pytest.raises(RuntimeError):
+        CrawlOrchestrator(client, _configs(2), concurrency=2, on_finished=on_finished, min_interval=0.01).run()
+
+
+# ---------------------------------------------------------------------------
+# Live tail
+# ---------------------------------------------------------------------------
+
+
+class _FakeLiveCrawlClient(_FakeStatusClient):
+    """Crawler visiting more URLs on every status poll, page contents are served as multipart/related"""
+
+    def __init__(self, visited_per_poll, final_status='DONE', part_type='text/html', part_headers=()):
+        total = sum(visited_per_poll)
+        statuses = [_status('live', visited=n, to_crawl=total) for n in visited_per_poll[:-1]]
+        statuses.append(_status('live', final_status, visited=total, to_crawl=total, is_success=final_status == 'DONE'))
+        super().__init__({'live': statuses})
+        self._visited_per_poll = list(visited_per_poll)
+        self.visited = []
+        self.url_pages = []
+        self.batches = []
+
+        # Batch contents go through the real multipart parsing of the client
+        self._batch_client = ScrapflyClient(key='__API_KEY__')
+
+        def handler(**kwargs):
+            urls = kwargs['data'].decode().split('\n')
+            assert len(urls) <= 100
+            self.batches.append(urls)
+            return _FakeMultipartResponse(_multipart_related([
+                (url, part_type, f'# {url}'.encode(), list(part_headers)) for url in urls
+            ]))
+
+        self._batch_client.__dict__['_crawler_http_handler'] = handler
+
+    def get_crawl_status(self, uuid):
+        count = self._visited_per_poll.pop(0) if self._visited_per_poll else 0
+        start = len(self.visited)
+        self.visited.extend(f'https://web-scraping.dev/product/{i}' for i in range(start, start + count))
+        return super().get_crawl_status(uuid)
+
+    def get_crawl_urls(self, uuid, status=None, page=1, per_page=100):
+        self.url_pages.append(page)
+        body = '\n'.join(self.visited[(page - 1) * per_page:page * per_page])
+        return CrawlerUrlsResponse.from_text(body, status_hint=status, page=page, per_page=per_page)
+
+    def _iter_crawl_content_parts(self, uuid, urls, formats=None):
+        return self._batch_client._iter_crawl_content_parts(uuid, urls, formats)
+
+
+def test_crawl_tail_yields_pages_while_running():
+    client = _FakeLiveCrawlClient([3, 0, 150, 2], part_type='text/markdown')
+    crawl = _started_crawl(client, 'live')
+
+    contents = list(crawl.tail(format='markdown', poll_interval=0, per_page=7))
+
+    assert [c.url for c in contents] == client.visited
+    assert contents[0].content == '# https://web-scraping.dev/product/0'
+    # URLs already listed are not fetched again, content is read by chunks of 100
+    assert [len(batch) for batch in client.batches] == [3, 100, 50, 2]
+
+
+@pytest.mark.parametrize('format, part_type', [
+    ('clean_html', 'text/html; charset=utf-8'),
+    ('extracted_data', 'application/json'),
+    ('page_metadata', 'application/json'),
+])
+def test_crawl_tail_formats_sharing_a_mime_type(format, part_type):
+    client = _FakeLiveCrawlClient([2, 1], part_type=part_type, part_headers=['X-Scrapfly-Scrape-Status: 404'])
+    crawl = _started_crawl(client, 'live')
+
+    contents = list(crawl.tail(format=format, poll_interval=0))
+
+    assert [c.url for c in contents] == client.visited
+    assert [c.status_code for c in contents] == [404] * 3
+
+
+def test_crawl_tail_first_results_before_completion():
+    client = _FakeLiveCrawlClient([2, 2, 2])
+    crawl = _started_crawl(client, 'live')
+
+    tail = crawl.tail(poll_interval=0)
+    assert next(tail).status_code == 200
+
+    assert not crawl.status(refresh=False).is_finished
+    assert len(list(tail)) == 5
+
+
+def test_crawl_tail_failed_crawl():
+    client = _FakeLiveCrawlClient([2, 1], final_status='CANCELLED')
+    crawl = _started_crawl(client, 'live')
+
+    assert len(list(crawl.tail(poll_interval=0, allow_cancelled=True))) == 3
+
+    client = _FakeLiveCrawlClient([2, 1], final_status='CANCELLED')
+    with pytest.raises(ScrapflyCrawlerError) as exc_info:
+        list(_started_crawl(client, 'live').tail(poll_interval=0))
+    assert exc_info.value.code == 'CANCELLED'
+
+
+# ---------------------------------------------------------------------------
+# URLs listing
+# ---------------------------------------------------------------------------
+
+
+class _FakeLinesResponse:
+    """Streamed text/plain response, lines are counted as they are read"""
+
+    def __init__(self, lines, status_code=200):
+        self.status_code = status_code
+        self._lines = lines
+        self.lines_read = 0
+        self.closed = False
+
+    def iter_lines(self):
+        for line in self._lines:
+            self.lines_read += 1
+            yield line
+
+    def close(self):
+        self.closed = True
+
+
+def _client_listing(urls, requests_log, delay=0.0):
+    client = ScrapflyClient(key='__API_KEY__')
+
+    def handler(**kwargs):
+        requests_log.append((time.monotonic(), kwargs))
+        time.sleep(delay)
+        page, per_page = kwargs['params']['page'], kwargs['params']['per_page']
+        lines = [url.encode() for url in urls[(page - 1) * per_page:page * per_page]]
+        return _FakeLinesResponse(lines + [b''])
+
+    client.__dict__['_crawler_http_handler'] = handler
+    return client
+
+
+def test_get_crawl_urls_streams_lines():
+    requests_log = []
+    client = _client_listing(['https://web-scraping.dev/a', 'https://web-scraping.dev/é'], requests_log)
+
+    response = client.get_crawl_urls('uuid', status='failed', per_page=10)
+
+    assert isinstance(response, CrawlerUrlsResponse)
+    assert [(e.url, e.status) for e in response] == [
+        ('https://web-scraping.dev/a', 'failed'),
+        ('https://web-scraping.dev/é', 'failed'),
+    ]
+    kwargs = requests_log[0][1]
+    assert kwargs['stream'] is True
+    assert kwargs['params'] == {'key': '__API_KEY__', 'page': 1, 'per_page': 10, 'status': 'failed'}
+
+
+def test_url_entries_parsed_lazily():
+    entries = CrawlerUrlsResponse.iter_entries(iter(['https://a,timeout', '', 'https://b']), 'failed')
+
+    first = next(entries)
+    assert (first.url, first.reason) == ('https://a', 'timeout')
+    assert [e.url for e in entries] == ['https://b']
+
+
+def test_iter_crawl_urls_walks_pages_with_prefetch():
+    urls = [f'https://web-scraping.dev/product/{i}' for i in range(25)]
+    requests_log = []
+    client = _client_listing(urls, requests_log, delay=0.05)
+
+    iterator = client.iter_crawl_urls('uuid', per_page=10)
+    next(iterator)
+    time.sleep(0.1)
+
+    # Page 2 was requested while page 1 was being consumed
+    assert [kwargs['params']['page'] for _, kwargs in requests_log] == [1, 2]
+    assert [e.url for e in iterator] == urls[1:]
+    assert [kwargs['params']['page'] for _, kwargs in requests_log] == [1, 2, 3]
+
+
+def test_iter_crawl_urls_exact_page_multiple():
+    urls = [f'https://web-scraping.dev/product/{i}' for i in range(20)]
+    requests_log = []
+    client = _client_listing(urls, requests_log)
+
+    assert len(list(client.iter_crawl_urls('uuid', per_page=10))) == 20
+    # The empty third page ends the iteration
+    assert len(requests_log) == 3
+
+
+# ---------------------------------------------------------------------------
+# Batch content
+# ---------------------------------------------------------------------------
+
+
+_BOUNDARY = 'crawl-batch-boundary'
+
+
+def _multipart_related(parts):
+    body = b''
+    for url, content_type, content, extra_headers in parts:
+        body += (
+            b'--' + _BOUNDARY.encode() + b'\r\n'
+            + b'Content-Type: ' + content_type.encode() + b'\r\n'
+            + b'Content-Location: ' + url.encode() + b'\r\n'
+            + b''.join(h.encode() + b'\r\n' for h in extra_headers)
+            + b'\r\n'
+            + content
+            + b'\r\n'
+        )
+    return body + b'--' + _BOUNDARY.encode() + b'--\r\n'
+
+
+class _FakeMultipartResponse:
+    """Streamed multipart/related response, chunks are counted as they are read"""
+
+    def __init__(self, body, status_code=200, content_type=f'multipart/related; boundary="{_BOUNDARY}"'):
+        self.status_code = status_code
+        self.headers = {'Content-Type': content_type}
+        self._body = body
+        self.chunks_read = 0
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self._body), 16):
+            self.chunks_read += 1
+            yield self._body[i:i + 16]
+
+    def close(self):
+        pass
+
+
+def _client_batch(response, requests_log):
+    client = ScrapflyClient(key='__API_KEY__')
+
+    def handler(**kwargs):
+        requests_log.append(kwargs)
+        return response
+
+    client.__dict__['_crawler_http_handler'] = handler
+    return client
+
+
+def test_read_batch_parses_multipart_related():
+    body = _multipart_related([
+        ('https://web-scraping.dev/a', 'text/markdown; charset=utf-8', '# Produit é'.encode(), []),
+        ('https://web-scraping.dev/a', 'text/plain', b'Produit', []),
+        ('https://web-scraping.dev/b', 'text/markdown', base64.b64encode(b'# B'), ['Content-Transfer-Encoding: base64']),
+        ('https://web-scraping.dev/b', 'application/octet-stream', b'ignored', []),
+    ])
+    requests_log = []
+    client = _client_batch(_FakeMultipartResponse(body), requests_log)
+    crawl = _started_crawl(client, 'uuid')
+
+    contents = crawl.read_batch(['https://web-scraping.dev/a', 'https://web-scraping.dev/b'], formats=['markdown', 'text'])
+
+    assert contents == {
+        'https://web-scraping.dev/a': {'markdown': '# Produit é', 'text': 'Produit'},
+        'https://web-scraping.dev/b': {'markdown': '# B'},
+    }
+    kwargs = requests_log[0]
+    assert kwargs['method'] == 'POST'
+    assert kwargs['url'].endswith('/crawl/uuid/contents/batch')
+    assert kwargs['params']['formats'] == 'markdown,text'
+    assert kwargs['data'] == b'https://web-scraping.dev/a\nhttps://web-scraping.dev/b'
+    assert kwargs['stream'] is True
+    assert kwargs['timeout'] is not None
+
+
+def test_iter_batch_yields_parts_as_they_arrive():
+    parts = [(f'https://web-scraping.dev/{i}', 'text/html', b'<html>' + b'x' * 200 + b'</html>', []) for i in range(10)]
+    response = _FakeMultipartResponse(_multipart_related(parts))
+    crawl = _started_crawl(_client_batch(response, []), 'uuid')
+
+    iterator = crawl.iter_batch([url for url, *_ in parts])
+    url, content_format, content = next(iterator)
+
+    assert (url, content_format) == ('https://web-scraping.dev/0', 'html')
+    assert response.chunks_read < len(response._body) // 16
+    assert len(list(iterator)) == 9
+
+
+def test_batch_part_header_encoding():
+    url = 'https://web-scraping.dev/produit-é'
+    body = _multipart_related([(url, 'text/html', b'<html></html>', [])])
+
+    # Crawled URLs are sent as UTF-8 in Content-Location
+    crawl = _started_crawl(_client_batch(_FakeMultipartResponse(body), []), 'uuid')
+    assert list(crawl.iter_batch([url])) == [(url, 'html', '<html></html>')]
+
+    # The scrape batch (multipart/mixed) headers are still decoded as ASCII
+    response = _FakeMultipartResponse(body, content_type=f'multipart/mixed; boundary="{_BOUNDARY}"')
+    (headers, _), = iter_batch_parts(response)
+    assert headers['content-location'] == 'https://web-scraping.dev/produit-\ufffd\ufffd'
+
+
+def _finished(client, status='DONE'):
+    client.get_crawl_status = lambda uuid: _status(uuid, status, is_success=status == 'DONE')
+    return client
+
+
+def test_read_batch_cached(tmp_path):
+    body = _multipart_related([
+        ('https://web-scraping.dev/a', 'text/markdown', b'# A', []),
+        ('https://web-scraping.dev/b', 'text/markdown', b'# B', []),
+    ])
+    requests_log = []
+    client = _finished(_client_batch(_FakeMultipartResponse(body), requests_log))
+    client.crawler_cache = CrawlCache(str(tmp_path))
+    crawl = _started_crawl(client, 'uuid')
+
+    expected = {'https://web-scraping.dev/a': {'markdown': '# A'}, 'https://web-scraping.dev/b': {'markdown': '# B'}}
+    assert crawl.read_batch(['https://web-scraping.dev/a', 'https://web-scraping.dev/b'], formats=['markdown']) == expected
+    assert crawl.read_batch(['https://web-scraping.dev/a', 'https://web-scraping.dev/b'], formats=['markdown']) == expected
+    assert len(requests_log) == 1
+
+    # Only the URLs missing from the cache are requested
+    crawl.read_batch(['https://web-scraping.dev/a', 'https://web-scraping.dev/c'], formats=['markdown'])
+    assert requests_log[1]['data'] == b'https://web-scraping.dev/c'
+
+
+def test_read_batch_formats_sharing_a_mime_type(tmp_path):
+    body = _multipart_related([
+        ('https://web-scraping.dev/a', 'text/html', b'<html>raw</html>', []),
+        ('https://web-scraping.dev/a', 'text/html', b'<p>clean</p>', []),
+        ('https://web-scraping.dev/a', 'application/json', b'{"title": "A"}', []),
+    ])
+    requests_log = []
+    client = _finished(_client_batch(_FakeMultipartResponse(body), requests_log))
+    client.crawler_cache = CrawlCache(str(tmp_path))
+    crawl = _started_crawl(client, 'uuid')
+
+    expected = {'https://web-scraping.dev/a': {
+        'html': '<html>raw</html>', 'clean_html': '<p>clean</p>', 'page_metadata': '{"title": "A"}',
+    }}
+    formats = ['html', 'clean_html', 'page_metadata']
+    assert crawl.read_batch(['https://web-scraping.dev/a'], formats=formats) == expected
+
+    # Cached under the requested formats
+    assert crawl.read_batch(['https://web-scraping.dev/a'], formats=['clean_html']) == {
+        'https://web-scraping.dev/a': {'clean_html': '<p>clean</p>'},
+    }
+    assert crawl.read_batch(['https://web-scraping.dev/a'], formats=['html']) == {
+        'https://web-scraping.dev/a': {'html': '<html>raw</html>'},
+    }
+    assert len(requests_log) == 1
+
+
+def test_read_batch_not_cached_while_running(tmp_path):
+    body = _multipart_related([('https://web-scraping.dev/a', 'text/markdown', b'# A', [])])
+    requests_log = []
+    client = _finished(_client_batch(_FakeMultipartResponse(body), requests_log), status='RUNNING')
+    client.crawler_cache = CrawlCache(str(tmp_path))
+    crawl = _started_crawl(client, 'uuid')
+
+    crawl.read_batch(['https://web-scraping.dev/a'], formats=['markdown'])
+    crawl.read_batch(['https://web-scraping.dev/a'], formats=['markdown'])
+    assert len(requests_log) == 2
+
+
+def test_read_batch_errors():
+    crawl = _started_crawl(_client_batch(_FakeMultipartResponse(b'', status_code=500), []), 'uuid')
+    with pytest.raises(ScrapflyCrawlerError) as exc_info:
+        crawl.read_batch(['https://web-scraping.dev/a'])
+    assert exc_info.value.code == 'BATCH_REQUEST_FAILED'
+
+    crawl = _started_crawl(_client_batch(_FakeMultipartResponse(b'', content_type='application/json'), []), 'uuid')
+    with pytest.raises(ScrapflyCrawlerError) as exc_info:
+        crawl.read_batch(['https://web-scraping.dev/a'])
+    assert exc_info.value.code == 'INVALID_RESPONSE'
+
+    with pytest.raises(ValueError):
+        crawl.iter_batch(['https://web-scraping.dev/a'] * 101)
+    assert crawl.read_batch([]) == {}
+
+
+def test_read_many_splits_and_runs_batches_concurrently():
+    urls = [f'https://web-scraping.dev/product/{i}' for i in range(250)]
+    requests_log = []
+    lock = threading.Lock()
+    running = {'now': 0, 'max': 0}
+    client = ScrapflyClient(key='__API_KEY__')
+
+    def handler(**kwargs):
+        with lock:
+            requests_log.append(kwargs['data'].decode().split('\n'))
+            running['now'] += 1
+            running['max'] = max(running['max'], running['now'])
+        time.sleep(0.05)
+        with lock:
+            running['now'] -= 1
+        batch = kwargs['data'].decode().split('\n')
+        return _FakeMultipartResponse(_multipart_related([(url, 'text/markdown', url.encode(), []) for url in batch]))
+
+    client.__dict__['_crawler_http_handler'] = handler
+    crawl = _started_crawl(client, 'uuid')
+
+    # URLs are consumed lazily from any iterable
+    results = list(crawl.read_many(iter(urls), formats=['markdown'], concurrency=3))
+
+    assert sorted(url for url, _, _ in results) == sorted(urls)
+    assert all(content == url and content_format == 'markdown' for url, content_format, content in results)
+    assert sorted(len(batch) for batch in requests_log) == [50, 100, 100]
+    assert running['max'] == 3
+
+    with pytest.raises(ValueError):
+        crawl.read_many(urls, batch_size=101)
@@ -0,0 +1,1003 @@
+"""
+Unit tests for crawler artifact handling (WARC / HAR).
+
+The WARC fixtures are built in-memory with the same layout as the artifacts
+served by ``GET /crawl/{uuid}/artifact``: one gzip member per record, each
+record carrying the ``WARC-Scrape-*`` metadata headers.
+
+These tests are pure: no network, no credentials.
+"""
+
+import gc
+import gzip
+import hashlib
+import io
+import json
+import os
+import pickle
+
+import pytest
+import requests
+
+from scrapfly import (
+    CrawlCache,
+    CrawlerArtifactResponse,
+    HarArchive,
+    NearDuplicateFilter,
+    ScrapflyClient,
+    ScrapflyCrawlerError,
+    WarcIndex,
+    WarcIndexEntry,
+    WarcParser,
+    WarcRecord,
+    convert_html,
+    export_pages,
+    simhash,
+)
+from scrapfly.crawler.har_utils import _iter_json_objects
+from scrapfly.crawler.warc_utils import _UNSET
+
+
+# ---------------------------------------------------------------------------
+# Fixture factory helpers
+# ---------------------------------------------------------------------------
+
+
+def _warc_record(url, body=b'<html>ok</html>', status=200, content_type='text/html', record_type='response'):
+    if record_type == 'response':
+        block = (
+            b'HTTP/1.1 %d OK\r\n' % status
+            + b'Content-Type: ' + content_type.encode() + b'\r\n'
+            + b'Content-Length: %d\r\n' % len(body)
+            + b'\r\n'
+            + body
+        )
+    else:
+        block = body
+
+    headers = (
+        b'WARC/1.0\r\n'
+        + b'WARC-Type: ' + record_type.encode() + b'\r\n'
+        + b'WARC-Target-URI: ' + url.encode() + b'\r\n'
+        + b'WARC-Record-ID: <urn:uuid:' + hashlib.md5(url.encode() + record_type.encode()).hexdigest().encode() + b'>\r\n'
+        + b'WARC-Scrape-Log-Id: 01K9VPD22494F0ZEX7DGEZQ4ES\r\n'
+        + b'WARC-Scrape-Country: de\r\n'
+        + b'WARC-Scrape-Duration: 1.5\r\n'
+        + b'Content-Length: %d\r\n' % len(block)
+        + b'\r\n'
+    )
+    return headers + block + b'\r\n\r\n'
+
+
+def _warc(records, compress=True):
+    if not compress:
+        return b''.join(records)
+    # One gzip member per record, as written by the crawler
+    return b''.join(gzip.compress(record) for record in records)
+
+
+def _pages(n=5):
+    return [
+        _warc_record(f'https://web-scraping.dev/product/{i}', body=f'<html>product {i}</html>'.encode())
+        for i in range(1, n + 1)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# WARC parsing from disk
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_warc_parser_from_file(tmp_path, compress):
+    path = tmp_path / ('crawl.warc.gz' if compress else 'crawl.warc')
+    path.write_bytes(_warc(_pages(), compress=compress))
+
+    parser = WarcParser(str(path))
+    pages = parser.get_pages()
+
+    assert parser.path == str(path)
+    assert [p['url'] for p in pages] == [f'https://web-scraping.dev/product/{i}' for i in range(1, 6)]
+    assert pages[0]['status_code'] == 200
+    assert pages[0]['headers']['Content-Type'] == 'text/html'
+    assert pages[2]['content'] == b'<html>product 3</html>'
+
+    # The file is reopened for every iteration
+    assert len(list(parser.iter_responses())) == 5
+
+
+def test_warc_parser_from_empty_file(tmp_path):
+    path = tmp_path / 'empty.warc'
+    path.write_bytes(b'')
+
+    assert list(WarcParser(str(path)).iter_records()) == []
+
+
+def test_artifact_response_from_file(tmp_path):
+    data = _warc(_pages(3))
+    path = tmp_path / 'crawl.warc.gz'
+    path.write_bytes(data)
+
+    artifact = CrawlerArtifactResponse.from_file(str(path))
+
+    assert artifact.artifact_path == str(path)
+    assert artifact.size == len(data)
+    assert artifact.total_pages == 3
+    assert artifact.artifact_data == data
+
+    copy = tmp_path / 'copy.warc.gz'
+    artifact.save(str(copy))
+    assert copy.read_bytes() == data
+
+
+def test_warc_record_lazy_http_parsing():
+    record = next(WarcParser(_warc(_pages(1))).iter_records())
+
+    # Nothing but the WARC headers is decoded until the HTTP fields are accessed
+    assert record.url == 'https://web-scraping.dev/product/1'
+    assert record.warc_headers['WARC-Scrape-Country'] == 'de'
+    assert record._headers is record._content is record._status_code is _UNSET
+
+    assert isinstance(record.body, memoryview)
+    assert record.body == b'<html>product 1</html>'
+    assert record.status_code == 200
+    assert record.headers['Content-Length'] == '22'
+    assert record.content == b'<html>product 1</html>'
+
+    # Lazy records pickle (process pool) and compare like eager ones
+    eager = WarcRecord(
+        record_type='response',
+        url=record.url,
+        headers=record.headers,
+        content=record.content,
+        status_code=200,
+        warc_headers=record.warc_headers,
+    )
+    assert pickle.loads(pickle.dumps(record)) == eager == record
+
+
+def test_warc_record_without_http_body():
+    record = WarcRecord.from_block('response', 'https://web-scraping.dev', {}, b'HTTP/1.1 204 No Content\r\nServer: x')
+
+    assert record.status_code == 204
+    assert record.headers == {'Server': 'x'}
+    assert record.content == b''
+
+
+# ---------------------------------------------------------------------------
+# Streaming download
+# ---------------------------------------------------------------------------
+
+
+class _FakeStreamResponse:
+    """Minimal stand-in for a streamed ``requests.Response`` honouring Range."""
+
+    def __init__(self, data, range_header=None, chunk_size=7):
+        start = 0
+        self.headers = {}
+        self.status_code = 200
+
+        if range_header:
+            start = int(range_header[len('bytes='):].rstrip('-'))
+            if start >= len(data):
+                self.status_code = 416
+                data = b''
+            else:
+                self.status_code = 206
+                self.headers['Content-Range'] = 'bytes %d-%d/%d' % (start, len(data) - 1, len(data))
+
+        self._body = self.content = data[start:]
+        self._chunk_size = chunk_size
+        self.headers['Content-Length'] = str(len(self._body))
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self._body), self._chunk_size):
+            yield self._body[i:i + self._chunk_size]
+
+    def close(self):
+        pass
+
+
+def _client_serving(data, requests_log):
+    client = ScrapflyClient(key='__API_KEY__')
+
+    def handler(**kwargs):
+        requests_log.append(kwargs)
+        return _FakeStreamResponse(data, range_header=kwargs['headers'].get('Range'))
+
+    client.__dict__['_crawler_http_handler'] = handler
+    return client
+
+
+def test_download_crawl_artifact(tmp_path):
+    data = _warc(_pages())
+    requests_log = []
+    client = _client_serving(data, requests_log)
+    path = str(tmp_path / 'crawl.warc.gz')
+
+    artifact = client.download_crawl_artifact(
+        'uuid', path, checksum='sha256:' + hashlib.sha256(data).hexdigest()
+    )
+
+    assert requests_log[0]['stream'] is True
+    assert 'Range' not in requests_log[0]['headers']
+    assert artifact.artifact_path == path
+    assert open(path, 'rb').read() == data
+    assert artifact.total_pages == 5
+    assert not (tmp_path / 'crawl.warc.gz.part').exists()
+
+
+def test_download_crawl_artifact_resumes_partial_file(tmp_path):
+    data = _warc(_pages())
+    requests_log = []
+    client = _client_serving(data, requests_log)
+    path = str(tmp_path / 'crawl.warc.gz')
+
+    with open(path + '.part', 'wb') as f:
+        f.write(data[:100])
+
+    client.download_crawl_artifact('uuid', path)
+
+    assert requests_log[0]['headers']['Range'] == 'bytes=100-'
+    assert open(path, 'rb').read() == data
+
+
+class _DroppedStreamResponse(_FakeStreamResponse):
+    """Streamed response whose connection drops, or whose body ends early, after ``cut`` bytes."""
+
+    def __init__(self, data, range_header=None, cut=100, error=True):
+        super().__init__(data, range_header=range_header)
+        self._cut = cut
+        self._error = error
+
+    def iter_content(self, chunk_size=1):
+        yield self._body[:self._cut]
+        if self._error:
+            raise requests.exceptions.ChunkedEncodingError('Connection broken: IncompleteRead')
+
+
+@pytest.mark.parametrize('error', [True, False], ids=['dropped', 'short'])
+def test_download_crawl_artifact_retries_from_partial_file(tmp_path, monkeypatch, error):
+    monkeypatch.setattr('time.sleep', lambda seconds: None)
+    data = _warc(_pages())
+    ranges = []
+    client = ScrapflyClient(key='__API_KEY__')
+
+    def handler(**kwargs):
+        range_header = kwargs['headers'].get('Range')
+        ranges.append(range_header)
+        if len(ranges) == 1:
+            return _DroppedStreamResponse(data, range_header=range_header, error=error)
+        return _FakeStreamResponse(data, range_header=range_header)
+
+    client.__dict__['_crawler_http_handler'] = handler
+    path = str(tmp_path / 'crawl.warc.gz')
+
+    client.download_crawl_artifact('uuid', path, checksum='sha256:' + hashlib.sha256(data).hexdigest())
+
+    assert ranges == [None, 'bytes=100-']
+    assert open(path, 'rb').read() == data
+
+
+def test_download_crawl_artifact_checksum_mismatch(tmp_path):
+    data = _warc(_pages())
+    client = _client_serving(data, [])
+    path = str(tmp_path / 'crawl.warc.gz')
+
+    with pytest.raises(ScrapflyCrawlerError) as exc_info:
+        client.download_crawl_artifact('uuid', path, checksum='sha256:' + '0' * 64)
+
+    assert exc_info.value.code == 'CHECKSUM_MISMATCH'
+    assert not (tmp_path / 'crawl.warc.gz').exists()
+    assert not (tmp_path / 'crawl.warc.gz.part').exists()
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+
+def _latin1_page():
+    return _warc_record('https://web-scraping.dev/fr', body='Café'.encode('latin-1'), content_type='text/html; charset=iso-8859-1')
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+def test_export_pages_jsonl(tmp_path, processes):
+    path = tmp_path / 'pages.jsonl.gz'
+    artifact = CrawlerArtifactResponse(_warc(_indexed_records() + [_latin1_page()]))
+
+    assert artifact.export(str(path), processes=processes) == 6
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    rows.sort(key=lambda row: row['url'])
+    assert rows[0] == {
+        'url': 'https://web-scraping.dev/fr',
+        'status_code': 200,
+        'headers': {'Content-Type': 'text/html; charset=iso-8859-1', 'Content-Length': '4'},
+        'duration': 1.5,
+        'log_id': '01K9VPD22494F0ZEX7DGEZQ4ES',
+        'country': 'de',
+        'content': 'Café',
+    }
+    assert [row['status_code'] for row in rows] == [200, 404, 200, 200, 200, 200]
+
+
+def test_export_pages_har(tmp_path):
+    path = tmp_path / 'pages.jsonl'
+    assert export_pages(HarArchive(_har(_har_entries(2))), str(path)) == 2
+
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert rows[1]['url'] == 'https://web-scraping.dev/product/2'
+    assert rows[1]['content'] == '<html>ok</html>'
+    assert rows[1]['duration'] == 0.0125
+
+    with pytest.raises(ValueError):
+        export_pages(HarArchive(_har([])), str(tmp_path / 'pages.csv'))
+
+
+def test_export_pages_parquet(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'pages.parquet'
+
+    assert export_pages(WarcParser(_warc(_pages(5))), str(path), row_group_size=2) == 5
+
+    parquet_file = pq.ParquetFile(str(path))
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column('content').to_pylist()[4] == '<html>product 5</html>'
+    assert dict(table.column('headers').to_pylist()[0])['Content-Type'] == 'text/html'
+
+
+# ---------------------------------------------------------------------------
+# Near-duplicate detection
+# ---------------------------------------------------------------------------
+
+
+def _listing(page, session=None, items=range(40)):
+    products = ''.join(f'<li><a href="/product/{i}">Product {i} - a nice product with a long description</a></li>' for i in items)
+    footer = f'<footer>session {session}</footer>' if session else ''
+    return f'<html><head><script>var page = {page};</script></head><body><ul>{products}</ul>{footer}</body></html>'
+
+
+def test_simhash_ignores_markup():
+    assert simhash('<p>Hello <b>world</b></p><script>tracking()</script>') == simhash('hello world')
+    assert simhash(b'hello world') == simhash('hello world')
+
+
+def test_near_duplicate_filter():
+    records = [
+        _warc_record('https://web-scraping.dev/products', body=_listing(1).encode()),
+        _warc_record('https://web-scraping.dev/products?session=a', body=_listing(2, session='a').encode()),
+        _warc_record('https://web-scraping.dev/products?page=2', body=_listing(1, items=range(40, 80)).encode()),
+        _warc_record('https://web-scraping.dev/products?session=b', body=_listing(3, session='b').encode()),
+    ]
+    dedup = NearDuplicateFilter(threshold=3)
+
+    unique = [record.url for record in dedup.filter(WarcParser(_warc(records)).iter_responses())]
+
+    assert unique == ['https://web-scraping.dev/products', 'https://web-scraping.dev/products?page=2']
+    assert dedup.groups() == {
+        'https://web-scraping.dev/products': [
+            'https://web-scraping.dev/products?session=a',
+            'https://web-scraping.dev/products?session=b',
+        ],
+        'https://web-scraping.dev/products?page=2': [],
+    }
+    assert len(dedup) == 2
+
+
+# ---------------------------------------------------------------------------
+# Local conversion
+# ---------------------------------------------------------------------------
+
+
+_ARTICLE = (
+    '<html><head><title>Title</title><style>p {}</style></head>'
+    '<body onload="track()"><h1>Hello <em>world</em></h1>'
+    '<p>Read the <a href="/docs">docs</a>, <a href="#top"></a>or <b>not</b>.</p>'
+    '<ul><li>one</li><li>two<ol><li>nested</li></ol></li></ul>'
+    '<blockquote><p>quoted</p></blockquote>'
+    '<pre><code>x = 1\ny = 2\n</code></pre>'
+    '<table><tr><th>A</th><th>B</th></tr><tr><td>1</td><td>2</td></tr></table>'
+    '<img src="logo.png" alt="Logo"><script>track()</script></body></html>'
+)
+
+
+def test_convert_html_markdown():
+    assert convert_html(_ARTICLE, 'markdown', base_url='https://web-scraping.dev/blog/') == (
+        '# Hello *world*\n'
+        '\n'
+        'Read the [docs](https://web-scraping.dev/docs), or **not**.\n'
+        '\n'
+        '- one\n'
+        '- two\n'
+        '  1. nested\n'
+        '\n'
+        '> quoted\n'
+        '\n'
+        '```\n'
+        'x = 1\n'
+        'y = 2\n'
+        '```\n'
+        '\n'
+        '| A | B |\n'
+        '| --- | --- |\n'
+        '| 1 | 2 |\n'
+        '\n'
+        '![Logo](https://web-scraping.dev/blog/logo.png)'
+    )
+
+
+def test_convert_html_text_and_clean_html():
+    assert convert_html(_ARTICLE, 'text') == (
+        'Hello world\n\nRead the docs, or not.\n\none\ntwo\nnested\n\nquoted\n\nx = 1\ny = 2\n\nA\tB\n1\t2'
+    )
+
+    clean = convert_html(_ARTICLE, 'clean_html')
+    assert '<script' not in clean and '<style' not in clean and 'onload' not in clean
+    assert clean.startswith('<html><head><title>Title</title></head><body><h1>Hello <em>world</em></h1>')
+
+    with pytest.raises(ValueError):
+        convert_html(_ARTICLE, 'json')
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_artifact_convert(processes):
+    records = [
+        _warc_record('https://web-scraping.dev/product/1', body=b'<h1>Product 1</h1>'),
+        _warc_record('https://web-scraping.dev/api/1', body=b'{"id": 1}', content_type='application/json'),
+        _latin1_page(),
+    ] + _pages(3)
+    artifact = CrawlerArtifactResponse(_warc(records))
+
+    contents = list(artifact.convert('markdown', processes=processes, batch_size=2, crawl_uuid='uuid'))
+
+    assert [content.url for content in contents] == [
+        'https://web-scraping.dev/product/1',
+        'https://web-scraping.dev/fr',
+        'https://web-scraping.dev/product/1',
+        'https://web-scraping.dev/product/2',
+        'https://web-scraping.dev/product/3',
+    ]
+    assert [content.content for content in contents[:3]] == ['# Product 1', 'Café', 'product 1']
+    assert contents[0].status_code == 200
+    assert contents[0].duration == 1.5
+    assert contents[0].country == 'de'
+    assert contents[0].log_url is not None
+
+    matching = artifact.convert('text', pattern='*/product/?', processes=processes)
+    assert [content.content for content in matching] == ['Product 1', 'product 1', 'product 2', 'product 3']
+
+
+def test_artifact_convert_filters_before_decoding(monkeypatch):
+    from scrapfly.crawler import exporter
+
+    records = [
+        _warc_record('https://web-scraping.dev/product/1', body=b'<h1>Product 1</h1>'),
+        _warc_record('https://web-scraping.dev/image.png', body=b'\x89PNG', content_type='image/png'),
+        _warc_record('https://web-scraping.dev/other', body=b'<h1>Other</h1>'),
+    ]
+    decoded = []
+    real_decode = exporter._decode
+
+    def decode(content, headers):
+        decoded.append(content)
+        return real_decode(content, headers)
+
+    monkeypatch.setattr(exporter, '_decode', decode)
+    contents = list(CrawlerArtifactResponse(_warc(records)).convert('text', pattern='*/product/*', processes=1))
+
+    assert [content.content for content in contents] == ['Product 1']
+    assert decoded == [b'<h1>Product 1</h1>']
+
+
+# ---------------------------------------------------------------------------
+# Local cache
+# ---------------------------------------------------------------------------
+
+
+class _FakeJsonResponse:
+    def __init__(self, payload):
+        self.status_code = 200
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def _client_caching(data, requests_log, cache, crawl_status='DONE'):
+    client = ScrapflyClient(key='__API_KEY__', crawler_cache=cache)
+
+    def handler(**kwargs):
+        requests_log.append(kwargs['url'].rsplit('/', 1)[1])
+        if kwargs['url'].endswith('/artifact'):
+            return _FakeStreamResponse(data)
+        if kwargs['url'].endswith('/contents'):
+            return _FakeJsonResponse({'contents': {'https://web-scraping.dev/product/1': {'markdown': '# 1'}}})
+        return _FakeJsonResponse({
+            'crawler_uuid': 'uuid',
+            'status': crawl_status,
+            'is_success': True if crawl_status == 'DONE' else None,
+            'is_finished': crawl_status == 'DONE',
+            'state': {
+                'urls_visited': 3, 'urls_extracted': 3, 'urls_to_crawl': 3, 'urls_failed': 0,
+                'urls_skipped': 0, 'api_credit_used': 3, 'duration': 1.0,
+            },
+        })
+
+    client.__dict__['_crawler_http_handler'] = handler
+    return client
+
+
+def test_crawl_cache_artifact_and_contents(tmp_path):
+    data = _warc(_pages(3))
+    requests_log = []
+    client = _client_caching(data, requests_log, str(tmp_path / 'cache'))
+
+    artifact = client.get_crawl_artifact('uuid')
+    assert artifact.total_pages == 3
+    assert client.get_crawl_contents('uuid', format='markdown')['contents']
+    # The crawl is known to be finished after the first status request
+    assert requests_log == ['status', 'artifact', 'contents']
+    assert client.get_crawl_contents('uuid', format='html')
+    assert requests_log == ['status', 'artifact', 'contents', 'contents']
+
+    # A new client (next run) reads from disk
+    requests_log.clear()
+    client = _client_caching(data, requests_log, CrawlCache(str(tmp_path / 'cache')))
+    assert [p['url'] for p in client.get_crawl_artifact('uuid').get_pages()] == [p['url'] for p in artifact.get_pages()]
+    assert client.get_crawl_contents('uuid', format='markdown') == {
+        'contents': {'https://web-scraping.dev/product/1': {'markdown': '# 1'}}
+    }
+    assert requests_log == []
+    assert [name for name in os.listdir(tmp_path / 'cache' / 'uuid') if 'tmp' in name] == []
+
+
+def test_crawl_cache_resumes_dropped_artifact_download(tmp_path, monkeypatch):
+    monkeypatch.setattr('time.sleep', lambda seconds: None)
+    data = _warc(_pages(3))
+    ranges = []
+    client = ScrapflyClient(key='__API_KEY__', crawler_cache=str(tmp_path / 'cache'))
+    status_handler = _client_caching(data, [], None).__dict__['_crawler_http_handler']
+
+    def handler(**kwargs):
+        if not kwargs['url'].endswith('/artifact'):
+            return status_handler(**kwargs)
+        range_header = kwargs['headers'].get('Range')
+        ranges.append(range_header)
+        if len(ranges) == 1:
+            return _DroppedStreamResponse(data, range_header=range_header)
+        return _FakeStreamResponse(data, range_header=range_header)
+
+    client.__dict__['_crawler_http_handler'] = handler
+
+    assert client.get_crawl_artifact('uuid').total_pages == 3
+    assert ranges == [None, 'bytes=100-']
+
+
+def test_crawl_cache_skips_running_crawls(tmp_path):
+    requests_log = []
+    client = _client_caching(_warc(_pages(1)), requests_log, str(tmp_path / 'cache'), crawl_status='RUNNING')
+
+    client.get_crawl_artifact('uuid')
+    client.get_crawl_artifact('uuid')
+    assert requests_log == ['status', 'artifact'] * 2
+    assert len(client.crawler_cache) == 0
+
+
+def test_crawl_cache_keeps_artifacts_in_use(tmp_path):
+    data = _warc(_pages(3))
+    cache = CrawlCache(str(tmp_path / 'cache'), max_size=len(data) + 10)
+    client = _client_caching(data, [], cache)
+
+    artifact = client.get_crawl_artifact('uuid')
+    # Over the size limit, but the artifact is still referenced
+    cache.put_content('uuid', 'https://web-scraping.dev/a', 'html', 'a' * 20)
+    assert os.path.exists(artifact.artifact_path)
+    assert artifact.total_pages == 3
+
+    # Released once the artifact is garbage collected
+    path = artifact.artifact_path
+    del artifact
+    gc.collect()
+    cache.put_content('uuid', 'https://web-scraping.dev/b', 'html', 'b' * 20)
+    assert not os.path.exists(path)
+
+
+def test_crawl_cache_clear_keeps_artifacts_in_use(tmp_path):
+    data = _warc(_pages(3))
+    cache = CrawlCache(str(tmp_path / 'cache'))
+    client = _client_caching(data, [], cache)
+
+    artifact = client.get_crawl_artifact('uuid')
+    cache.put_content('uuid', 'https://web-scraping.dev/a', 'html', 'a' * 20)
+    cache.put_content('other', 'https://web-scraping.dev/a', 'html', 'a' * 20)
+    cache.clear()
+
+    assert (len(cache), cache.size) == (1, len(data))
+    assert artifact.total_pages == 3
+    assert cache.get_content('uuid', 'https://web-scraping.dev/a', 'html') is None
+    assert os.listdir(tmp_path / 'cache') == ['uuid']
+
+
+def test_crawl_cache_lru_eviction(tmp_path):
+    cache = CrawlCache(str(tmp_path), max_size=25)
+    cache.put_content('uuid', 'https://web-scraping.dev/a', 'html', 'a' * 10)
+    cache.put_content('uuid', 'https://web-scraping.dev/b', 'html', 'b' * 10)
+    assert cache.get_content('uuid', 'https://web-scraping.dev/a', 'html') == 'a' * 10
+
+    # b is the least recently used entry
+    cache.put_content('uuid', 'https://web-scraping.dev/c', 'html', 'c' * 10)
+    assert cache.get_content('uuid', 'https://web-scraping.dev/b', 'html') is None
+    assert cache.get_content('uuid', 'https://web-scraping.dev/a', 'html') == 'a' * 10
+    assert cache.size == 20
+
+    # Recency survives across instances
+    reopened = CrawlCache(str(tmp_path), max_size=25)
+    assert (len(reopened), reopened.size) == (2, 20)
+    reopened.clear()
+    assert reopened.get_content('uuid', 'https://web-scraping.dev/c', 'html') is None
+    assert len(reopened) == 0
+
+
+# ---------------------------------------------------------------------------
+# Streaming decompression
+# ---------------------------------------------------------------------------
+
+
+class _NonSeekableStream(io.RawIOBase):
+    """Binary stream that can only be read forward, counting bytes pulled."""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        chunk = self._data.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_warc_parser_streams_gzip_members():
+    # Incompressible bodies so the archive spans many read chunks
+    data = _warc([_warc_record(f'https://web-scraping.dev/product/{i}', body=os.urandom(20_000)) for i in range(50)])
+    stream = _NonSeekableStream(data)
+
+    records = WarcParser(stream).iter_records()
+    first = next(records)
+
+    # The first record is yielded before the rest of the archive is read
+    assert first.url == 'https://web-scraping.dev/product/0'
+    assert stream.bytes_read < len(data)
+    assert sum(1 for _ in records) == 49
+
+
+def test_warc_parser_single_gzip_member():
+    data = gzip.compress(b''.join(_pages(4)))
+
+    assert [r.url for r in WarcParser(data).iter_records()] == [
+        f'https://web-scraping.dev/product/{i}' for i in range(1, 5)
+    ]
+
+
+def test_warc_parser_truncated_archive():
+    pages = _pages(4)
+    data = _warc(pages)
+
+    # A truncated last member ends the iteration instead of raising
+    records = list(WarcParser(data[:-len(gzip.compress(pages[-1])) // 2]).iter_records())
+    assert [r.url for r in records] == [f'https://web-scraping.dev/product/{i}' for i in range(1, 4)]
+
+
+# ---------------------------------------------------------------------------
+# Parallel parsing
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_warc_parser_parallel(tmp_path, compress):
+    # Page bodies embed the markers the boundary scan looks for
+    records = [
+        _warc_record(f'https://web-scraping.dev/product/{i}', body=b'\r\n\r\nWARC/1.0 \x1f\x8b\x08' + os.urandom(2_000))
+        for i in range(40)
+    ]
+    records.insert(3, _warc_record('https://web-scraping.dev/robots.txt', record_type='request'))
+    path = tmp_path / 'crawl.warc'
+    path.write_bytes(_warc(records, compress=compress))
+
+    parser = WarcParser(str(path))
+    expected = [(r.url, r.record_type, r.content) for r in parser.iter_records()]
+
+    ordered = parser.iter_records_parallel(processes=2, chunk_size=8_000)
+    assert [(r.url, r.record_type, r.content) for r in ordered] == expected
+
+    unordered = parser.iter_records_parallel(processes=2, chunk_size=8_000, ordered=False, responses_only=True)
+    assert sorted(r.url for r in unordered) == sorted(url for url, record_type, _ in expected if record_type == 'response')
+
+    in_memory = WarcParser(path.read_bytes()).iter_records_parallel(processes=2, chunk_size=8_000)
+    assert [(r.url, r.record_type, r.content) for r in in_memory] == expected
+
+
+# ---------------------------------------------------------------------------
+# Record index
+# ---------------------------------------------------------------------------
+
+
+def _indexed_records():
+    records = _pages(4)
+    records.insert(1, _warc_record('https://web-scraping.dev/robots.txt', record_type='request'))
+    records.append(_warc_record('https://web-scraping.dev/missing', status=404, content_type='text/plain; charset=utf-8'))
+    return records
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_warc_index_lookup(compress):
+    parser = WarcParser(_warc(_indexed_records(), compress=compress))
+    index = parser.build_index()
+
+    assert len(index) == 6
+    entry = index.find('https://web-scraping.dev/product/3')
+    assert entry.status_code == 200
+    assert entry.content_type == 'text/html'
+    assert entry.log_id == '01K9VPD22494F0ZEX7DGEZQ4ES'
+    assert entry.country == 'de'
+    assert entry.duration == 1.5
+    assert parser.read_record(entry).content == b'<html>product 3</html>'
+
+    assert index.find('https://web-scraping.dev/robots.txt') is None
+    assert index.find('https://web-scraping.dev/robots.txt', record_type='request').record_type == 'request'
+
+    missing = list(index.filter(status_code=404))
+    assert [e.content_type for e in missing] == ['text/plain; charset=utf-8']
+    assert [e.url for e in index.filter(content_type='text/plain')] == ['https://web-scraping.dev/missing']
+    assert [e.url for e in index.filter(content_type='Text/Plain; charset=utf-8')] == ['https://web-scraping.dev/missing']
+    assert [r.url for r in parser.read_records(index.filter(url_pattern='*/product/[12]'))] == [
+        'https://web-scraping.dev/product/1',
+        'https://web-scraping.dev/product/2',
+    ]
+
+
+def test_warc_index_line_with_unsafe_url():
+    for url in ('https://web-scraping.dev/a b', 'https://web-scraping.dev/a%20b?q=100%', 'https://web-scraping.dev/a\nb'):
+        entry = WarcIndexEntry(url, 'response', 0, 10, status_code=200, content_type='text/html; charset=utf-8')
+        line = entry.to_line()
+        assert '\n' not in line
+        assert WarcIndexEntry.from_line(line) == entry
+
+
+def test_warc_index_single_gzip_member():
+    # Records sharing one gzip member share its byte range
+    parser = WarcParser(gzip.compress(b''.join(_pages(3))))
+    index = parser.build_index()
+
+    assert {(e.offset, e.length) for e in index} == {(0, parser._raw_size())}
+    assert [r.url for r in parser.read_records(reversed(index.entries))] == [
+        f'https://web-scraping.dev/product/{i}' for i in (3, 2, 1)
+    ]
+
+
+def test_warc_index_sidecar_file(tmp_path):
+    path = tmp_path / 'crawl.warc.gz'
+    CrawlerArtifactResponse(_warc(_indexed_records())).save(str(path), index=True)
+
+    index_path = tmp_path / 'crawl.warc.gz.cdxj'
+    assert index_path.exists()
+    assert index_path.read_text().splitlines()[0].startswith('!meta 0 ')
+
+    index = WarcIndex.load(str(index_path))
+    parser = WarcParser(str(path))
+    assert index.entries == parser.build_index().entries
+    assert parser.get_index().entries == index.entries
+    assert parser.read_record(index.find('https://web-scraping.dev/product/4')).content == b'<html>product 4</html>'
+
+    # A stale index (archive rewritten) is rebuilt
+    path.write_bytes(_warc(_pages(2)))
+    assert len(WarcParser(str(path)).get_index()) == 2
+    assert len(WarcIndex.load(str(index_path))) == 2
+
+
+def test_warc_index_stale_with_same_size(tmp_path):
+    path = tmp_path / 'crawl.warc'
+    first, second = _pages(2)
+    path.write_bytes(_warc([first, second], compress=False))
+    WarcParser(str(path)).get_index()
+
+    # Same records in another order: same size, other offsets
+    rewritten = _warc([second, first], compress=False)
+    assert len(rewritten) == path.stat().st_size
+    path.write_bytes(rewritten)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    parser = WarcParser(str(path))
+    record = parser.read_record(parser.get_index().find('https://web-scraping.dev/product/1'))
+    assert record.url == 'https://web-scraping.dev/product/1'
+
+
+def _expected_stats():
+    sizes = [len(f'<html>product {i}</html>') for i in range(1, 5)] + [len(b'<html>ok</html>')]
+    return {
+        'pages': 5,
+        'total_size_bytes': sum(sizes),
+        'avg_page_size_bytes': sum(sizes) / 5,
+        'status_codes': {200: 4, 404: 1},
+        'content_types': {'text/html': 4, 'text/plain': 1},
+    }
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_warc_stats(compress):
+    artifact = CrawlerArtifactResponse(_warc(_indexed_records(), compress=compress))
+
+    assert artifact.stats() == _expected_stats()
+    assert artifact.total_pages == 5
+    assert artifact.parser.build_index().stats() == _expected_stats()
+
+
+def test_warc_stats_from_index(tmp_path, monkeypatch):
+    path = tmp_path / 'crawl.warc.gz'
+    CrawlerArtifactResponse(_warc(_indexed_records())).save(str(path), index=True)
+
+    # The archive is not read when the sidecar index is up to date
+    monkeypatch.setattr(WarcParser, 'iter_records', lambda self: pytest.fail('archive scanned'))
+    assert WarcParser(str(path)).stats() == _expected_stats()
+
+    # Indexes without body sizes fall back to a scan
+    assert WarcIndex([WarcIndexEntry('https://web-scraping.dev/', 'response', 0, 10, status_code=200)]).stats() is None
+
+
+def test_har_stats():
+    entries = _har_entries(3) + [_har_entry('https://web-scraping.dev/missing', status=404, mime_type='text/plain', text='nope')]
+    artifact = CrawlerArtifactResponse(_har(entries), artifact_type='har')
+
+    assert artifact.stats() == {
+        'pages': 4,
+        'total_size_bytes': 3 * len('<html>ok</html>') + 4,
+        'avg_page_size_bytes': (3 * len('<html>ok</html>') + 4) / 4,
+        'status_codes': {200: 3, 404: 1},
+        'content_types': {'text/html': 3, 'text/plain': 1},
+    }
+    assert artifact.total_pages == 4
+
+
+# ---------------------------------------------------------------------------
+# HAR parsing
+# ---------------------------------------------------------------------------
+
+
+def _har_entry(url, status=200, mime_type='text/html', text='<html>ok</html>'):
+    return {
+        'startedDateTime': '2025-01-01T00:00:00.000Z',
+        'time': 12.5,
+        'request': {'method': 'GET', 'url': url, 'headers': []},
+        'response': {
+            'status': status,
+            'statusText': 'OK',
+            'headers': [{'name': 'Content-Type', 'value': mime_type}],
+            'content': {'size': len(text), 'mimeType': mime_type, 'text': text},
+        },
+    }
+
+
+def _har(entries, standard=False):
+    log = {'version': '1.2', 'creator': {'name': 'scrapfly'}, 'entries': entries if standard else []}
+    documents = [{'log': log}] + ([] if standard else entries)
+    return '\n'.join(json.dumps(document) for document in documents).encode()
+
+
+def _har_entries(n=5):
+    return [_har_entry(f'https://web-scraping.dev/product/{i}') for i in range(1, n + 1)]
+
+
+@pytest.mark.parametrize('standard', [True, False])
+def test_har_archive_from_bytes(standard):
+    archive = HarArchive(_har(_har_entries(), standard=standard))
+
+    assert archive.version == '1.2'
+    assert archive.creator == {'name': 'scrapfly'}
+    assert [e.url for e in archive.iter_entries()] == [f'https://web-scraping.dev/product/{i}' for i in range(1, 6)]
+    assert len(archive) == 5
+
+    # Entries are decoded again on every iteration
+    assert archive.find_by_url('https://web-scraping.dev/product/2').content == b'<html>ok</html>'
+
+
+def test_har_archive_from_file(tmp_path):
+    path = tmp_path / 'crawl.har.gz'
+    path.write_bytes(gzip.compress(_har(_har_entries(3))))
+
+    artifact = CrawlerArtifactResponse.from_file(str(path), artifact_type='har')
+
+    assert [p['url'] for p in artifact.get_pages()] == [f'https://web-scraping.dev/product/{i}' for i in range(1, 4)]
+    assert artifact.get_pages()[0]['headers'] == {'Content-Type': 'text/html'}
+
+
+def test_har_archive_streams_entries():
+    entries = [_har_entry(f'https://web-scraping.dev/product/{i}', text=os.urandom(8_000).hex()) for i in range(300)]
+    data = _har(entries)
+    stream = _NonSeekableStream(data)
+
+    iterator = HarArchive(stream).iter_entries()
+    assert next(iterator).url == 'https://web-scraping.dev/product/0'
+    assert stream.bytes_read < len(data)
+    assert sum(1 for _ in iterator) == 299
+
+
+def test_json_objects_spanning_chunks():
+    # Documents larger than the read size, multi-byte characters split across reads
+    documents = [{'text': 'é' * 5_000}, {'n': 1}, {'text': '€' * 20_000}]
+    data = ' \n'.join(json.dumps(document, ensure_ascii=False) for document in documents).encode()
+
+    assert list(_iter_json_objects(io.BytesIO(data), chunk_size=7)) == documents
+
+
+def test_har_archive_truncated():
+    data = _har(_har_entries(3))
+
+    # A truncated last entry ends the iteration instead of raising
+    assert [e.url for e in HarArchive(data[:-20]).iter_entries()] == [
+        'https://web-scraping.dev/product/1',
+        'https://web-scraping.dev/product/2',
+    ]
+
+
+def test_har_archive_malformed_raises_early():
+    data = _har(_har_entries(2)) + b'\n{"broken": 1 2}\n' + json.dumps(_har_entry('x', text='y' * 8_000_000)).encode()
+    stream = _NonSeekableStream(data)
+
+    with pytest.raises(json.JSONDecodeError):
+        list(HarArchive(stream).iter_entries())
+    # The document after the malformed one was not buffered
+    assert stream.bytes_read < 2_000_000
+
+
+def test_har_archive_from_str(tmp_path):
+    data = _har(_har_entries(2))
+    path = tmp_path / 'crawl.har'
+    path.write_bytes(data)
+
+    # JSON text is parsed, any other string is a file path
+    assert len(HarArchive('  ' + data.decode())) == 2
+    assert len(HarArchive(str(path))) == 2
+    with pytest.raises(FileNotFoundError):
+        list(HarArchive('<html>not a HAR</html>').iter_entries())
+
+
+def test_har_archive_queries():
+    entries = _har_entries(3) + [
+        _har_entry('https://web-scraping.dev/product/1', status=304),
+        _har_entry('https://web-scraping.dev/missing', status=404, mime_type='text/plain'),
+        _har_entry('https://web-scraping.dev/api', mime_type='application/json; charset=utf-8'),
+        _har_entry('https://web-scraping.dev/page', mime_type='TEXT/HTML; charset=utf-8'),
+    ]
+    archive = HarArchive(_har(entries))
+
+    assert archive.get_urls() == [
+        'https://web-scraping.dev/product/1',
+        'https://web-scraping.dev/product/2',
+        'https://web-scraping.dev/product/3',
+        'https://web-scraping.dev/missing',
+        'https://web-scraping.dev/api',
+        'https://web-scraping.dev/page',
+    ]
+    assert archive.find_by_url('https://web-scraping.dev/product/1').status_code == 200
+    assert archive.find_by_url('https://web-scraping.dev/nope') is None
+    assert [e.url for e in archive.filter_by_status(404)] == ['https://web-scraping.dev/missing']
+    assert [e.url for e in archive.filter_by_content_type('text/')] == [
+        'https://web-scraping.dev/product/1',
+        'https://web-scraping.dev/product/2',
+        'https://web-scraping.dev/product/3',
+        'https://web-scraping.dev/product/1',
+        'https://web-scraping.dev/missing',
+        'https://web-scraping.dev/page',
+    ]
+    assert [e.url for e in archive.filter_by_content_type('json')] == ['https://web-scraping.dev/api']
+
+    # Wrappers are built once and shared by every query
+    assert archive.filter_by_status(304)[0] is archive.get_entries()[3]
+    assert next(archive.iter_entries()) is archive.find_by_url('https://web-scraping.dev/product/1')
+    assert len(archive) == 7
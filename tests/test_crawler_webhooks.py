@@ -17,20 +17,36 @@ Implementation is the source of truth — not the example JSON fixtures in
 ``crawler_url_failed.json::links`` which is missing the ``scrape`` key that
 the engine always emits).
 
-These tests are pure: no network, no credentials.
+These tests are pure: no network (the webhook receiver tests only talk to
+a local server), no credentials.
 """
 
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+
 import pytest
+import requests
 
 from scrapfly import (
+    Crawl,
+    CrawlerConfig,
     CrawlerLifecycleWebhook,
+    CrawlerStatusResponse,
     CrawlerUrlDiscoveredWebhook,
     CrawlerUrlFailedWebhook,
     CrawlerUrlSkippedWebhook,
     CrawlerUrlVisitedWebhook,
     CrawlerWebhookEvent,
+    CrawlerWebhookBatcher,
+    CrawlerWebhookReceiver,
+    ResponseBodyHandler,
     webhook_from_payload,
 )
+from scrapfly.errors import WebhookSignatureMissMatch
 
 
 # ---------------------------------------------------------------------------
@@ -118,6 +134,7 @@ def test_lifecycle_events(event_name, action, stop_reason):
     assert wh.state.stop_reason == stop_reason
     assert wh.state.start_time == 1762940028
     assert wh.state.duration == 6.11
+    assert wh.delivery_id == f"b4867c50-318c-47cd-bfc9-bed67f24771a:{event_name}"
 
 
 # ---------------------------------------------------------------------------
@@ -167,6 +184,7 @@ def test_url_visited():
     assert wh.scrape.content["html"].startswith("<html>")
     assert wh.scrape.content["text"] == "lorem ipsum"
     assert wh.state.urls_visited == 1
+    assert wh.delivery_id == f"{wh.crawler_uuid}:crawler_url_visited:{wh.url}"
 
 
 # ---------------------------------------------------------------------------
@@ -200,6 +218,7 @@ def test_url_skipped():
     assert len(wh.urls) == 3
     assert wh.urls["https://web-scraping.dev/product/25"] == "page_limit"
     assert wh.state.stop_reason == "page_limit"
+    assert wh.delivery_id is None  # Can be emitted several times per crawl
 
 
 # ---------------------------------------------------------------------------
@@ -367,3 +386,297 @@ def test_missing_scrape_link_on_url_failed_raises_keyerror():
     }
     with pytest.raises(KeyError):
         webhook_from_payload(envelope)
+
+
+# ---------------------------------------------------------------------------
+# Signature verification
+# ---------------------------------------------------------------------------
+
+
+def _sign(body, secret="my-signing-secret"):
+    return hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest().upper()
+
+
+def test_signature_verified_over_raw_body():
+    envelope = _lifecycle_envelope(CrawlerWebhookEvent.CRAWLER_FINISHED.value, "finished", "page_limit")
+    # Not the compact re-serialization of the parsed dict: only the raw bytes verify
+    body = json.dumps(envelope, indent=2).encode("utf-8")
+    signature = _sign(body)
+
+    wh = webhook_from_payload(body, signing_secrets=("other", "my-signing-secret"), signature=signature)
+    assert isinstance(wh, CrawlerLifecycleWebhook)
+    assert wh.state.stop_reason == "page_limit"
+    assert webhook_from_payload(body.decode("utf-8"), ("my-signing-secret",), signature).crawler_uuid == wh.crawler_uuid
+
+    with pytest.raises(WebhookSignatureMissMatch):
+        webhook_from_payload(envelope, ("my-signing-secret",), signature)
+    with pytest.raises(WebhookSignatureMissMatch):
+        webhook_from_payload(body + b" ", ("my-signing-secret",), signature)
+
+
+def test_signature_verified_over_compact_dict():
+    envelope = _lifecycle_envelope(CrawlerWebhookEvent.CRAWLER_STARTED.value, "started")
+    signature = _sign(json.dumps(envelope, separators=(",", ":")).encode("utf-8"))
+    assert webhook_from_payload(envelope, ("my-signing-secret",), signature).event == "crawler_started"
+
+
+def test_signature_debug_digests_only_with_debug_logging(caplog, monkeypatch):
+    from scrapfly import api_response
+
+    body = b'{"event": "ping"}'
+    handler = ResponseBodyHandler(signing_secrets=("my-signing-secret",))
+    digests = []
+    real_sha256 = hashlib.sha256
+
+    def counting_sha256(*args, **kwargs):
+        digests.append(args)
+        return real_sha256(*args, **kwargs)
+
+    monkeypatch.setattr(api_response.hashlib, "sha256", counting_sha256)
+
+    with caplog.at_level(logging.INFO, logger=api_response.logger.name):
+        assert handler.verify(body, _sign(body))
+    assert [args for args in digests if args] == []  # HMAC only instantiates the digest
+
+    with caplog.at_level(logging.DEBUG, logger=api_response.logger.name):
+        assert handler.verify(body, _sign(body))
+    assert "WEBHOOK_VERIFY_DEBUG" in caplog.text
+    assert len([args for args in digests if args]) == 2
+
+
+# ---------------------------------------------------------------------------
+# Webhook receiver
+# ---------------------------------------------------------------------------
+
+_UUID = "b4867c50-318c-47cd-bfc9-bed67f24771a"
+_SECRET = "my-signing-secret"
+
+
+def _post(receiver, envelope, secret=_SECRET):
+    body = json.dumps(envelope).encode("utf-8")
+    signature = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest().upper()
+    return requests.post(
+        f"http://127.0.0.1:{receiver.port}/webhook",
+        data=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-Scrapfly-Webhook-Resource-Type": "crawler",
+            "X-Scrapfly-Webhook-Signature": signature,
+        },
+        timeout=5,
+    )
+
+
+def test_webhook_receiver_dispatches_terminal_events():
+    with CrawlerWebhookReceiver(signing_secrets=(_SECRET,), host="127.0.0.1", port=0) as receiver:
+        assert _post(receiver, _lifecycle_envelope("crawler_started", "started")).status_code == 200
+        assert receiver.wait_for(_UUID, timeout=0.01) is None
+
+        assert _post(receiver, _lifecycle_envelope("crawler_finished", "finished"), secret="forged").status_code == 401
+        assert receiver.wait_for(_UUID, timeout=0.01) is None
+
+        assert _post(receiver, _lifecycle_envelope("crawler_finished", "finished")).status_code == 200
+        webhook = receiver.wait_for(_UUID, timeout=1)
+        assert isinstance(webhook, CrawlerLifecycleWebhook)
+        assert webhook.event == "crawler_finished"
+
+
+def test_webhook_receiver_bounds_unclaimed_events(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    receiver = CrawlerWebhookReceiver(max_events=2, event_ttl=60)
+
+    def finished(uuid):
+        envelope = _lifecycle_envelope("crawler_finished", "finished")
+        envelope["payload"]["crawler_uuid"] = uuid
+        return webhook_from_payload(envelope)
+
+    for uuid in ("a", "b", "c"):
+        receiver.dispatch(finished(uuid))
+    # The oldest webhook is dropped over max_events
+    assert len(receiver) == 2
+    assert receiver.wait_for("a", timeout=0) is None
+    assert receiver.wait_for("b", timeout=0).crawler_uuid == "b"
+    assert len(receiver) == 1
+
+    # Expired webhooks are dropped on the next dispatch
+    now[0] += 61
+    receiver.dispatch(finished("d"))
+    assert len(receiver) == 1
+    receiver.discard("d")
+    assert len(receiver) == 0
+
+    # and never returned by wait_for(), even without a dispatch in between
+    receiver.dispatch(finished("e"))
+    now[0] += 61
+    assert receiver.wait_for("e", timeout=0) is None
+    assert len(receiver) == 0
+
+
+class _StatusClient:
+    def __init__(self):
+        self.calls = 0
+        self.finished = threading.Event()
+
+    def get_crawl_status(self, uuid):
+        self.calls += 1
+        done = self.finished.is_set()
+        return CrawlerStatusResponse({
+            "crawler_uuid": uuid,
+            "status": "DONE" if done else "RUNNING",
+            "is_success": True if done else None,
+            "is_finished": done,
+            "state": _state(),
+        })
+
+
+def test_crawl_wait_wakes_up_on_webhook():
+    client = _StatusClient()
+    crawl = Crawl(client, CrawlerConfig(url="https://web-scraping.dev/products"))
+    crawl._uuid = _UUID
+
+    with CrawlerWebhookReceiver(signing_secrets=(_SECRET,), host="127.0.0.1", port=0) as receiver:
+        def finish():
+            time.sleep(0.2)
+            client.finished.set()
+            _post(receiver, _lifecycle_envelope("crawler_finished", "finished"))
+
+        thread = threading.Thread(target=finish)
+        thread.start()
+        start = time.monotonic()
+        crawl.wait(webhook_receiver=receiver, fallback_interval=30, max_wait=10)
+        thread.join()
+
+    # One status check before the webhook, one after, no polling in between
+    assert time.monotonic() - start < 5
+    assert client.calls == 2
+    assert crawl.status(refresh=False).is_complete
+
+
+def test_crawl_wait_webhook_fallback_polling():
+    client = _StatusClient()
+    crawl = Crawl(client, CrawlerConfig(url="https://web-scraping.dev/products"))
+    crawl._uuid = _UUID
+    receiver = CrawlerWebhookReceiver()  # webhook never delivered
+
+    threading.Timer(0.1, client.finished.set).start()
+    crawl.wait(webhook_receiver=receiver, fallback_interval=0.05, max_wait=5)
+
+    assert client.calls >= 2
+    assert crawl.status(refresh=False).is_complete
+
+
+# ---------------------------------------------------------------------------
+# Webhook batcher
+# ---------------------------------------------------------------------------
+
+
+def _visited_envelope(i):
+    return {
+        "event": CrawlerWebhookEvent.CRAWLER_URL_VISITED.value,
+        "payload": {
+            "crawler_uuid": _UUID,
+            "project": "default",
+            "env": "LIVE",
+            "url": f"https://web-scraping.dev/product/{i}",
+            "action": "visited",
+            "state": _state(),
+            "scrape": {"status_code": 200, "country": "de", "log_uuid": "x", "log_url": "x", "content": {}},
+        },
+    }
+
+
+def test_webhook_batcher_flushes_on_size():
+    batches = []
+    with CrawlerWebhookBatcher(batches.append, max_size=3, max_delay=60) as batcher:
+        for i in range(7):
+            batcher.add(_visited_envelope(i))
+        deadline = time.monotonic() + 5
+        while len(batches) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [len(batch) for batch in batches] == [3, 3]
+        assert batcher.pending == 1
+    # Closing flushes the rest
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [wh.url for batch in batches for wh in batch] == [f"https://web-scraping.dev/product/{i}" for i in range(7)]
+
+    with pytest.raises(RuntimeError):
+        batcher.add(_visited_envelope(8))
+
+
+def test_webhook_batcher_flushes_on_delay():
+    batches = []
+    with CrawlerWebhookBatcher(batches.append, max_size=100, max_delay=0.1) as batcher:
+        started = time.monotonic()
+        batcher.add(_visited_envelope(1))
+        batcher.add(webhook_from_payload(_visited_envelope(2)))
+        while not batches and time.monotonic() - started < 5:
+            time.sleep(0.01)
+        assert 0.1 <= time.monotonic() - started < 5
+        assert [len(batch) for batch in batches] == [2]
+
+
+def test_webhook_batcher_delay_after_partial_flush():
+    flushed_at = {}
+
+    def flush(batch):
+        for wh in batch:
+            flushed_at[wh.url] = time.monotonic()
+        if len(flushed_at) == 2:
+            time.sleep(0.4)  # Webhooks 3 to 5 pile up meanwhile
+
+    with CrawlerWebhookBatcher(flush, max_size=2, max_delay=0.5) as batcher:
+        started = time.monotonic()
+        for i in range(1, 6):
+            batcher.add(_visited_envelope(i))
+        deadline = started + 5
+        while len(flushed_at) < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # Left over by the size flush of 3 and 4, webhook 5 still waits at most max_delay
+        assert flushed_at["https://web-scraping.dev/product/5"] - started < 0.75
+
+
+def test_webhook_batcher_as_callback():
+    batches = []
+    batcher = CrawlerWebhookBatcher(
+        batches.append,
+        max_size=100,
+        max_delay=60,
+        events=[CrawlerWebhookEvent.CRAWLER_URL_VISITED.value],
+    )
+    batcher(_visited_envelope(1), "crawler", None)
+    batcher(_lifecycle_envelope(CrawlerWebhookEvent.CRAWLER_STARTED.value, "started"), "crawler", None)
+    batcher({"result": {}}, "scrape", None)
+
+    assert batcher.flush(timeout=5)
+    assert [[wh.event for wh in batch] for batch in batches] == [["crawler_url_visited"]]
+    assert batcher.flush(timeout=5)  # Nothing left
+    batcher.close()
+
+
+def test_webhook_batcher_backpressure_and_errors():
+    release = threading.Event()
+    batches = []
+
+    def flush(batch):
+        release.wait(5)
+        batches.append(batch)
+        raise RuntimeError("downstream unavailable")  # Logged, the batcher keeps going
+
+    batcher = CrawlerWebhookBatcher(flush, max_size=2, max_delay=60, max_pending=2)
+    batcher.add(_visited_envelope(1))
+    batcher.add(_visited_envelope(2))  # Taken by the blocked flush
+    batcher.add(_visited_envelope(3))
+    batcher.add(_visited_envelope(4))
+
+    blocked = threading.Thread(target=batcher.add, args=(_visited_envelope(5),))
+    blocked.start()
+    blocked.join(0.2)
+    assert blocked.is_alive()  # The buffer is full
+
+    release.set()
+    blocked.join(5)
+    assert not blocked.is_alive()
+    batcher.close()
+    assert [len(batch) for batch in batches] == [2, 2, 1]
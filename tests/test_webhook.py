@@ -0,0 +1,496 @@
+"""
+Unit tests for the webhook servers, spool, deduplication and benchmark harness.
+
+The ASGI application is driven directly with hand-built ASGI messages, the
+Flask server through its test client (skipped when flask is not installed),
+no server or network involved. The benchmark harness runs against a local
+CrawlerWebhookReceiver.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from scrapfly import CrawlerWebhookReceiver, ResponseBodyHandler, webhook_from_payload
+from scrapfly.errors import WebhookError
+from scrapfly.webhook import ResourceType, create_asgi_app, create_server
+from scrapfly.webhook_benchmark import WebhookPayloadFactory, run_benchmark
+from scrapfly.webhook_dedup import DeliveryStore, MemoryDeliveryStore, SQLiteDeliveryStore, delivery_key
+from scrapfly.webhook_spool import WebhookSpool
+
+SECRET = 'test-signing-secret'
+
+
+def _signed(payload):
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+    signature = hmac.new(SECRET.encode('utf-8'), body, hashlib.sha256).hexdigest().upper()
+    return body, signature
+
+
+async def _post(app, body, signature=None, resource_type=ResourceType.CRAWLER.value, path='/webhook'):
+    headers = [
+        (b'content-type', b'application/json'),
+        (b'x-scrapfly-webhook-resource-type', resource_type.encode()),
+    ]
+    if signature is not None:
+        headers.append((b'x-scrapfly-webhook-signature', signature.encode()))
+
+    # Deliver the body in two chunks
+    messages = [
+        {'type': 'http.request', 'body': body[:10], 'more_body': True},
+        {'type': 'http.request', 'body': body[10:], 'more_body': False},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app({'type': 'http', 'method': 'POST', 'path': path, 'headers': headers}, receive, send)
+    return sent[0]['status']
+
+
+async def _lifespan(app, *events):
+    messages = [{'type': f'lifespan.{event}'} for event in events]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    await app({'type': 'lifespan'}, receive, send)
+    return sent
+
+
+def test_asgi_app_acknowledges_before_the_callback():
+    async def scenario():
+        release = asyncio.Event()
+        received = []
+
+        async def callback(data, resource_type, headers):
+            await release.wait()
+            received.append((data['event'], resource_type, headers['x-scrapfly-webhook-resource-type']))
+
+        app = create_asgi_app(signing_secrets=(SECRET,), callback=callback, workers=1, queue_size=2)
+        body, signature = _signed({'event': 'crawler_started'})
+
+        # The worker takes the first delivery and blocks, two more fill the queue
+        assert await _post(app, body, signature) == 200
+        await asyncio.sleep(0)
+        assert await _post(app, body, signature) == 200
+        assert await _post(app, body, signature) == 200
+        assert app.pending == 2
+        assert await _post(app, body, signature) == 503
+        assert received == []
+
+        release.set()
+        await app.stop()
+        return received
+
+    received = asyncio.run(scenario())
+    assert received == [('crawler_started', 'crawler', 'crawler')] * 3
+
+
+def test_asgi_app_rejects_invalid_deliveries():
+    async def scenario():
+        calls = []
+        app = create_asgi_app(signing_secrets=(SECRET,), callback=lambda *args: calls.append(args))
+        body, signature = _signed({'event': 'crawler_started'})
+
+        statuses = [
+            await _post(app, body, 'BAD' + signature),
+            await _post(app, *_signed(b'not json at all')),
+            await _post(app, body, signature, resource_type='unknown'),
+            await _post(app, body, signature, path='/other'),
+        ]
+        await app.stop()
+        return statuses, calls
+
+    statuses, calls = asyncio.run(scenario())
+    assert statuses == [401, 400, 400, 404]
+    assert calls == []
+
+
+def test_server_requires_a_callback_or_a_spool():
+    with pytest.raises(ValueError):
+        create_asgi_app(signing_secrets=(SECRET,), callback=None)
+    with pytest.raises(ValueError):
+        create_server(signing_secrets=(SECRET,), callback=None)
+
+
+def test_asgi_app_lifespan_drains_the_queue():
+    async def scenario():
+        calls = []
+        app = create_asgi_app(signing_secrets=(SECRET,), callback=lambda data, *_: calls.append(data))
+        body, signature = _signed({'event': 'crawler_finished'})
+
+        startup = asyncio.create_task(_lifespan(app, 'startup', 'shutdown'))
+        await _post(app, body, signature)
+        # Sync callbacks run in the executor and are awaited on shutdown
+        return await startup, calls
+
+    sent, calls = asyncio.run(scenario())
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert calls == [{'event': 'crawler_finished'}]
+
+
+def _flask_post(app, body, signature=None, resource_type=ResourceType.CRAWLER.value):
+    headers = {'Content-Type': 'application/json', 'X-Scrapfly-Webhook-Resource-Type': resource_type}
+    if signature is not None:
+        headers['X-Scrapfly-Webhook-Signature'] = signature
+    return app.test_client().post('/webhook', data=body, headers=headers).status_code
+
+
+def test_flask_server_rejects_bad_signatures():
+    pytest.importorskip('flask')
+    calls = []
+    app = create_server(signing_secrets=(SECRET,), callback=lambda *args: calls.append(args))
+    body, signature = _signed({'event': 'crawler_started'})
+
+    assert _flask_post(app, body, 'BAD' + signature) == 401
+    assert _flask_post(app, body, signature) == 200
+    assert len(calls) == 1
+
+
+# ---------------------------------------------------------------------------
+# Spool
+# ---------------------------------------------------------------------------
+
+
+def test_spool_append_and_drain(tmp_path):
+    spool = WebhookSpool(str(tmp_path), segment_size=200)
+    for i in range(10):
+        spool.append(json.dumps({'event': 'crawler_url_visited', 'i': i}).encode(), 'crawler', 'application/json')
+    spool.append(gzip.compress(b'{"event": "ping"}'), 'ping', 'application/json', 'gzip')
+
+    assert len(spool.segments()) > 1
+    assert len(spool) == 11
+
+    received = []
+    assert spool.drain(lambda data, resource_type: received.append((data, resource_type)), batch_size=4) == 11
+    assert received[3] == ({'event': 'crawler_url_visited', 'i': 3}, 'crawler')
+    assert received[-1] == ({'event': 'ping'}, 'ping')
+
+    # Consumed segments are deleted, the position survives a restart
+    assert len(spool.segments()) == 1
+    spool.append(b'{"event": "crawler_finished"}', 'crawler', 'application/json')
+    spool.close()
+
+    reopened = WebhookSpool(str(tmp_path))
+    assert [event.data for event in reopened.iter_events()] == [{'event': 'crawler_finished'}]
+
+
+def test_spool_drain_commits_before_a_failure(tmp_path):
+    spool = WebhookSpool(str(tmp_path), fsync=False)
+    for i in range(5):
+        spool.append(json.dumps({'i': i}).encode(), 'crawler', 'application/json')
+
+    def callback(data, resource_type):
+        if data['i'] == 3:
+            raise RuntimeError('downstream unavailable')
+
+    with pytest.raises(RuntimeError):
+        spool.drain(callback, batch_size=100)
+    assert [event.data['i'] for event in spool.iter_events()] == [3, 4]
+
+
+def test_spool_recovers_from_a_torn_write(tmp_path):
+    spool = WebhookSpool(str(tmp_path))
+    spool.append(b'{"i": 1}', 'crawler', 'application/json')
+    spool.close()
+
+    # Simulate a crash in the middle of the second record
+    with open(os.path.join(str(tmp_path), '%020d.seg' % 1), 'ab') as f:
+        f.write(b'\x01\x02\x03\x04garbage')
+
+    spool = WebhookSpool(str(tmp_path))
+    spool.append(b'{"i": 2}', 'crawler', 'application/json')
+    assert [event.data for event in spool.iter_events()] == [{'i': 1}, {'i': 2}]
+
+
+def test_spool_group_commit(tmp_path, monkeypatch):
+    spool = WebhookSpool(str(tmp_path))
+    spool.append(b'{}', 'crawler', 'application/json')  # Opens the segment
+
+    fsync_calls = []
+    real_fsync = os.fsync
+
+    def slow_fsync(fd):
+        fsync_calls.append(fd)
+        time.sleep(0.05)
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, 'fsync', slow_fsync)
+    threads = [threading.Thread(target=spool.append, args=(b'{}', 'crawler', 'application/json')) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(spool) == 21
+    assert len(fsync_calls) < 20
+
+
+def test_spool_rotation_during_a_group_commit(tmp_path, monkeypatch):
+    # Every append starts a new segment, closing the one another thread may be syncing
+    spool = WebhookSpool(str(tmp_path), segment_size=1)
+    real_fsync = os.fsync
+    errors = []
+
+    def slow_fsync(fd):
+        inode = os.fstat(fd).st_ino
+        if not spool._lock.locked():
+            time.sleep(0.01)  # Group commit, rotations go on meanwhile
+        # The descriptor was not closed, nor reused for another segment, in the meantime
+        assert os.fstat(fd).st_ino == inode
+        real_fsync(fd)
+
+    def append():
+        try:
+            spool.append(b'{}', 'crawler', 'application/json')
+        except Exception as e:
+            errors.append(e)
+
+    monkeypatch.setattr(os, 'fsync', slow_fsync)
+    threads = [threading.Thread(target=append) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(spool) == 20
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='the producer lock relies on fcntl')
+def test_spool_has_a_single_producer(tmp_path):
+    spool = WebhookSpool(str(tmp_path))
+    spool.append(b'{"i": 1}', 'crawler', 'application/json')
+
+    with pytest.raises(WebhookError):
+        WebhookSpool(str(tmp_path)).append(b'{"i": 2}', 'crawler', 'application/json')
+    # Consumers don't take the lock
+    assert [event.data for event in WebhookSpool(str(tmp_path)).iter_events()] == [{'i': 1}]
+
+    spool.close()
+    other = WebhookSpool(str(tmp_path))
+    other.append(b'{"i": 2}', 'crawler', 'application/json')
+    assert len(other) == 2
+
+
+def test_asgi_app_spools_deliveries(tmp_path):
+    spool = WebhookSpool(str(tmp_path))
+
+    async def scenario():
+        app = create_asgi_app(signing_secrets=(SECRET,), callback=None, spool=spool)
+        body, signature = _signed({'event': 'crawler_url_visited'})
+        return [await _post(app, body, signature), await _post(app, body, 'BAD')]
+
+    assert asyncio.run(scenario()) == [200, 401]
+    assert [(event.resource_type, event.data) for event in spool.iter_events()] == [
+        ('crawler', {'event': 'crawler_url_visited'}),
+    ]
+
+
+def test_flask_server_spools_deliveries(tmp_path):
+    pytest.importorskip('flask')
+    spool = WebhookSpool(str(tmp_path))
+    app = create_server(signing_secrets=(SECRET,), callback=None, spool=spool)
+    body, signature = _signed({'event': 'crawler_url_visited'})
+
+    assert _flask_post(app, body, signature) == 200
+    # Spooled before the acknowledgement
+    assert [(event.resource_type, event.data) for event in spool.iter_events()] == [
+        ('crawler', {'event': 'crawler_url_visited'}),
+    ]
+    assert _flask_post(app, body, 'BAD') == 401
+    assert len(spool) == 1
+
+
+# ---------------------------------------------------------------------------
+# Deduplication
+# ---------------------------------------------------------------------------
+
+
+def _url_visited(url='https://web-scraping.dev/product/1'):
+    return {'event': 'crawler_url_visited', 'payload': {'crawler_uuid': 'uuid', 'url': url}}
+
+
+def test_delivery_key():
+    assert delivery_key(_url_visited()) == 'uuid:crawler_url_visited:https://web-scraping.dev/product/1'
+    assert delivery_key({'event': 'crawler_finished', 'payload': {'crawler_uuid': 'uuid'}}) == 'uuid:crawler_finished'
+
+    # Events emitted several times per crawl fall back on the body hash
+    discovered = {'event': 'crawler_url_discovered', 'payload': {'crawler_uuid': 'uuid', 'origin': 'x'}}
+    assert delivery_key(discovered, body=b'{}') == 'sha256:' + hashlib.sha256(b'{}').hexdigest()
+    with pytest.raises(ValueError):
+        delivery_key(discovered)
+
+
+def test_memory_delivery_store(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    store = MemoryDeliveryStore(ttl=60, max_entries=2)
+
+    assert store.seen('a') is False
+    assert store.seen('a') is True
+    assert store.seen('b') is False
+    assert store.seen('c') is False  # Evicts 'a'
+    assert len(store) == 2
+    assert store.seen('a') is False
+
+    store.discard('a')
+    assert store.seen('a') is False
+
+    now[0] += 61
+    assert store.seen('b') is False  # Expired
+    assert len(store) == 1
+
+
+def test_sqlite_delivery_store_is_shared(tmp_path, monkeypatch):
+    path = str(tmp_path / 'deliveries.db')
+    first, second = SQLiteDeliveryStore(path, ttl=60), SQLiteDeliveryStore(path, ttl=60)
+
+    assert first.seen('a') is False
+    assert second.seen('a') is True
+
+    # Also shared across threads
+    results = []
+    thread = threading.Thread(target=lambda: results.append(first.seen('a')))
+    thread.start()
+    thread.join()
+    assert results == [True]
+
+    second.discard('a')
+    assert first.seen('a') is False
+
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert second.seen('a') is False  # Expired entry taken over
+    assert len(first) == 1
+
+
+def test_asgi_app_drops_retried_deliveries():
+    async def scenario():
+        calls = []
+        app = create_asgi_app(
+            signing_secrets=(SECRET,),
+            callback=lambda data, *_: calls.append(data['payload']['url']),
+            dedup=MemoryDeliveryStore(),
+        )
+        first, second = _signed(_url_visited()), _signed(_url_visited('https://web-scraping.dev/product/2'))
+        # The retry of the first delivery is not byte-identical, its identity is
+        retry = _signed(dict(_url_visited(), attempt=2))
+
+        statuses = [await _post(app, *first), await _post(app, *retry), await _post(app, *second)]
+        await app.stop()
+        return statuses, calls
+
+    statuses, calls = asyncio.run(scenario())
+    assert statuses == [200, 200, 200]
+    assert calls == ['https://web-scraping.dev/product/1', 'https://web-scraping.dev/product/2']
+
+
+def test_asgi_app_lets_retries_of_rejected_deliveries_through():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def callback(*_):
+            await release.wait()
+
+        app = create_asgi_app(signing_secrets=(SECRET,), callback=callback, workers=1, queue_size=1, dedup=MemoryDeliveryStore())
+        statuses = []
+        for i in range(3):
+            statuses.append(await _post(app, *_signed(_url_visited(f'https://web-scraping.dev/product/{i}'))))
+            await asyncio.sleep(0)
+        # The 503 delivery was forgotten, its retry is accepted once there is room
+        release.set()
+        await asyncio.sleep(0.01)
+        statuses.append(await _post(app, *_signed(_url_visited('https://web-scraping.dev/product/2'))))
+        await app.stop()
+        return statuses
+
+    assert asyncio.run(scenario()) == [200, 200, 503, 200]
+
+
+def test_flask_server_drops_retried_deliveries(tmp_path):
+    pytest.importorskip('flask')
+    calls = []
+    app = create_server(
+        signing_secrets=(SECRET,),
+        callback=lambda data, *_: calls.append(data['payload']['url']),
+        dedup=MemoryDeliveryStore(),
+    )
+    retry = _signed(dict(_url_visited(), attempt=2))
+
+    assert _flask_post(app, *_signed(_url_visited())) == 200
+    assert _flask_post(app, *retry) == 200
+    assert calls == ['https://web-scraping.dev/product/1']
+
+    # Spooled deliveries are deduplicated on their body
+    spool = WebhookSpool(str(tmp_path))
+    app = create_server(signing_secrets=(SECRET,), callback=None, spool=spool, dedup=MemoryDeliveryStore())
+    assert [_flask_post(app, *retry), _flask_post(app, *retry)] == [200, 200]
+    assert len(spool) == 1
+
+
+def test_delivery_store_is_abstract():
+    with pytest.raises(TypeError):
+        DeliveryStore()
+
+
+# ---------------------------------------------------------------------------
+# Benchmark harness
+# ---------------------------------------------------------------------------
+
+
+def test_benchmark_payloads_are_valid():
+    factory = WebhookPayloadFactory(SECRET, seed=1, page_size=512)
+    handler = ResponseBodyHandler(signing_secrets=(SECRET,))
+
+    for event in ('crawler_started', 'crawler_url_visited', 'crawler_url_discovered', 'crawler_url_skipped',
+                  'crawler_url_failed', 'crawler_finished'):
+        body, headers = factory.encode(factory.crawler_payload(event), 'crawler', content_encoding='gzip')
+        assert headers['Content-Encoding'] == 'gzip'
+        data = handler.read(body, 'gzip', headers['Content-Type'], headers['X-Scrapfly-Webhook-Signature'])
+        assert webhook_from_payload(data).event == event
+
+    body, headers = factory.encode(factory.scrape_payload(), 'scrape')
+    data = handler.read(body, None, headers['Content-Type'], headers['X-Scrapfly-Webhook-Signature'])
+    assert data['result']['status_code'] == 200
+    assert len(data['result']['content']) >= 512
+
+    deliveries = factory.deliveries(20, scrape_ratio=0.5, content_encodings=('identity', 'gzip'))
+    assert len(deliveries) == 20
+    assert {headers.get('Content-Encoding') for _, headers in deliveries} == {None, 'gzip'}
+    assert {headers['X-Scrapfly-Webhook-Resource-Type'] for _, headers in deliveries} == {'scrape', 'crawler'}
+
+
+def test_benchmark_against_a_local_server():
+    factory = WebhookPayloadFactory(SECRET, seed=1, page_size=256)
+    deliveries = factory.deliveries(30, content_encodings=('identity', 'gzip'))
+    deliveries.append(factory.encode(factory.crawler_payload('crawler_finished'), 'crawler'))
+    # A delivery signed with another secret
+    body, headers = deliveries[1]
+    deliveries.append((body, dict(headers, **{'X-Scrapfly-Webhook-Signature': 'BAD'})))
+
+    with CrawlerWebhookReceiver(signing_secrets=(SECRET,), host='127.0.0.1', port=0) as receiver:
+        result = run_benchmark(f'http://127.0.0.1:{receiver.port}/webhook', deliveries, rate=500, concurrency=4)
+
+    assert result.requests == 32
+    assert result.statuses == {200: 31, 401: 1}
+    assert result.errors == 0
+    assert result.throughput > 0
+    assert 0 < result.percentile(50) <= result.percentile(99) <= result.to_dict()['latency']['max']
+    assert 'throughput' in str(result)